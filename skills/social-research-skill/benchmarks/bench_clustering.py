@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+bench_clustering.py - Scaling benchmark for lib/clustering.py
+
+Clusters synthetic posts (see corpus.py) at increasing corpus sizes and
+reports the time spent vectorizing (tokenizing and building the hashed
+TF-IDF matrix) and in total, plus the sparse matrix size, for the default
+block size and any others given.
+
+Usage:
+    python3 bench_clustering.py [options]
+
+Options:
+    --sizes=N,N,...       Corpus sizes (default: 1000,10000,50000)
+    --block-sizes=N,...   Posts scored per block (default: the module default)
+    --seed=N              Corpus seed (default: 1)
+    --json                Print results as JSON
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "scripts"))
+
+import corpus
+from lib import clustering, tokenizer
+
+
+def int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def run(posts: List[Dict], block_size: int) -> Dict[str, float]:
+    """Seconds to vectorize and to cluster posts, with a cold tokenizer cache each time."""
+    tokenizer.get_tokenizer().clear_cache()
+    start = time.perf_counter()
+    vectors = clustering.HashedTfidf(posts)
+    vectorize = time.perf_counter() - start
+
+    tokenizer.get_tokenizer().clear_cache()
+    start = time.perf_counter()
+    clusters = clustering.cluster_posts(posts, block_size=block_size)
+    total = time.perf_counter() - start
+
+    matrix_bytes = vectors.indptr.nbytes + vectors.indices.nbytes + vectors.weights.nbytes
+    return {
+        "posts": len(posts),
+        "block_size": block_size,
+        "vectorize_s": round(vectorize, 3),
+        "total_s": round(total, 3),
+        "clusters": len(clusters),
+        "matrix_mb": round(matrix_bytes / 1e6, 1),
+    }
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Post clustering scaling benchmark")
+    parser.add_argument("--sizes", type=int_list, default=[1000, 10000, 50000],
+                        help="Corpus sizes (default: 1000,10000,50000)")
+    parser.add_argument("--block-sizes", type=int_list, default=[clustering.BLOCK_SIZE],
+                        help=f"Posts scored per block (default: {clustering.BLOCK_SIZE})")
+    parser.add_argument("--seed", type=int, default=1, help="Corpus seed (default: 1)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+    posts = list(corpus.CorpusGenerator(seed=args.seed).posts(max(args.sizes)))
+
+    results = [
+        run(posts[:size], block_size)
+        for size in args.sizes
+        for block_size in args.block_sizes
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{'posts':>8} {'block':>6} {'vectorize s':>12} {'total s':>9} {'clusters':>9} {'matrix MB':>10}")
+    for result in results:
+        print(f"{result['posts']:>8} {result['block_size']:>6} {result['vectorize_s']:>12.3f} "
+              f"{result['total_s']:>9.3f} {result['clusters']:>9} {result['matrix_mb']:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+bench_fetch.py - Load test of the fetch layer against the local mock APIs
+
+Starts mock_api.py's server in-process (or uses a running one), points
+reddit_search and twitter_search at it, and runs a batch of distinct
+queries through each API's fetcher at several concurrency levels. Reports
+fetch throughput, per-query latency percentiles and quota efficiency:
+posts returned per request, and the share of requests the server refused
+(429) or failed (5xx). Runs entirely offline.
+
+Usage:
+    python3 bench_fetch.py [options]
+
+Options:
+    --apis=NAME,...       reddit, twitter and/or pushshift (default: all)
+    --concurrency=N,...   Queries in flight at once (default: 1,4,8)
+    --queries=N           Queries per run (default: 16)
+    --limit=N             Results asked for per query (default: 300)
+    --client-rate=R       Client-side requests per second per API, the shared
+                          http_pool limit (default: 50)
+    --min-page-yield=F    Early-stopping threshold passed to the fetchers
+                          (default: 0, always page to --limit)
+    --min-engagement=N    Engagement threshold for early stopping (default: 5)
+    --server=URL          Use a running mock_api.py instead of starting one
+    --json                Print results as JSON
+
+    The server options of mock_api.py (--latency, --error-rate,
+    --throttle-rate, --quota, --results, --seed) configure the in-process
+    server.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "scripts"))
+
+import mock_api
+
+APIS = ["reddit", "twitter", "pushshift"]
+
+
+def int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def name_list(value: str) -> List[str]:
+    names = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [name for name in names if name not in APIS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown API: {', '.join(unknown)}")
+    return names
+
+
+def percentile(values: List[float], share: float) -> float:
+    """Nearest-rank percentile of values (0 for none)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(max(math.ceil(share * len(ordered)) - 1, 0), len(ordered) - 1)]
+
+
+def fetcher(api: str, args) -> Callable[[str, datetime, datetime], List[Dict]]:
+    """The fetch function under test for api, with the benchmark's settings."""
+    from lib import reddit_search, twitter_search
+
+    if api == "reddit":
+        credentials = {"client_id": "mock", "client_secret": "mock", "user_agent": "bench-fetch/1.0"}
+        return lambda query, start, end: reddit_search.search_via_api(
+            query, start, end, args.limit, credentials, args.min_page_yield, args.min_engagement
+        )
+    if api == "twitter":
+        return lambda query, start, end: twitter_search.search_via_api(
+            query, start, end, args.limit, "mock", args.min_page_yield, args.min_engagement
+        )
+    return lambda query, start, end: reddit_search.search_via_pushshift(
+        query, start, end, args.limit
+    )
+
+
+def server_stats(server, url: str) -> Dict:
+    if server:
+        return server.api.snapshot()
+    with urllib.request.urlopen(f"{url}/_stats", timeout=10) as response:
+        return json.load(response)
+
+
+def reset_server(server, url: str):
+    if server:
+        server.api.reset()
+        return
+    request = urllib.request.Request(f"{url}/_reset", data=b"", method="POST")
+    urllib.request.urlopen(request, timeout=10).close()
+
+
+def run(api: str, concurrency: int, args, server, url: str) -> Dict:
+    """Fetch args.queries queries with concurrency in flight; return the measurements."""
+    from lib import http_pool
+
+    http_pool.set_rate_limit(api, args.client_rate, burst=max(int(args.client_rate), 1))
+    reset_server(server, url)
+    fetch = fetcher(api, args)
+    end = datetime.now()
+    start = end - timedelta(days=mock_api.HISTORY_DAYS)
+    queries = [f"bench topic {i}" for i in range(args.queries)]
+
+    latencies = []
+    failed = 0
+    posts = 0
+
+    def timed(query: str):
+        began = time.perf_counter()
+        try:
+            results = fetch(query, start, end)
+        except Exception:
+            return None, time.perf_counter() - began
+        return results, time.perf_counter() - began
+
+    began = time.perf_counter()
+    # Fetchers report partial failures on stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for results, latency in executor.map(timed, queries):
+                latencies.append(latency)
+                if results is None:
+                    failed += 1
+                    continue
+                posts += len(results)
+    elapsed = time.perf_counter() - began
+
+    stats = server_stats(server, url).get(api, {})
+    requests = stats.get("requests", 0)
+    statuses = stats.get("statuses", {})
+    throttled = statuses.get("429", 0)
+    errors = sum(count for status, count in statuses.items() if status.startswith("5"))
+    return {
+        "api": api,
+        "concurrency": concurrency,
+        "queries": len(queries),
+        "failed": failed,
+        "requests": requests,
+        "throttled": throttled,
+        "errors": errors,
+        "posts": posts,
+        "elapsed_s": round(elapsed, 3),
+        "posts_per_s": round(posts / elapsed, 1) if elapsed else 0.0,
+        "requests_per_s": round(requests / elapsed, 1) if elapsed else 0.0,
+        "latency_p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "latency_p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "posts_per_request": round(posts / requests, 1) if requests else 0.0,
+        "refused_pct": round((throttled + errors) / requests * 100, 1) if requests else 0.0,
+    }
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Fetch-layer load test against the mock APIs")
+    parser.add_argument("--apis", type=name_list, default=APIS,
+                        help="APIs to test (default: reddit,twitter,pushshift)")
+    parser.add_argument("--concurrency", type=int_list, default=[1, 4, 8],
+                        help="Queries in flight at once (default: 1,4,8)")
+    parser.add_argument("--queries", type=int, default=16, help="Queries per run (default: 16)")
+    parser.add_argument("--limit", type=int, default=300,
+                        help="Results asked for per query (default: 300)")
+    parser.add_argument("--client-rate", type=float, default=50.0,
+                        help="Client requests per second per API (default: 50)")
+    parser.add_argument("--min-page-yield", type=float, default=0.0,
+                        help="Early-stopping threshold for the fetchers (default: 0)")
+    parser.add_argument("--min-engagement", type=int, default=5,
+                        help="Engagement threshold for early stopping (default: 5)")
+    parser.add_argument("--server", metavar="URL", help="Use a running mock_api.py")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    mock_api.add_server_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+    server = None
+    if args.server:
+        url = args.server.rstrip("/")
+    else:
+        server = mock_api.MockApiServer(**mock_api.server_options(args)).start()
+        url = server.url
+    # Set before the fetchers are imported, which read them once
+    os.environ.update({
+        "REDDIT_AUTH_URL": url,
+        "REDDIT_API_URL": url,
+        "PUSHSHIFT_API_URL": url,
+        "TWITTER_API_URL": url,
+    })
+
+    try:
+        results = [
+            run(api, concurrency, args, server, url)
+            for api in args.apis
+            for concurrency in args.concurrency
+        ]
+    finally:
+        if server:
+            server.stop()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{'api':>9} {'conc':>5} {'failed':>6} {'requests':>8} {'429':>5} {'5xx':>5} "
+          f"{'posts/s':>8} {'req/s':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'posts/req':>9} {'refused':>8}")
+    for r in results:
+        print(f"{r['api']:>9} {r['concurrency']:>5} {r['failed']:>6} {r['requests']:>8} "
+              f"{r['throttled']:>5} {r['errors']:>5} {r['posts_per_s']:>8.1f} "
+              f"{r['requests_per_s']:>6.1f} {r['latency_p50_ms']:>8.1f} {r['latency_p95_ms']:>8.1f} "
+              f"{r['latency_p99_ms']:>8.1f} {r['posts_per_request']:>9.1f} {r['refused_pct']:>7.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+bench_pipeline.py - Scaling benchmark for the analysis modules and pipeline
+
+Generates synthetic corpora (see corpus.py) at several sizes, times each lib
+module and the whole offline pipeline (social_research.py --input) on them,
+and saves the timings as a JSON baseline. `compare` re-runs the benchmark
+with a baseline's settings, or reads a second results file, and flags
+benchmarks that got slower.
+
+Usage:
+    python3 bench_pipeline.py run [options]
+    python3 bench_pipeline.py compare BASELINE [--current=FILE] [--threshold=R]
+
+Run options:
+    --sizes=N,N,...       Corpus sizes (default: 1000,10000,100000)
+    --only=NAME,...       Benchmarks to run (default: all)
+    --repeat=N            Runs per benchmark; the fastest is kept (default: 3)
+    --budget=SECONDS      Skip a benchmark at sizes where it is projected to
+                          take longer than this (default: 120)
+    --duplicate-rate=R    Corpus duplicate share (default: 0.05)
+    --vocab-size=N        Corpus vocabulary size (default: 5000)
+    --days=N              Corpus date spread in days (default: 30)
+    --seed=N              Corpus seed (default: 1)
+    --out=PATH            Results file (default: benchmarks/baseline.json)
+
+Compare options:
+    --current=FILE        Compare this results file instead of re-running
+    --threshold=R         Slowdown ratio that counts as a regression
+                          (default: 0.2, i.e. 20% slower)
+    --min-delta=SECONDS   Ignore differences smaller than this (default: 0.005)
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BENCH_DIR.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+# Keep benchmark runs out of the real sentiment cache and post store
+_scratch = tempfile.TemporaryDirectory(prefix="social-research-bench-")
+os.environ["SOCIAL_RESEARCH_CACHE_DIR"] = _scratch.name
+os.environ["SOCIAL_RESEARCH_STORE"] = os.path.join(_scratch.name, "posts.sqlite")
+
+import corpus
+import social_research
+from lib import (
+    deduplicator,
+    engagement_filter,
+    output_formatter,
+    sentiment_analyzer,
+    trend_analyzer,
+)
+
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+TOPIC = "cursor ai"
+MIN_ENGAGEMENT = 5
+
+
+def _output_data(posts: List[Dict]) -> Dict:
+    """A report dict like social_research.research() builds, without suggestions."""
+    return {
+        "topic": TOPIC,
+        "date_range": {"start": "", "end": "", "days": 30},
+        "stats": {
+            "total_posts": len(posts),
+            "reddit_posts": sum(1 for p in posts if p.get("platform") == "reddit"),
+            "twitter_posts": sum(1 for p in posts if p.get("platform") == "twitter"),
+        },
+        "posts": posts,
+        "trends": trend_analyzer.analyze(posts[:1000], TOPIC),
+        "suggestions": {"blog_posts": [], "social_posts": [], "videos": []},
+        "sentiment": None,
+        "errors": [],
+    }
+
+
+class Workload:
+    """Inputs for one corpus size, prepared once and shared by the benchmarks."""
+
+    def __init__(self, posts: List[Dict], workdir: Path):
+        self.posts = posts
+        self.workdir = workdir
+        # Downstream modules get the filtered posts: deduplicating them first
+        # would cost as much as the deduplicator benchmark itself
+        self.filtered = engagement_filter.filter_posts(posts, min_engagement=MIN_ENGAGEMENT)
+        self._corpus_file: Optional[Path] = None
+        self._report: Optional[Dict] = None
+
+    def report_data(self) -> Dict:
+        if self._report is None:
+            self._report = _output_data(self.filtered)
+        return self._report
+
+    def corpus_file(self) -> Path:
+        if self._corpus_file is None:
+            self._corpus_file = self.workdir / "corpus.jsonl"
+            corpus.write_jsonl(self.posts, self._corpus_file)
+        return self._corpus_file
+
+
+def bench_engagement_filter(work: Workload):
+    engagement_filter.filter_posts(work.posts, min_engagement=MIN_ENGAGEMENT)
+
+
+def bench_deduplicator(work: Workload):
+    deduplicator.deduplicate(work.filtered)
+
+
+def bench_trend_analyzer(work: Workload):
+    trend_analyzer.analyze(work.filtered, TOPIC)
+
+
+def bench_sentiment_analyzer(work: Workload):
+    sentiment_analyzer.analyze(work.filtered, use_cache=False)
+
+
+def bench_output_formatter(work: Workload):
+    data = work.report_data()
+    output_formatter.export_json(data, work.workdir / "report.json")
+    output_formatter.export_csv(data, work.workdir / "report.csv")
+    output_formatter.format_markdown(data)
+
+
+def bench_pipeline(work: Workload):
+    argv = [
+        TOPIC,
+        f"--input={work.corpus_file()}",
+        "--export=json",
+        "--sentiment",
+        "--no-store",
+        # Repeats would otherwise reuse the first run's memoized stages
+        "--recompute",
+        f"--output-dir={work.workdir / 'output'}",
+    ]
+    with contextlib.redirect_stdout(io.StringIO()):
+        exit_code = social_research.run(argv)
+    if exit_code:
+        raise RuntimeError(f"pipeline exited with {exit_code}")
+
+
+BENCHMARKS: Dict[str, Callable[[Workload], None]] = {
+    "engagement_filter": bench_engagement_filter,
+    "deduplicator": bench_deduplicator,
+    "trend_analyzer": bench_trend_analyzer,
+    "sentiment_analyzer": bench_sentiment_analyzer,
+    "output_formatter": bench_output_formatter,
+    "pipeline": bench_pipeline,
+}
+
+
+def time_best(func: Callable[[], None], repeat: int) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def projected_seconds(history: List[tuple], size: int) -> Optional[float]:
+    """Extrapolate a benchmark's time at `size` from its earlier (size, seconds) points."""
+    if not history:
+        return None
+    last_size, last_seconds = history[-1]
+    exponent = 1.0
+    if len(history) >= 2:
+        prev_size, prev_seconds = history[-2]
+        if prev_seconds > 0 and last_seconds > 0 and last_size != prev_size:
+            growth = math.log(last_seconds / prev_seconds) / math.log(last_size / prev_size)
+            exponent = max(1.0, growth)
+    return last_seconds * (size / last_size) ** exponent
+
+
+def run_benchmarks(
+    sizes: List[int],
+    names: List[str],
+    repeat: int,
+    budget: float,
+    corpus_options: Dict,
+    skip: Optional[set] = None,
+) -> Dict:
+    """
+    Time every benchmark at every size; return the results document.
+
+    skip holds (size, name) pairs not to run, e.g. those a baseline skipped.
+    """
+    print(f"Generating {max(sizes)} posts...", file=sys.stderr)
+    all_posts = corpus.generate(max(sizes), **corpus_options)
+
+    results = {}
+    history = {name: [] for name in names}
+
+    for size in sorted(sizes):
+        results[str(size)] = {}
+        with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+            work = Workload(all_posts[:size], Path(workdir))
+            for name in names:
+                if skip and (str(size), name) in skip:
+                    results[str(size)][name] = {"skipped": "skipped in baseline"}
+                    continue
+
+                projected = projected_seconds(history[name], size)
+                if projected is not None and projected > budget:
+                    results[str(size)][name] = {"skipped": f"projected {projected:.0f}s > budget"}
+                    print(f"  {size:>8} {name:<20} skipped (projected {projected:.0f}s)", file=sys.stderr)
+                    continue
+
+                seconds = time_best(lambda: BENCHMARKS[name](work), 1 if size >= 100000 else repeat)
+                history[name].append((size, seconds))
+                results[str(size)][name] = {
+                    "seconds": round(seconds, 6),
+                    "posts_per_s": round(size / seconds) if seconds else None,
+                }
+                print(f"  {size:>8} {name:<20} {seconds:9.3f}s", file=sys.stderr)
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": corpus_options,
+        "sizes": sorted(sizes),
+        "benchmarks": names,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float, min_delta: float) -> List[str]:
+    """Print a comparison table; return the regressed "size/benchmark" keys."""
+    regressions = []
+    print(f"{'size':>8} {'benchmark':<20} {'baseline':>10} {'current':>10} {'change':>8}")
+    for size, benchmarks in baseline["results"].items():
+        for name, before in benchmarks.items():
+            after = current["results"].get(size, {}).get(name)
+            if not after or "seconds" not in before or "seconds" not in after:
+                continue
+            change = after["seconds"] / before["seconds"] - 1 if before["seconds"] else 0.0
+            regressed = change > threshold and after["seconds"] - before["seconds"] > min_delta
+            flag = "  ❌ regression" if regressed else ""
+            print(
+                f"{size:>8} {name:<20} {before['seconds']:9.3f}s {after['seconds']:9.3f}s "
+                f"{change:+7.1%}{flag}"
+            )
+            if regressed:
+                regressions.append(f"{size}/{name}")
+    return regressions
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Scaling benchmark for the research pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmarks and save a results file")
+    run.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated corpus sizes")
+    run.add_argument("--only", help=f"Comma-separated benchmarks ({', '.join(BENCHMARKS)})")
+    run.add_argument("--repeat", type=int, default=3, help="Runs per benchmark (fastest is kept)")
+    run.add_argument("--budget", type=float, default=120, help="Max projected seconds per benchmark")
+    run.add_argument("--duplicate-rate", type=float, default=0.05, help="Corpus duplicate share")
+    run.add_argument("--vocab-size", type=int, default=5000, help="Corpus vocabulary size")
+    run.add_argument("--days", type=int, default=30, help="Corpus date spread in days")
+    run.add_argument("--seed", type=int, default=1, help="Corpus seed")
+    run.add_argument("--out", default=str(DEFAULT_BASELINE), help="Results file")
+
+    cmp = commands.add_parser("compare", help="Compare against a baseline")
+    cmp.add_argument("baseline", help="Baseline results file")
+    cmp.add_argument("--current", help="Results file to compare (default: run now)")
+    cmp.add_argument("--threshold", type=float, default=0.2, help="Regression ratio (default: 0.2)")
+    cmp.add_argument("--min-delta", type=float, default=0.005, help="Ignore smaller differences (s)")
+
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+
+    if args.command == "run":
+        names = args.only.split(",") if args.only else list(BENCHMARKS)
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            print(f"Unknown benchmark(s): {', '.join(unknown)}", file=sys.stderr)
+            return 2
+
+        corpus_options = {
+            "duplicate_rate": args.duplicate_rate,
+            "vocab_size": args.vocab_size,
+            "days": args.days,
+            "seed": args.seed,
+        }
+        sizes = [int(size) for size in args.sizes.split(",")]
+        results = run_benchmarks(sizes, names, args.repeat, args.budget, corpus_options)
+
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results: {args.out}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        skipped = {
+            (size, name)
+            for size, benchmarks in baseline["results"].items()
+            for name, result in benchmarks.items()
+            if "skipped" in result
+        }
+        current = run_benchmarks(
+            baseline["sizes"], baseline["benchmarks"], baseline["repeat"],
+            math.inf, baseline["corpus"], skip=skipped,
+        )
+
+    regressions = compare(baseline, current, args.threshold, args.min_delta)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+bench_startup.py - Cold-start benchmark for the offline entry points
+
+Runs each offline command under `python -X importtime`, sums the import time
+the command adds on top of bare interpreter startup, and fails if that exceeds
+the target or if any networking module gets imported.
+
+Usage:
+    python3 bench_startup.py [options]
+
+Options:
+    --target-ms=N         Maximum import time per scenario (default: 60)
+    --repeat=N            Runs per scenario; the fastest is reported (default: 5)
+    --json                Print results as JSON
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+
+OFFLINE_MODULES = (
+    "engagement_filter, deduplicator, trend_analyzer, content_suggester, "
+    "sentiment_analyzer, report_schema, output_formatter"
+)
+
+SCENARIOS = {
+    "help": [str(SCRIPTS_DIR / "social_research.py"), "--help"],
+    "offline-analysis": [
+        "-c",
+        f"import sys; sys.path.insert(0, {str(SCRIPTS_DIR)!r}); "
+        f"from lib import {OFFLINE_MODULES}",
+    ],
+}
+
+# None of these may be imported unless a command actually fetches
+NETWORK_MODULES = ("requests", "urllib3", "http.client", "ssl", "socket")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Parse -X importtime output into (module, depth, cumulative_us) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Nesting is shown as two extra spaces per level after the first one
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(cumulative)))
+    return rows
+
+
+def run_importtime(args: List[str]) -> List[Tuple[str, int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def measure(args: List[str], baseline: Set[str]) -> Dict:
+    """Import time added by a command beyond bare interpreter startup."""
+    rows = run_importtime(args)
+    top_level = [(name, us) for name, depth, us in rows if depth == 0 and name not in baseline]
+    imported = {name for name, _, _ in rows}
+    return {
+        "import_ms": sum(us for _, us in top_level) / 1000,
+        "slowest": sorted(top_level, key=lambda item: -item[1])[:5],
+        "network_modules": sorted(m for m in NETWORK_MODULES if m in imported),
+    }
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Offline cold-start benchmark")
+    parser.add_argument("--target-ms", type=float, default=60, help="Maximum import time per scenario")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario (fastest is kept)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+
+    baseline = {name for name, depth, _ in run_importtime(["-c", "pass"]) if depth == 0}
+
+    results = {}
+    for scenario, command in SCENARIOS.items():
+        runs = [measure(command, baseline) for _ in range(args.repeat)]
+        best = min(runs, key=lambda run: run["import_ms"])
+        best["passed"] = best["import_ms"] <= args.target_ms and not best["network_modules"]
+        results[scenario] = best
+
+    if args.json:
+        print(json.dumps({"target_ms": args.target_ms, "scenarios": results}, indent=2))
+    else:
+        for scenario, result in results.items():
+            status = "✅" if result["passed"] else "❌"
+            print(f"{status} {scenario}: {result['import_ms']:.1f} ms (target {args.target_ms:.0f} ms)")
+            for name, us in result["slowest"]:
+                print(f"     {us / 1000:7.1f} ms  {name}")
+            if result["network_modules"]:
+                print(f"     networking imported: {', '.join(result['network_modules'])}")
+
+    return 0 if all(result["passed"] for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+bench_tokenizer.py - Throughput benchmark for lib/tokenizer.py
+
+Tokenizes synthetic post texts (see corpus.py) with the tokenizer's keyword
+and word extraction, cold (caching disabled) and warm (every text already
+cached, as for the second and later analyses of a report), next to the
+regex-per-call keyword extraction the tokenizer replaced. A CJK corpus,
+built from Chinese words mixed with English product names, covers the
+segmentation backends.
+
+Usage:
+    python3 bench_tokenizer.py [options]
+
+Options:
+    --posts=N             Texts per corpus (default: 20000)
+    --repeat=N            Runs per benchmark; the fastest is kept (default: 3)
+    --seed=N              Corpus seed (default: 1)
+    --json                Print results as JSON
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "scripts"))
+
+import corpus
+from lib import tokenizer
+
+CJK_WORDS = [
+    "人工智能", "编程", "代码", "助手", "模型", "开发者", "工具", "效率", "调试", "补全",
+    "速度", "体验", "价格", "问题", "推荐", "插件", "编辑器", "项目", "团队", "测试",
+]
+LATIN_WORDS = ["Cursor", "Copilot", "ChatGPT", "Claude", "VSCode", "Python", "React"]
+PARTICLES = ["的", "很", "了", "是", "在", "，", "。", "！"]
+
+
+def legacy_keywords(text: str, min_length: int = 3) -> List[str]:
+    """Keyword extraction before the tokenizer: three substitutions and a pattern per call."""
+    text = re.sub(r'http\S+|www\.\S+', '', text)
+    text = re.sub(r'@\w+', '', text)
+    text = re.sub(r'#\w+', '', text)
+    words = re.findall(r'\b[a-zA-Z]{' + str(min_length) + r',}\b', text.lower())
+    return [w for w in words if w not in tokenizer.STOP_WORDS["en"]]
+
+
+def latin_texts(count: int, seed: int) -> List[str]:
+    texts = []
+    for post in corpus.CorpusGenerator(seed=seed).posts(count):
+        texts.append(f"{post.get('title', '')} {post.get('text', '')}".strip())
+    return texts
+
+
+def cjk_texts(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(8, 30)):
+            roll = rng.random()
+            if roll < 0.15:
+                parts.append(f" {rng.choice(LATIN_WORDS)} ")
+            elif roll < 0.45:
+                parts.append(rng.choice(PARTICLES))
+            else:
+                parts.append(rng.choice(CJK_WORDS))
+        texts.append("".join(parts))
+    return texts
+
+
+def time_best(func: Callable[[], None], repeat: int) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(texts: List[str], repeat: int, backends: List[str]) -> Dict[str, float]:
+    """Seconds per benchmark over all texts."""
+    results = {"legacy_keywords": time_best(lambda: [legacy_keywords(t) for t in texts], repeat)}
+
+    for backend in backends:
+        cold = tokenizer.Tokenizer(cjk_backend=backend, cache_size=0)
+        results[f"{backend}_keywords_cold"] = time_best(
+            lambda: [cold.keywords(t) for t in texts], repeat
+        )
+        results[f"{backend}_words_cold"] = time_best(lambda: [cold.words(t) for t in texts], repeat)
+
+        warm = tokenizer.Tokenizer(cjk_backend=backend, cache_size=len(texts))
+        for text in texts:
+            warm.keywords(text)
+        results[f"{backend}_keywords_warm"] = time_best(
+            lambda: [warm.keywords(t) for t in texts], repeat
+        )
+    return results
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Tokenizer throughput benchmark")
+    parser.add_argument("--posts", type=int, default=20000, help="Texts per corpus (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark (default: 3)")
+    parser.add_argument("--seed", type=int, default=1, help="Corpus seed (default: 1)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+    backends = ["bigram"] + (["jieba"] if tokenizer._jieba_available() else [])
+
+    report = {}
+    for name, texts in (
+        ("latin", latin_texts(args.posts, args.seed)),
+        ("cjk", cjk_texts(args.posts, args.seed)),
+    ):
+        report[name] = run(texts, args.repeat, backends)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{'corpus':<8} {'benchmark':<24} {'seconds':>9} {'texts/s':>10}")
+    for name, results in report.items():
+        for bench, seconds in results.items():
+            rate = args.posts / seconds if seconds else 0
+            print(f"{name:<8} {bench:<24} {seconds:9.3f} {rate:10.0f}")
+    if "jieba" not in backends:
+        print("\n(jieba not installed: only the bigram backend was measured)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+corpus.py - Synthetic Reddit/Twitter corpus generator for benchmarks
+
+Builds posts shaped like the fixtures in fixtures/sample_data.json: the same
+fields, engagement on a long-tailed distribution, Zipf-distributed words
+drawn from the fixture text, the sentiment lexicon and generated filler
+words, and a controllable share of exact and near duplicates. The same
+seed always produces the same corpus.
+
+Usage:
+    python3 corpus.py --posts=N [options]
+
+Options:
+    --posts=N             Number of posts (default: 10000)
+    --duplicate-rate=R    Share of posts copied from earlier ones (default: 0.05)
+    --vocab-size=N        Distinct words to draw from (default: 5000)
+    --days=N              Days the posts are spread over (default: 30)
+    --twitter-share=R     Share of posts from Twitter (default: 0.5)
+    --seed=N              Random seed (default: 1)
+    --out=PATH            Output file, .jsonl or .jsonl.gz (default: stdout)
+"""
+
+import argparse
+import gzip
+import json
+import random
+import re
+import sys
+from datetime import datetime, timezone
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+SKILL_DIR = Path(__file__).resolve().parent.parent
+FIXTURES = SKILL_DIR / "fixtures" / "sample_data.json"
+sys.path.insert(0, str(SKILL_DIR / "scripts"))
+
+SUBREDDITS = ["programming", "webdev", "javascript", "python", "MachineLearning", "technology"]
+ZIPF_EXPONENT = 1.1
+NEAR_DUPLICATE_SHARE = 0.5
+RECENT_POSTS = 1000
+
+_CONSONANTS = "bcdfghklmnprstvz"
+_VOWELS = "aeiou"
+
+
+def load_fixtures() -> Dict[str, List[Dict]]:
+    with open(FIXTURES) as f:
+        data = json.load(f)
+    return {"reddit": data["reddit_sample"], "twitter": data["twitter_sample"]}
+
+
+def build_vocabulary(fixtures: Dict[str, List[Dict]], size: int, rng: random.Random) -> List[str]:
+    """
+    Return `size` distinct words, most frequent first.
+
+    Fixture words come first, then sentiment lexicon words, then generated
+    pronounceable filler words.
+    """
+    from lib import sentiment_analyzer
+
+    words = []
+    for posts in fixtures.values():
+        for post in posts:
+            text = f"{post.get('title', '')} {post.get('text', '')}"
+            words.extend(w for w in re.findall(r"[a-z]+", text.lower()) if len(w) > 1)
+    words.extend(sorted(sentiment_analyzer.POSITIVE_WORDS | sentiment_analyzer.NEGATIVE_WORDS))
+
+    vocabulary = list(dict.fromkeys(words))[:size]
+    seen = set(vocabulary)
+    while len(vocabulary) < size:
+        word = "".join(
+            rng.choice(_CONSONANTS) + rng.choice(_VOWELS) for _ in range(rng.randint(2, 4))
+        )
+        if word not in seen:
+            seen.add(word)
+            vocabulary.append(word)
+    return vocabulary
+
+
+class CorpusGenerator:
+    """Deterministic stream of synthetic posts."""
+
+    def __init__(
+        self,
+        duplicate_rate: float = 0.05,
+        vocab_size: int = 5000,
+        days: int = 30,
+        twitter_share: float = 0.5,
+        seed: int = 1,
+    ):
+        self.rng = random.Random(seed)
+        self.duplicate_rate = duplicate_rate
+        self.twitter_share = twitter_share
+        self.fixtures = load_fixtures()
+        self.vocabulary = build_vocabulary(self.fixtures, vocab_size, self.rng)
+        self.cum_weights = list(
+            accumulate(1 / rank ** ZIPF_EXPONENT for rank in range(1, vocab_size + 1))
+        )
+        self.hashtags = sorted({
+            tag.lower()
+            for post in self.fixtures["twitter"]
+            for tag in re.findall(r"#(\w+)", post["text"])
+        }) + self.vocabulary[:50]
+
+        # Spread posts over `days` ending at the newest fixture post
+        newest = max(post["created_utc"] for post in self.fixtures["reddit"])
+        self.end_ts = newest
+        self.start_ts = newest - days * 86400
+
+    def _words(self, low: int, high: int) -> str:
+        count = self.rng.randint(low, high)
+        return " ".join(self.rng.choices(self.vocabulary, cum_weights=self.cum_weights, k=count))
+
+    def _engagement(self, mu: float) -> int:
+        return int(self.rng.lognormvariate(mu, 1.4))
+
+    def _timestamp(self) -> int:
+        return self.rng.randint(self.start_ts, self.end_ts)
+
+    def _reddit(self, index: int) -> Dict:
+        ts = self._timestamp()
+        post_id = f"r{index:x}"
+        subreddit = self.rng.choice(SUBREDDITS)
+        return {
+            "id": post_id,
+            "title": self._words(5, 14).capitalize(),
+            "text": self._words(10, 80),
+            "author": f"user{self.rng.randint(1, 50000)}",
+            "subreddit": subreddit,
+            "url": f"https://reddit.com/r/{subreddit}/comments/{post_id}",
+            "score": self._engagement(3.0),
+            "num_comments": self._engagement(2.0),
+            "created_utc": ts,
+            "created_date": datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None).isoformat(),
+            "platform": "reddit",
+        }
+
+    def _twitter(self, index: int) -> Dict:
+        ts = self._timestamp()
+        post_id = str(1_700_000_000_000 + index)
+        author = f"dev{self.rng.randint(1, 50000)}"
+        text = self._words(8, 40)
+        tags = self.rng.sample(self.hashtags, self.rng.randint(0, 3))
+        if tags:
+            text += " " + " ".join(f"#{tag}" for tag in tags)
+        return {
+            "id": post_id,
+            "text": text,
+            "author": author,
+            "author_name": author.title(),
+            "url": f"https://twitter.com/{author}/status/{post_id}",
+            "likes": self._engagement(3.2),
+            "retweets": self._engagement(1.8),
+            "replies": self._engagement(1.2),
+            "created_at": datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "platform": "twitter",
+        }
+
+    def _duplicate(self, original: Dict, index: int) -> Dict:
+        """Copy a post under a new ID, exactly or with one word changed."""
+        post = dict(original)
+        if post["platform"] == "reddit":
+            post["id"] = f"r{index:x}"
+            post["url"] = f"https://reddit.com/r/{post['subreddit']}/comments/{post['id']}"
+        else:
+            post["id"] = str(1_700_000_000_000 + index)
+            post["url"] = f"https://twitter.com/{post['author']}/status/{post['id']}"
+
+        if self.rng.random() < NEAR_DUPLICATE_SHARE:
+            words = post["text"].split()
+            if words:
+                words[self.rng.randrange(len(words))] = self.rng.choice(self.vocabulary)
+                post["text"] = " ".join(words)
+        return post
+
+    def posts(self, count: int) -> Iterator[Dict]:
+        """Yield `count` posts."""
+        recent: List[Dict] = []
+        for index in range(count):
+            if recent and self.rng.random() < self.duplicate_rate:
+                yield self._duplicate(self.rng.choice(recent), index)
+                continue
+
+            if self.rng.random() < self.twitter_share:
+                post = self._twitter(index)
+            else:
+                post = self._reddit(index)
+
+            if len(recent) < RECENT_POSTS:
+                recent.append(post)
+            else:
+                recent[self.rng.randrange(RECENT_POSTS)] = post
+            yield post
+
+
+def generate(count: int, **options) -> List[Dict]:
+    """Return a list of `count` synthetic posts (see CorpusGenerator for options)."""
+    return list(CorpusGenerator(**options).posts(count))
+
+
+def write_jsonl(posts, path: Path) -> int:
+    """Write posts as JSON Lines (gzip-compressed for .gz); return the count."""
+    opener = gzip.open if path.suffix == ".gz" else open
+    count = 0
+    with opener(path, "wt", encoding="utf-8") as f:
+        for post in posts:
+            f.write(json.dumps(post, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic social media corpus")
+    parser.add_argument("--posts", type=int, default=10000, help="Number of posts (default: 10000)")
+    parser.add_argument(
+        "--duplicate-rate", type=float, default=0.05, help="Share of duplicated posts (default: 0.05)"
+    )
+    parser.add_argument("--vocab-size", type=int, default=5000, help="Distinct words (default: 5000)")
+    parser.add_argument(
+        "--days", type=int, default=30, help="Days the posts are spread over (default: 30)"
+    )
+    parser.add_argument(
+        "--twitter-share", type=float, default=0.5, help="Share of Twitter posts (default: 0.5)"
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    parser.add_argument("--out", help="Output .jsonl or .jsonl.gz file (default: stdout)")
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+    generator = CorpusGenerator(
+        duplicate_rate=args.duplicate_rate,
+        vocab_size=args.vocab_size,
+        days=args.days,
+        twitter_share=args.twitter_share,
+        seed=args.seed,
+    )
+
+    if args.out:
+        count = write_jsonl(generator.posts(args.posts), Path(args.out))
+        print(f"Wrote {count} posts to {args.out}", file=sys.stderr)
+    else:
+        for post in generator.posts(args.posts):
+            print(json.dumps(post, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+"""
+mock_api.py - Local stand-in for the Reddit, Pushshift and X search APIs
+
+Serves synthetic search results (see corpus.py) in the shapes the fetchers
+read: Reddit listings paged with `after`, Pushshift submission searches by
+time range and score, and X v2 recent search paged with `next_token`.
+Responses are delayed by a configurable latency distribution, a share of
+them can fail (503) or be throttled (429), and every API enforces a
+fixed-window request quota reported in its rate-limit headers. Nothing
+leaves the machine.
+
+Point the fetchers at it with the variables it prints:
+REDDIT_AUTH_URL, REDDIT_API_URL, PUSHSHIFT_API_URL and TWITTER_API_URL.
+GET /_stats returns request counts per API and status; POST /_reset
+clears them and the quotas.
+
+Usage:
+    python3 mock_api.py [options]
+
+Options:
+    --host=HOST           Interface to listen on (default: 127.0.0.1)
+    --port=N              Port (default: 8800; 0 picks a free one)
+    --latency=SPEC        Response delay: fixed:MS, uniform:LOW_MS,HIGH_MS or
+                          lognormal:MEDIAN_MS,SIGMA (default: lognormal:50,0.6)
+    --error-rate=R        Share of requests answered 503 (default: 0)
+    --throttle-rate=R     Share of requests answered 429 regardless of quota
+                          (default: 0)
+    --quota=API=N/S       Allow N requests per S seconds for reddit, twitter or
+                          pushshift; "none" disables quotas (repeatable;
+                          default: reddit=100/60, twitter=450/900,
+                          pushshift=120/60)
+    --results=N           Results each query has in total (default: 1000)
+    --seed=N              Seed for results, latency and injected failures
+                          (default: 1)
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import corpus
+
+DEFAULT_LATENCY = "lognormal:50,0.6"
+# Requests allowed per window, like the real APIs' app-level limits
+DEFAULT_QUOTAS = {"reddit": (100, 60.0), "twitter": (450, 900.0), "pushshift": (120, 60.0)}
+RESULTS_PER_QUERY = 1000
+# Days of history each query's results are spread over, ending now
+HISTORY_DAYS = 30
+
+REDDIT_PAGE_MAX = 100
+PUSHSHIFT_PAGE_MAX = 100
+TWITTER_PAGE_MIN = 10
+TWITTER_PAGE_MAX = 100
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Turn a --latency spec into a function returning a delay in seconds."""
+    kind, _, params = spec.partition(":")
+    try:
+        values = [float(value) for value in params.split(",")]
+    except ValueError:
+        values = []
+    if kind == "fixed" and len(values) == 1:
+        delay = values[0] / 1000
+        return lambda rng: delay
+    if kind == "uniform" and len(values) == 2:
+        low, high = values[0] / 1000, values[1] / 1000
+        return lambda rng: rng.uniform(low, high)
+    if kind == "lognormal" and len(values) == 2 and values[0] > 0:
+        mu, sigma = math.log(values[0] / 1000), values[1]
+        return lambda rng: rng.lognormvariate(mu, sigma)
+    raise argparse.ArgumentTypeError(
+        f"invalid latency: {spec} (use fixed:MS, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA)"
+    )
+
+
+def latency_spec(spec: str) -> str:
+    """Validate a --latency spec."""
+    parse_latency(spec)
+    return spec
+
+
+def parse_quota(value: str) -> Tuple[str, Optional[Tuple[int, float]]]:
+    """Turn a --quota API=N/SECONDS (or "none") into (api, (limit, window))."""
+    if value == "none":
+        return "*", None
+    api, _, quota = value.partition("=")
+    if api not in DEFAULT_QUOTAS:
+        raise argparse.ArgumentTypeError(f"unknown API in quota: {api}")
+    if quota == "none":
+        return api, None
+    try:
+        limit, _, window = quota.partition("/")
+        return api, (int(limit), float(window))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid quota: {value} (use API=N/SECONDS)")
+
+
+class FixedWindow:
+    """Request quota of limit requests per window seconds."""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.start = time.time()
+        self.used = 0
+
+    def take(self) -> bool:
+        """Count a request; return whether it fits the quota."""
+        now = time.time()
+        if now - self.start >= self.window:
+            self.start += (now - self.start) // self.window * self.window
+            self.used = 0
+        if self.used >= self.limit:
+            return False
+        self.used += 1
+        return True
+
+    @property
+    def remaining(self) -> int:
+        return max(self.limit - self.used, 0)
+
+    @property
+    def reset_at(self) -> float:
+        return self.start + self.window
+
+
+class MockApi:
+    """Result pools, quotas, failure injection and request stats shared by handlers."""
+
+    def __init__(
+        self,
+        latency: str = DEFAULT_LATENCY,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        quotas: Optional[Dict[str, Optional[Tuple[int, float]]]] = None,
+        results: int = RESULTS_PER_QUERY,
+        seed: int = 1,
+    ):
+        self.delay = parse_latency(latency)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.quota_settings = dict(DEFAULT_QUOTAS if quotas is None else quotas)
+        self.results = results
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pools: Dict[Tuple[str, str], List[Dict]] = {}
+        self.reset()
+
+    def reset(self):
+        """Clear the stats and start every quota over."""
+        with self._lock:
+            self.quotas = {
+                api: FixedWindow(*quota) for api, quota in self.quota_settings.items() if quota
+            }
+            self.stats: Dict[str, Dict] = {}
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return json.loads(json.dumps(self.stats))
+
+    def _record(self, api: str, status: int, posts: int, delay: float):
+        stats = self.stats.setdefault(api, {"requests": 0, "statuses": {}, "posts": 0, "delay_s": 0.0})
+        stats["requests"] += 1
+        stats["statuses"][str(status)] = stats["statuses"].get(str(status), 0) + 1
+        stats["posts"] += posts
+        stats["delay_s"] = round(stats["delay_s"] + delay, 6)
+
+    def pool(self, platform: str, query: str) -> List[Dict]:
+        """The query's results: a deterministic synthetic corpus ending now."""
+        key = (platform, query)
+        with self._lock:
+            posts = self._pools.get(key)
+        if posts is not None:
+            return posts
+
+        generator = corpus.CorpusGenerator(
+            days=HISTORY_DAYS,
+            twitter_share=1.0 if platform == "twitter" else 0.0,
+            seed=zlib.crc32(f"{platform}:{query}".encode("utf-8")) ^ self.seed,
+        )
+        shift = int(time.time()) - generator.end_ts
+        posts = list(generator.posts(self.results))
+        for post in posts:
+            if platform == "twitter":
+                created = datetime.strptime(post["created_at"], "%Y-%m-%dT%H:%M:%SZ")
+                ts = created.replace(tzinfo=timezone.utc).timestamp() + shift
+                post["created_at"] = datetime.fromtimestamp(ts, timezone.utc).strftime(
+                    "%Y-%m-%dT%H:%M:%S.000Z"
+                )
+                post["created_utc"] = ts
+            else:
+                post["created_utc"] += shift
+        if platform == "twitter":
+            # Recent search returns the newest tweets first
+            posts.sort(key=lambda post: post["created_utc"], reverse=True)
+        with self._lock:
+            return self._pools.setdefault(key, posts)
+
+    def admit(self, api: str) -> Tuple[int, Dict[str, str], float]:
+        """
+        Decide a request's fate before it is served.
+
+        Returns (status, rate-limit headers, delay): 200 to serve it, 429
+        when throttled or over quota, 503 for an injected failure.
+        """
+        with self._lock:
+            delay = self.delay(self._rng)
+            roll = self._rng.random()
+            quota = self.quotas.get(api)
+            allowed = quota.take() if quota else True
+
+        headers = {}
+        if quota:
+            reset_in = max(quota.reset_at - time.time(), 0)
+            if api == "twitter":
+                headers = {
+                    "x-rate-limit-limit": str(quota.limit),
+                    "x-rate-limit-remaining": str(quota.remaining),
+                    "x-rate-limit-reset": str(int(quota.reset_at)),
+                }
+            else:
+                headers = {
+                    "X-Ratelimit-Used": str(quota.used),
+                    "X-Ratelimit-Remaining": str(quota.remaining),
+                    "X-Ratelimit-Reset": str(int(math.ceil(reset_in))),
+                }
+            if not allowed:
+                headers["Retry-After"] = str(int(math.ceil(reset_in)))
+
+        if not allowed or roll < self.throttle_rate:
+            headers.setdefault("Retry-After", "1")
+            return 429, headers, delay
+        if roll < self.throttle_rate + self.error_rate:
+            return 503, headers, delay
+        return 200, headers, delay
+
+    def record(self, api: str, status: int, posts: int, delay: float):
+        with self._lock:
+            self._record(api, status, posts, delay)
+
+
+def _int_param(params: Dict[str, List[str]], name: str, default: int) -> int:
+    try:
+        return int(params[name][0])
+    except (KeyError, ValueError):
+        return default
+
+
+def _param(params: Dict[str, List[str]], name: str) -> Optional[str]:
+    values = params.get(name)
+    return values[0] if values else None
+
+
+def _twitter_time(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def reddit_listing(api: MockApi, params: Dict[str, List[str]]) -> Dict:
+    """A /search listing page: children after the `after` fullname."""
+    posts = api.pool("reddit", _param(params, "q") or "")
+    limit = min(max(_int_param(params, "limit", 25), 1), REDDIT_PAGE_MAX)
+    start = 0
+    after = _param(params, "after")
+    if after:
+        ids = {f"t3_{post['id']}": i for i, post in enumerate(posts)}
+        start = ids.get(after, len(posts) - 1) + 1
+    page = posts[start:start + limit]
+    children = [{
+        "kind": "t3",
+        "data": {
+            "id": post["id"],
+            "name": f"t3_{post['id']}",
+            "title": post["title"],
+            "selftext": post["text"],
+            "author": post["author"],
+            "subreddit": post["subreddit"],
+            "subreddit_name_prefixed": f"r/{post['subreddit']}",
+            "permalink": f"/r/{post['subreddit']}/comments/{post['id']}/",
+            "url": post["url"],
+            "score": post["score"],
+            "ups": post["score"],
+            "upvote_ratio": 0.9,
+            "num_comments": post["num_comments"],
+            "created_utc": float(post["created_utc"]),
+            "over_18": False,
+            "stickied": False,
+            "link_flair_text": None,
+        },
+    } for post in page]
+    more = start + limit < len(posts)
+    return {
+        "kind": "Listing",
+        "data": {
+            "after": f"t3_{page[-1]['id']}" if page and more else None,
+            "before": None,
+            "dist": len(children),
+            "children": children,
+        },
+    }
+
+
+def pushshift_search(api: MockApi, params: Dict[str, List[str]]) -> Dict:
+    """Submissions created in [after, before), highest score first."""
+    posts = api.pool("reddit", _param(params, "q") or "")
+    after = _int_param(params, "after", 0)
+    before = _int_param(params, "before", sys.maxsize)
+    size = min(max(_int_param(params, "size", 25), 1), PUSHSHIFT_PAGE_MAX)
+    found = [post for post in posts if after <= post["created_utc"] < before]
+    found.sort(key=lambda post: post["score"], reverse=True)
+    return {"data": [{
+        "id": post["id"],
+        "title": post["title"],
+        "selftext": post["text"],
+        "author": post["author"],
+        "subreddit": post["subreddit"],
+        "permalink": f"/r/{post['subreddit']}/comments/{post['id']}/",
+        "score": post["score"],
+        "num_comments": post["num_comments"],
+        "created_utc": post["created_utc"],
+    } for post in found[:size]]}
+
+
+def twitter_search(api: MockApi, params: Dict[str, List[str]]) -> Dict:
+    """A recent-search page of tweets in the time range, after next_token."""
+    query = (_param(params, "query") or "").replace(" -is:retweet lang:en", "")
+    posts = api.pool("twitter", query)
+    start_time = _twitter_time(_param(params, "start_time"))
+    end_time = _twitter_time(_param(params, "end_time"))
+    found = [
+        post for post in posts
+        if (start_time is None or post["created_utc"] >= start_time)
+        and (end_time is None or post["created_utc"] <= end_time)
+    ]
+    size = min(max(_int_param(params, "max_results", 10), TWITTER_PAGE_MIN), TWITTER_PAGE_MAX)
+    token = _param(params, "pagination_token")
+    start = int(token[4:], 16) if token and token.startswith("next") else 0
+    page = found[start:start + size]
+
+    meta = {"result_count": len(page)}
+    if page:
+        meta["newest_id"] = page[0]["id"]
+        meta["oldest_id"] = page[-1]["id"]
+    if start + size < len(found):
+        meta["next_token"] = f"next{start + size:x}"
+
+    authors = {post["author"]: post for post in page}
+    body = {"meta": meta}
+    if page:
+        body["data"] = [{
+            "id": post["id"],
+            "text": post["text"],
+            "author_id": str(zlib.crc32(post["author"].encode("utf-8"))),
+            "conversation_id": post["id"],
+            "created_at": post["created_at"],
+            "lang": "en",
+            "public_metrics": {
+                "like_count": post["likes"],
+                "retweet_count": post["retweets"],
+                "reply_count": post["replies"],
+                "quote_count": 0,
+            },
+        } for post in page]
+        body["includes"] = {"users": [{
+            "id": str(zlib.crc32(author.encode("utf-8"))),
+            "username": author,
+            "name": post["author_name"],
+        } for author, post in authors.items()]}
+    return body
+
+
+ROUTES = {
+    "/search": ("reddit", reddit_listing),
+    "/reddit/search/submission": ("pushshift", pushshift_search),
+    "/2/tweets/search/recent": ("twitter", twitter_search),
+}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MockSearchAPI/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: Dict, headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        api: MockApi = self.server.api
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        path = urlparse(self.path).path
+        if path == "/api/v1/access_token":
+            self._send(200, {"access_token": "mock-token", "token_type": "bearer", "expires_in": 3600})
+        elif path == "/_reset":
+            api.reset()
+            self._send(200, {"reset": True})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_GET(self):
+        api: MockApi = self.server.api
+        url = urlparse(self.path)
+        if url.path == "/_stats":
+            self._send(200, api.snapshot())
+            return
+        route = ROUTES.get(url.path.rstrip("/") or url.path)
+        if route is None:
+            self._send(404, {"error": "not found"})
+            return
+
+        name, build = route
+        status, headers, delay = api.admit(name)
+        time.sleep(delay)
+        if status == 200:
+            body = build(api, parse_qs(url.query))
+            posts = len(body.get("data", {}).get("children", [])) if name == "reddit" else len(
+                body.get("data", [])
+            )
+        else:
+            body = {"error": "Too Many Requests" if status == 429 else "Service Unavailable"}
+            posts = 0
+        api.record(name, status, posts, delay)
+        self._send(status, body, headers)
+
+
+class MockApiServer:
+    """
+    The mock APIs on a background thread.
+
+        with MockApiServer(latency="fixed:20") as server:
+            os.environ.update(server.env())
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **options):
+        self.api = MockApi(**options)
+        self.httpd = ThreadingHTTPServer((host, port), MockHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.api = self.api
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that point the fetchers at this server."""
+        return {
+            "REDDIT_AUTH_URL": self.url,
+            "REDDIT_API_URL": self.url,
+            "PUSHSHIFT_API_URL": self.url,
+            "TWITTER_API_URL": self.url,
+        }
+
+    def start(self) -> "MockApiServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def quota_options(values: List[Tuple[str, Optional[Tuple[int, float]]]]) -> Dict:
+    """Default quotas overridden by --quota values."""
+    quotas = dict(DEFAULT_QUOTAS)
+    for api, quota in values or []:
+        if api == "*":
+            quotas = {name: None for name in quotas}
+        else:
+            quotas[api] = quota
+    return quotas
+
+
+def add_server_arguments(parser: argparse.ArgumentParser):
+    """Options shared by this server and the load-test harness."""
+    parser.add_argument("--latency", default=DEFAULT_LATENCY, type=latency_spec,
+                        help=f"Response delay distribution (default: {DEFAULT_LATENCY})")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Share of requests answered 503 (default: 0)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0,
+                        help="Share of requests answered 429 regardless of quota (default: 0)")
+    parser.add_argument("--quota", type=parse_quota, action="append", metavar="API=N/S",
+                        help="Requests per window for an API, or none (repeatable)")
+    parser.add_argument("--results", type=int, default=RESULTS_PER_QUERY,
+                        help=f"Results each query has in total (default: {RESULTS_PER_QUERY})")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+
+
+def server_options(args) -> Dict:
+    return {
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "throttle_rate": args.throttle_rate,
+        "quotas": quota_options(args.quota),
+        "results": args.results,
+        "seed": args.seed,
+    }
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Local mock of the Reddit, Pushshift and X search APIs")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8800, help="Port (default: 8800)")
+    add_server_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+    server = MockApiServer(args.host, args.port, **server_options(args))
+    print(f"Mock search APIs listening on {server.url}", file=sys.stderr)
+    for name, value in server.env().items():
+        print(f"export {name}={value}")
+    print("export REDDIT_CLIENT_ID=mock REDDIT_CLIENT_SECRET=mock TWITTER_BEARER_TOKEN=mock")
+    sys.stdout.flush()
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+batch_research.py - Research many topics in one process with shared API budgets
+
+Every job runs the same pipeline as social_research.py, but all jobs share
+one HTTP session pool and one request budget per API, so they queue for the
+rate limit instead of racing each other for it. Failed platform searches
+are retried with backoff before the job's report is written.
+
+Usage:
+    python3 batch_research.py [topic ...] [--jobs=FILE] [options] [social_research options]
+
+Options:
+    --jobs=FILE               Job list: JSON array of topics or of
+                              {"topic", "priority", "options"} objects, or a
+                              text file with one topic per line
+    --priority=N              Priority of topics given on the command line
+                              (default: 0; higher runs first)
+    --max-workers=N           Concurrent tasks (default: 6)
+    --platform-concurrency=N  Concurrent searches per platform (default: 2)
+    --retries=N               Retries per failed platform search (default: 2)
+    --retry-delay=SECONDS     First retry delay, doubled per retry (default: 30)
+    --reddit-rate=R           Reddit/Pushshift requests per second (default: 1)
+    --twitter-rate=R          Twitter requests per second (default: 1)
+    --quiet                   Only print the batch summary
+
+Any other option (e.g. --days=7 --export=md,json) is passed to every job
+before its own options.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import social_research
+from lib import http_pool, job_output, scheduler
+
+
+def parse_args():
+    """Parse command line arguments; unknown options are shared job options."""
+    parser = argparse.ArgumentParser(
+        description="Research many topics with shared API budgets",
+    )
+    parser.add_argument("topics", nargs="*", help="Topics to research")
+    parser.add_argument("--jobs", metavar="FILE", help="JSON or text job list")
+    parser.add_argument(
+        "--priority", type=int, default=0,
+        help="Priority of command-line topics (default: 0; higher runs first)",
+    )
+    parser.add_argument("--max-workers", type=int, default=6, help="Concurrent tasks (default: 6)")
+    parser.add_argument(
+        "--platform-concurrency", type=int, default=2,
+        help="Concurrent searches per platform (default: 2)",
+    )
+    parser.add_argument(
+        "--retries", type=int, default=2,
+        help="Retries per failed platform search (default: 2)",
+    )
+    parser.add_argument(
+        "--retry-delay", type=float, default=30.0,
+        help="First retry delay in seconds, doubled per retry (default: 30)",
+    )
+    parser.add_argument(
+        "--reddit-rate", type=float, default=http_pool.RATE_LIMITS["reddit"],
+        help="Reddit/Pushshift requests per second (default: 1)",
+    )
+    parser.add_argument(
+        "--twitter-rate", type=float, default=http_pool.RATE_LIMITS["twitter"],
+        help="Twitter requests per second (default: 1)",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Only print the batch summary")
+
+    args, shared_options = parser.parse_known_args()
+    if not args.topics and not args.jobs:
+        parser.error("give at least one topic or --jobs=FILE")
+    return args, shared_options
+
+
+def load_jobs(path: str, shared_options: List[str]) -> List[scheduler.ResearchJob]:
+    """Read a JSON or plain-text job list."""
+    text = Path(path).read_text(encoding="utf-8")
+
+    if path.endswith(".json"):
+        entries = json.loads(text)
+    else:
+        entries = [
+            line.strip() for line in text.splitlines()
+            if line.strip() and not line.strip().startswith("#")
+        ]
+
+    jobs = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"topic": entry}
+        argv = [entry["topic"], *shared_options, *entry.get("options", [])]
+        jobs.append(scheduler.ResearchJob(argv, priority=entry.get("priority", 0)))
+    return jobs
+
+
+def fetch(job: scheduler.ResearchJob, platform: str) -> dict:
+    """Search one platform for a job, with its output captured."""
+    with job_output.capture(job.output, job.output):
+        args = social_research.parse_args(job.argv)
+        if args.input or args.from_store:
+            # Nothing to fetch; the report reads local data
+            return {"platform": platform, "results": [], "error": None}
+
+        start_date, end_date = social_research.calculate_date_range(args.days, args.end_date)
+        return social_research.search_platform(args, platform, start_date, end_date)
+
+
+def report(job: scheduler.ResearchJob) -> int:
+    """Run the rest of the pipeline on a job's fetched results."""
+    with job_output.capture(job.output, job.output):
+        return social_research.run(job.argv, fetched=job.results)
+
+
+def main():
+    """Main execution function."""
+    args, shared_options = parse_args()
+
+    jobs = [
+        scheduler.ResearchJob([topic, *shared_options], priority=args.priority)
+        for topic in args.topics
+    ]
+    if args.jobs:
+        jobs.extend(load_jobs(args.jobs, shared_options))
+
+    # Reject bad job options before any request is made
+    for job in jobs:
+        social_research.parse_args(job.argv)
+
+    http_pool.set_rate_limit("reddit", args.reddit_rate)
+    http_pool.set_rate_limit("pushshift", args.reddit_rate)
+    http_pool.set_rate_limit("twitter", args.twitter_rate)
+    job_output.install()
+
+    print(f"🗓️  Running {len(jobs)} research jobs "
+          f"({args.max_workers} workers, {args.reddit_rate:g} Reddit req/s, "
+          f"{args.twitter_rate:g} Twitter req/s)\n")
+
+    print_lock = threading.Lock()
+
+    def on_done(job: scheduler.ResearchJob):
+        with print_lock:
+            status = "✅" if job.exit_code == 0 else "❌"
+            print(f"{status} Finished: {job.topic} ({job.duration:.1f}s, {job.retries} retries)")
+            if not args.quiet:
+                print(job.output.getvalue())
+
+    started = time.monotonic()
+    runner = scheduler.Scheduler(
+        fetch,
+        report,
+        max_workers=args.max_workers,
+        platform_concurrency=args.platform_concurrency,
+        max_retries=args.retries,
+        retry_delay=args.retry_delay,
+    )
+    try:
+        runner.run(jobs, on_done=on_done)
+    finally:
+        http_pool.close_sessions()
+    elapsed = time.monotonic() - started
+
+    # Print batch summary
+    print(f"\n{'='*60}")
+    print("BATCH SUMMARY")
+    print(f"{'='*60}\n")
+
+    failed = 0
+    for job in jobs:
+        errors = [r["error"] for r in job.results.values() if r.get("error")]
+        if job.exit_code != 0:
+            failed += 1
+        status = "✅" if job.exit_code == 0 and not errors else ("⚠️ " if job.exit_code == 0 else "❌")
+        line = f"{status} {job.topic}: {job.duration:.1f}s, {job.retries} retries"
+        if errors:
+            line += f" ({'; '.join(errors)})"
+        print(line)
+
+    print(f"\n✨ {len(jobs) - failed}/{len(jobs)} jobs succeeded in {elapsed:.1f}s\n")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Batch interrupted by user")
+        sys.exit(1)
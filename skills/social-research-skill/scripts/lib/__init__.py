@@ -1,19 +1,15 @@
 """
 Social Research Skill - Library modules
+
+Submodules are imported on first attribute access, so commands that never
+touch the network (``--help``, offline analysis) don't pay for importing
+``requests`` and the rest of the fetch stack.
 """
 
-from . import (
-    reddit_search,
-    twitter_search,
-    engagement_filter,
-    deduplicator,
-    trend_analyzer,
-    content_suggester,
-    sentiment_analyzer,
-    output_formatter,
-)
+import importlib
 
 __all__ = [
+    "http_pool",
     "reddit_search",
     "twitter_search",
     "engagement_filter",
@@ -21,6 +17,33 @@ __all__ = [
     "trend_analyzer",
     "content_suggester",
     "sentiment_analyzer",
+    "sentiment_cache",
+    "report_schema",
     "output_formatter",
+    "corpus_loader",
+    "post_store",
+    "job_output",
+    "scheduler",
+    "profiler",
+    "spill",
+    "stage_graph",
+    "stage_cache",
+    "tokenizer",
+    "knowledge_export",
+    "clustering",
+    "fast_json",
+    "sampling",
+    "saturation",
 ]
 
+
+def __getattr__(name):
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,261 @@
+"""
+Clustering module - Group posts into discussion clusters with hashed TF-IDF vectors
+"""
+
+import zlib
+from typing import Dict, Iterable, List, Sequence
+
+from . import tokenizer
+
+# Width of the hashed term space; terms sharing a bucket share a weight
+FEATURES = 1 << 15
+
+# Posts scored against the centroids at a time; a block's temporaries are
+# its term count x clusters, so memory stays flat however many posts there are
+BLOCK_SIZE = 4096
+
+MAX_CLUSTERS = 10
+# Smaller clusters are dropped, and fewer than twice this many posts are not clustered
+MIN_CLUSTER_POSTS = 5
+# Posts less similar than this to every centroid belong to no cluster
+MIN_SIMILARITY = 0.1
+
+MAX_ITERATIONS = 15
+# Iteration stops once fewer than this fraction of posts change cluster
+CONVERGENCE = 0.005
+TOP_TERMS = 5
+# A cluster's top terms must occur in at least this fraction of its posts
+MIN_TERM_SUPPORT = 0.05
+REPRESENTATIVE_POSTS = 3
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise RuntimeError("NumPy is required for post clustering: pip install numpy")
+    return np
+
+
+def _post_text(post: Dict) -> str:
+    if post.get("platform") == "reddit":
+        return post.get("title", "") + " " + post.get("text", "")
+    return post.get("text", "")
+
+
+class HashedTfidf:
+    """
+    Posts as L2-normalized TF-IDF vectors over FEATURES hashed term buckets.
+
+    The vectors are rows of a count x FEATURES matrix held sparse (CSR
+    arrays: indptr, indices, weights), as a dense one would take 6.5 GB for
+    50k posts. Buckets come from CRC-32 of the term, so they are the same
+    in every process and run.
+    """
+
+    def __init__(self, posts: Iterable[Dict], features: int = FEATURES):
+        np = _numpy()
+        self.features = features
+        vocabulary: Dict[str, int] = {}
+        term_ids = []
+        lengths = []
+
+        for post in posts:
+            terms = tokenizer.keywords(_post_text(post))
+            lengths.append(len(terms))
+            term_ids.extend([vocabulary.setdefault(term, len(vocabulary)) for term in terms])
+
+        self.count = len(lengths)
+        terms = list(vocabulary)
+        term_buckets = np.array(
+            [zlib.crc32(term.encode("utf-8")) % features for term in terms], dtype=np.int64
+        )
+        term_ids = np.array(term_ids, dtype=np.int64)
+        rows = np.repeat(np.arange(self.count, dtype=np.int64), lengths)
+
+        # (row, bucket) pairs in row order, with their term counts
+        cells, counts = np.unique(rows * features + term_buckets[term_ids], return_counts=True)
+        self.rows = rows = cells // features
+        self.indices = (cells % features).astype(np.int32)
+        self.indptr = np.zeros(self.count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=self.count), out=self.indptr[1:])
+
+        # Sublinear term frequency times smoothed inverse document frequency
+        df = np.bincount(self.indices, minlength=features)
+        idf = np.log((1 + self.count) / (1 + df)) + 1
+        weights = (1 + np.log(counts)) * idf[self.indices]
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=self.count))
+        weights /= np.maximum(norms, 1e-12)[rows]
+        self.weights = weights.astype(np.float32)
+
+        # The term in most posts names each bucket
+        vocabulary_size = max(len(terms), 1)
+        term_df = np.bincount(
+            np.unique(np.repeat(np.arange(self.count), lengths) * vocabulary_size + term_ids)
+            % vocabulary_size,
+            minlength=len(terms),
+        )
+        self.bucket_terms: Dict[int, str] = {}
+        for term_id in np.argsort(-term_df, kind="stable"):
+            self.bucket_terms.setdefault(int(term_buckets[term_id]), terms[term_id])
+
+    def dense(self, rows):
+        """The given rows as a dense len(rows) x features matrix."""
+        np = _numpy()
+        out = np.zeros((len(rows), self.features), dtype=np.float32)
+        for i, row in enumerate(rows):
+            begin, end = self.indptr[row], self.indptr[row + 1]
+            out[i, self.indices[begin:end]] = self.weights[begin:end]
+        return out
+
+    def similarities(self, start: int, stop: int, centroids):
+        """Cosine similarity of rows start:stop to each (normalized) centroid."""
+        np = _numpy()
+        begin, end = self.indptr[start], self.indptr[stop]
+        scores = np.zeros((stop - start, len(centroids)), dtype=np.float32)
+        if begin == end:
+            return scores
+        # Each stored weight times the centroids' weights for its bucket,
+        # summed per row
+        products = centroids.T[self.indices[begin:end]] * self.weights[begin:end, None]
+        offsets = self.indptr[start:stop] - begin
+        filled = offsets < end - begin
+        filled[filled] = np.diff(np.append(offsets[filled], end - begin)) > 0
+        scores[filled] = np.add.reduceat(products, offsets[filled], axis=0)
+        return scores
+
+
+def _seed_centroids(vectors: HashedTfidf, k: int, block_size: int, rng):
+    """k-means++ seeding: each next centroid is a post far from those chosen."""
+    np = _numpy()
+
+    def distances(centroid):
+        return np.concatenate([
+            1 - vectors.similarities(start, min(start + block_size, vectors.count), centroid[None])[:, 0]
+            for start in range(0, vectors.count, block_size)
+        ])
+
+    centroids = [vectors.dense([rng.integers(vectors.count)])[0]]
+    # Cosine distance to the nearest chosen centroid
+    distance = distances(centroids[0])
+    for _ in range(1, k):
+        weights = np.maximum(distance, 0).astype(np.float64) ** 2
+        total = weights.sum()
+        if total <= 0:
+            break
+        centroid = vectors.dense([rng.choice(vectors.count, p=weights / total)])[0]
+        centroids.append(centroid)
+        distance = np.minimum(distance, distances(centroid))
+    return np.stack(centroids)
+
+
+def _normalize_rows(matrix):
+    np = _numpy()
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def _assign(vectors: HashedTfidf, centroids, block_size: int):
+    """Nearest centroid and cosine similarity per post, plus the new centroid sums."""
+    np = _numpy()
+    labels = np.empty(vectors.count, dtype=np.int64)
+    similarity = np.empty(vectors.count, dtype=np.float32)
+    for start in range(0, vectors.count, block_size):
+        stop = min(start + block_size, vectors.count)
+        scores = vectors.similarities(start, stop, centroids)
+        labels[start:stop] = scores.argmax(axis=1)
+        similarity[start:stop] = scores[np.arange(stop - start), labels[start:stop]]
+
+    sums = np.bincount(
+        labels[vectors.rows] * vectors.features + vectors.indices,
+        weights=vectors.weights,
+        minlength=len(centroids) * vectors.features,
+    ).reshape(len(centroids), vectors.features)
+    return labels, similarity, sums.astype(np.float32)
+
+
+def cluster_posts(
+    posts: Sequence[Dict],
+    max_clusters: int = MAX_CLUSTERS,
+    min_posts: int = MIN_CLUSTER_POSTS,
+    block_size: int = BLOCK_SIZE,
+    seed: int = 0,
+) -> List[Dict]:
+    """
+    Group posts into discussion clusters by spherical k-means.
+
+    Posts become hashed TF-IDF vectors (see HashedTfidf); each iteration
+    scores one block of posts against all centroids at a time. The
+    number of clusters is up to max_clusters, about one per 10 posts.
+    posts must yield the same posts in the same order each time it is
+    iterated (a list, or a spill.SpillList): a second pass picks the
+    representative posts.
+
+    Returns clusters, largest first, each with its distinctive terms, size, share
+    of posts, cohesion (mean cosine similarity to the centroid) and the
+    posts closest to its centroid.
+    """
+    np = _numpy()
+    vectors = HashedTfidf(posts)
+    if vectors.count < 2 * min_posts:
+        return []
+
+    rng = np.random.default_rng(seed)
+    k = max(1, min(max_clusters, vectors.count // (2 * min_posts)))
+    centroids = _seed_centroids(vectors, k, block_size, rng)
+
+    labels = None
+    for _ in range(MAX_ITERATIONS):
+        new_labels, similarity, sums = _assign(vectors, centroids, block_size)
+        # A centroid that lost all its posts stays where it was
+        empty = ~sums.any(axis=1)
+        sums[empty] = centroids[empty]
+        centroids = _normalize_rows(sums)
+        changed = vectors.count if labels is None else int((new_labels != labels).sum())
+        labels = new_labels
+        if changed < CONVERGENCE * vectors.count:
+            break
+    labels, similarity, _ = _assign(vectors, centroids, block_size)
+    labels[similarity < MIN_SIMILARITY] = -1
+
+    # Terms are ranked by how much more weight they carry in a cluster than
+    # in the corpus as a whole, so words every post uses don't name clusters
+    overall = np.bincount(vectors.indices, weights=vectors.weights, minlength=vectors.features)
+    distinctive = centroids - overall / max(np.linalg.norm(overall), 1e-12)
+    clustered = labels[vectors.rows] >= 0
+    support = np.bincount(
+        labels[vectors.rows][clustered] * vectors.features + vectors.indices[clustered],
+        minlength=len(centroids) * vectors.features,
+    ).reshape(len(centroids), vectors.features)
+
+    clusters = []
+    representatives = {}
+    for cluster in range(len(centroids)):
+        members = np.flatnonzero(labels == cluster)
+        if len(members) < min_posts:
+            continue
+        closest = members[np.argsort(-similarity[members], kind="stable")[:REPRESENTATIVE_POSTS]]
+        for row in closest:
+            representatives[int(row)] = None
+        score = np.where(
+            support[cluster] >= MIN_TERM_SUPPORT * len(members), distinctive[cluster], 0
+        )
+        top = np.argsort(-score, kind="stable")[:TOP_TERMS]
+        terms = [vectors.bucket_terms[int(b)] for b in top if score[b] > 0]
+        clusters.append({
+            "label": " / ".join(terms[:3]),
+            "top_terms": terms,
+            "size": len(members),
+            "percentage": round(len(members) / vectors.count * 100, 1),
+            "cohesion": round(float(similarity[members].mean()), 3),
+            "posts": [int(row) for row in closest],
+        })
+
+    for row, post in enumerate(posts):
+        if row in representatives:
+            representatives[row] = post
+    for cluster in clusters:
+        cluster["posts"] = [representatives[row] for row in cluster["posts"]]
+
+    clusters.sort(key=lambda cluster: cluster["size"], reverse=True)
+    return clusters
@@ -2,12 +2,19 @@
 Content suggester module - Generate content ideas based on trends
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 import random
 
+# Seed used when the caller does not pick one, so the same trends always
+# produce the same suggestions
+DEFAULT_SEED = 0
 
-def generate_blog_post_ideas(posts: List[Dict], trends: Dict, topic: str) -> List[Dict]:
-    """Generate blog post ideas based on trending topics."""
+
+def generate_blog_post_ideas(
+    posts: List[Dict], trends: Dict, topic: str, rng: Optional[random.Random] = None
+) -> List[Dict]:
+    """Generate blog post ideas based on trending topics; rng picks title variations."""
+    rng = rng or random.Random(DEFAULT_SEED)
     ideas = []
     
     # From trending topics
@@ -25,7 +32,7 @@ def generate_blog_post_ideas(posts: List[Dict], trends: Dict, topic: str) -> Lis
         ]
         
         ideas.append({
-            "title": random.choice(titles),
+            "title": rng.choice(titles),
             "angle": f"Comprehensive guide based on {frequency} community discussions",
             "why_it_works": f"High interest ({trend_item['percentage']}% of discussions mention this)",
             "target_audience": "People researching or learning about " + keyword,
@@ -271,14 +278,16 @@ def generate_newsletter_ideas(posts: List[Dict], trends: Dict, topic: str) -> Li
     return ideas
 
 
-def generate(posts: List[Dict], trends: Dict, topic: str) -> Dict:
+def generate(posts: List[Dict], trends: Dict, topic: str, seed: int = DEFAULT_SEED) -> Dict:
     """
     Generate all content suggestions.
     
-    Returns dictionary with different content types.
+    Returns dictionary with different content types. The same inputs and
+    seed always give the same suggestions.
     """
+    rng = random.Random(seed)
     return {
-        "blog_posts": generate_blog_post_ideas(posts, trends, topic),
+        "blog_posts": generate_blog_post_ideas(posts, trends, topic, rng),
         "social_posts": generate_social_media_ideas(posts, trends, topic),
         "videos": generate_video_ideas(posts, trends, topic),
         "newsletters": generate_newsletter_ideas(posts, trends, topic),
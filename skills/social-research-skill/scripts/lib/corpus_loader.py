@@ -0,0 +1,208 @@
+"""
+Corpus loader module - Stream posts from saved JSON/JSONL dumps
+"""
+
+import glob
+import gzip
+import json
+from pathlib import Path
+from typing import Dict, IO, Iterable, Iterator, List, Optional
+
+from . import fast_json
+
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+
+
+def expand_paths(patterns: Iterable[str]) -> List[Path]:
+    """Expand file paths and glob patterns, keeping order and dropping repeats."""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        for match in matches:
+            path = Path(match)
+            if not path.is_file():
+                raise FileNotFoundError(f"No such input file: {match}")
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def infer_platform(post: Dict, hint: Optional[str] = None) -> Optional[str]:
+    """Guess a post's platform from its fields or the key it was stored under."""
+    if post.get("platform"):
+        return post["platform"]
+    if hint:
+        for platform in ("reddit", "twitter"):
+            if platform in hint.lower():
+                return platform
+    if "subreddit" in post or "num_comments" in post:
+        return "reddit"
+    if "likes" in post or "retweets" in post:
+        return "twitter"
+    return None
+
+
+class _JsonStream:
+    """Incremental reader for one JSON document, decoded value by value."""
+
+    def __init__(self, fp: IO[str]):
+        self.fp = fp
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        chunk = self.fp.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in JSON input, found {self.peek()!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def items(self) -> Iterator:
+        """Yield the elements of the array starting at the current position."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+    def members(self) -> Iterator[str]:
+        """
+        Yield the keys of the object starting at the current position.
+
+        After each key the caller must consume its value (with value(),
+        items() or members()) before asking for the next key.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+
+def _iter_json_posts(fp: IO[str]) -> Iterator[Dict]:
+    """
+    Yield posts from a JSON document without loading it whole.
+
+    Handles a top-level array of posts, objects holding post arrays (the
+    fixtures' "reddit_sample"/"twitter_sample", a report's "posts") and the
+    normalized report "post_table".
+    """
+    stream = _JsonStream(fp)
+    start = stream.peek()
+
+    if start == "[":
+        for post in stream.items():
+            if isinstance(post, dict):
+                if not post.get("platform"):
+                    post["platform"] = infer_platform(post)
+                yield post
+        return
+
+    if start != "{":
+        raise ValueError("JSON input must be an array or object")
+
+    for key in stream.members():
+        nested = stream.peek()
+        if nested == "[":
+            for post in stream.items():
+                if isinstance(post, dict):
+                    if not post.get("platform"):
+                        post["platform"] = infer_platform(post, key)
+                    yield post
+        elif nested == "{" and key == "post_table":
+            for _ in stream.members():
+                post = stream.value()
+                if isinstance(post, dict):
+                    yield post
+        else:
+            stream.value()
+
+
+def _open_text(path: Path) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def iter_file_posts(path: Path) -> Iterator[Dict]:
+    """Yield posts from one JSON, JSONL or gzip-compressed file."""
+    name = path.name[:-3] if path.suffix == ".gz" else path.name
+
+    with _open_text(path) as fp:
+        if name.endswith(".json"):
+            yield from _iter_json_posts(fp)
+            return
+
+        for line_number, line in enumerate(fp, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                post = fast_json.loads(line)
+            except fast_json.DecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON line: {e}")
+            if isinstance(post, dict):
+                if not post.get("platform"):
+                    post["platform"] = infer_platform(post)
+                yield post
+
+
+def iter_posts(patterns: Iterable[str]) -> Iterator[Dict]:
+    """
+    Stream posts from every file matched by the given paths/globs.
+
+    Files ending in .json are parsed incrementally; anything else is read
+    as JSON Lines. A trailing .gz on either is decompressed on the fly.
+    """
+    for path in expand_paths(patterns):
+        yield from iter_file_posts(path)
@@ -2,9 +2,20 @@
 Deduplicator module - Remove duplicate and similar posts
 """
 
-from typing import List, Dict, Set
+import hashlib
+import sqlite3
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from difflib import SequenceMatcher
 
+from . import profiler
+
+# Approximate cost of one kept post's index entries beyond its strings
+_INDEX_ENTRY_BYTES = 120
+# Page cache of a spilled index, in KiB (SQLite's negative cache_size)
+_SPILL_CACHE_KIB = 2048
+
 
 def calculate_similarity(text1: str, text2: str) -> float:
     """Calculate similarity ratio between two texts."""
@@ -19,6 +30,197 @@ def get_post_text(post: Dict) -> str:
         return post.get("text", "").strip()
 
 
+class DedupIndex:
+    """
+    Index of kept posts for duplicate checks.
+
+    Finds exactly the same duplicates as comparing a post against every kept
+    text, but only compares against texts whose length could reach the
+    threshold, and rejects most of those with difflib's cheap upper bounds
+    before computing the full ratio.
+
+    footprint is the approximate memory the index holds, in bytes. With a
+    spill.MemoryBudget the index is watched by it, and spill() moves the
+    kept texts, URLs and exact-text digests to a SQLite file in the
+    budget's directory; later checks read candidates back from it by
+    length, so the answers are unchanged.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.85, budget=None):
+        self.similarity_threshold = similarity_threshold
+        self.seen_urls: Set[str] = set()
+        self.seen_exact: Set[str] = set()
+        self.texts_by_length: Dict[int, List[str]] = defaultdict(list)
+        self.comparisons = 0
+        self.footprint = 0
+        self.kept = 0
+        self.budget = budget
+        self._spilled = None
+        if budget is not None:
+            budget.watch(self)
+
+    def __len__(self) -> int:
+        return self.kept
+
+    def _candidate_lengths(self, length: int) -> range:
+        # ratio <= 2 * min(a, b) / (a + b), so other lengths can never match
+        t = self.similarity_threshold
+        if t <= 0:
+            return range(0, max(self.texts_by_length, default=0) + 1)
+        low = int(length * t / (2 - t))
+        high = int(length * (2 - t) / t) + 1
+        return range(low, high + 1)
+
+    @staticmethod
+    def _digest(text: str) -> bytes:
+        return hashlib.sha1(text.encode("utf-8")).digest()
+
+    def _spilled_key(self, kind: str, value: bytes) -> bool:
+        row = self._spilled.execute(
+            "SELECT 1 FROM seen WHERE kind = ? AND value = ?", (kind, value)
+        ).fetchone()
+        return row is not None
+
+    def _candidates(self, length: int) -> Iterator[str]:
+        lengths = self._candidate_lengths(length)
+        if self._spilled is not None:
+            if self.similarity_threshold <= 0:
+                rows = self._spilled.execute("SELECT text FROM texts")
+            else:
+                rows = self._spilled.execute(
+                    "SELECT text FROM texts WHERE length BETWEEN ? AND ?",
+                    (lengths.start, lengths.stop - 1),
+                )
+            for (text,) in rows:
+                yield text
+        for candidate_length in lengths:
+            yield from self.texts_by_length.get(candidate_length, ())
+
+    def is_duplicate(self, post: Dict) -> bool:
+        """Check a post against the index without adding it."""
+        url = post.get("url", "")
+        if url and url in self.seen_urls:
+            return True
+
+        text = get_post_text(post).lower()
+        if not text:
+            return True
+        if text in self.seen_exact:
+            return True
+        if self._spilled is not None:
+            if url and self._spilled_key("url", url.encode("utf-8")):
+                return True
+            if self._spilled_key("text", self._digest(text)):
+                return True
+
+        matcher = SequenceMatcher(None)
+        matcher.set_seq1(text)
+        threshold = self.similarity_threshold
+        for seen_text in self._candidates(len(text)):
+            self.comparisons += 1
+            matcher.set_seq2(seen_text)
+            if (
+                matcher.real_quick_ratio() >= threshold
+                and matcher.quick_ratio() >= threshold
+                and matcher.ratio() >= threshold
+            ):
+                return True
+        return False
+
+    def add(self, post: Dict):
+        """Record a kept post."""
+        url = post.get("url", "")
+        if url:
+            self.seen_urls.add(url)
+            self.footprint += sys.getsizeof(url)
+        text = get_post_text(post).lower()
+        self.seen_exact.add(text)
+        self.texts_by_length[len(text)].append(text)
+        self.footprint += sys.getsizeof(text) + _INDEX_ENTRY_BYTES
+        self.kept += 1
+
+    def offer(self, post: Dict) -> bool:
+        """Add the post if it is not a duplicate; return whether it was kept."""
+        if self.is_duplicate(post):
+            return False
+        self.add(post)
+        return True
+
+    def spill(self):
+        """Move the in-memory entries to the index's SQLite file (needs a budget)."""
+        if not self.footprint or self.budget is None:
+            return
+        if self._spilled is None:
+            self._spilled = sqlite3.connect(self.budget.new_path(".sqlite"))
+            self._spilled.executescript(
+                f"""
+                PRAGMA journal_mode = OFF;
+                PRAGMA synchronous = OFF;
+                PRAGMA cache_size = -{_SPILL_CACHE_KIB};
+                CREATE TABLE texts (length INTEGER NOT NULL, text TEXT NOT NULL);
+                CREATE INDEX texts_length ON texts (length);
+                CREATE TABLE seen (kind TEXT NOT NULL, value BLOB NOT NULL, PRIMARY KEY (kind, value))
+                    WITHOUT ROWID;
+                """
+            )
+        with self._spilled:
+            self._spilled.executemany(
+                "INSERT INTO texts (length, text) VALUES (?, ?)",
+                ((length, text) for length, texts in self.texts_by_length.items() for text in texts),
+            )
+            self._spilled.executemany(
+                "INSERT OR IGNORE INTO seen (kind, value) VALUES ('url', ?)",
+                ((url.encode("utf-8"),) for url in self.seen_urls),
+            )
+            self._spilled.executemany(
+                "INSERT OR IGNORE INTO seen (kind, value) VALUES ('text', ?)",
+                ((self._digest(text),) for text in self.seen_exact),
+            )
+        profiler.count("dedup_index_spills")
+        self.seen_urls = set()
+        self.seen_exact = set()
+        self.texts_by_length = defaultdict(list)
+        self.footprint = 0
+
+
+def iter_unique(
+    posts: Iterable[Dict],
+    similarity_threshold: float = 0.85,
+    presorted: bool = False,
+    index: Optional[DedupIndex] = None,
+) -> Iterator[Dict]:
+    """
+    Yield unique posts one at a time, highest engagement first.
+
+    Each post is final as soon as it is yielded, so callers can stream it
+    to an exporter before deduplication finishes. With presorted, posts
+    must already be ordered by engagement and are consumed lazily. index
+    lets the caller supply (and watch) the DedupIndex.
+    """
+    if index is None:
+        index = DedupIndex(similarity_threshold)
+    
+    # Sort by engagement score to keep higher quality posts
+    sorted_posts = posts if presorted else sorted(
+        posts, key=lambda x: x.get("engagement_score", 0), reverse=True
+    )
+    
+    for _, post in iter_kept(sorted_posts, index):
+        yield post
+
+
+def iter_kept(ranked: Iterable[Dict], index: DedupIndex) -> Iterator[Tuple[int, Dict]]:
+    """
+    Yield (position, post) for each unique post of an engagement-ranked
+    stream; positions let a caller replay the result on the same input.
+    """
+    for position, post in enumerate(ranked):
+        if index.offer(post):
+            yield position, post
+
+    profiler.count("similarity_comparisons", index.comparisons)
+
+
 def deduplicate(posts: List[Dict], similarity_threshold: float = 0.85) -> List[Dict]:
     """
     Remove duplicate and highly similar posts.
@@ -33,40 +235,7 @@ def deduplicate(posts: List[Dict], similarity_threshold: float = 0.85) -> List[D
     if not posts:
         return []
     
-    unique_posts = []
-    seen_urls: Set[str] = set()
-    seen_texts: List[str] = []
-    
-    # Sort by engagement score to keep higher quality posts
-    sorted_posts = sorted(
-        posts, key=lambda x: x.get("engagement_score", 0), reverse=True
-    )
-    
-    for post in sorted_posts:
-        # Check URL duplicates
-        url = post.get("url", "")
-        if url and url in seen_urls:
-            continue
-        
-        # Check text similarity
-        post_text = get_post_text(post)
-        if not post_text:
-            continue
-        
-        is_duplicate = False
-        for seen_text in seen_texts:
-            similarity = calculate_similarity(post_text, seen_text)
-            if similarity >= similarity_threshold:
-                is_duplicate = True
-                break
-        
-        if not is_duplicate:
-            unique_posts.append(post)
-            if url:
-                seen_urls.add(url)
-            seen_texts.append(post_text)
-    
-    return unique_posts
+    return list(iter_unique(posts, similarity_threshold))
 
 
 def group_similar_posts(posts: List[Dict], similarity_threshold: float = 0.7) -> List[List[Dict]]:
@@ -2,7 +2,7 @@
 Engagement filter module - Filter posts by engagement metrics
 """
 
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List
 
 
 def calculate_engagement_score(post: Dict, platform: str) -> int:
@@ -53,6 +53,23 @@ def filter_posts(
     return filtered
 
 
+def iter_filtered(
+    posts: Iterable[Dict], min_engagement: int = 5, platform: str = None
+) -> Iterator[Dict]:
+    """
+    Stream posts that meet the engagement threshold, in input order.
+
+    Like filter_posts, but never holds the input in memory and does not sort.
+    """
+    for post in posts:
+        detected_platform = platform or post.get("platform", "unknown")
+        engagement_score = calculate_engagement_score(post, detected_platform)
+        
+        if engagement_score >= min_engagement:
+            post["engagement_score"] = engagement_score
+            yield post
+
+
 def get_top_posts(posts: List[Dict], limit: int = 10) -> List[Dict]:
     """Get top N posts by engagement."""
     return sorted(
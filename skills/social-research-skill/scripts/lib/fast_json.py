@@ -0,0 +1,288 @@
+"""
+Fast JSON module - Decoding of API payloads into typed records, and fast encoding of exports
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Union, get_args, get_origin
+
+
+def _load_backend() -> str:
+    try:
+        import msgspec  # noqa: F401
+        return "msgspec"
+    except ImportError:
+        pass
+    try:
+        import orjson  # noqa: F401
+        return "orjson"
+    except ImportError:
+        return "json"
+
+
+# "msgspec", "orjson" or "json", whichever is installed first in that order
+BACKEND = _load_backend()
+
+
+class Factory:
+    """Default of a record field built fresh for each record, e.g. Factory(list)."""
+
+    __slots__ = ("make",)
+
+    def __init__(self, make: Callable[[], Any]):
+        self.make = make
+
+
+_RECORDS = set()
+
+
+def record(cls):
+    """
+    Turn an annotated class into a compact payload record.
+
+    With msgspec the record is a Struct: responses decode straight into it
+    and every field it doesn't list is skipped while parsing. Otherwise it
+    is a slotted class, built by loads() from the decoded document. Either
+    way fields are read as attributes and default to the class attribute
+    of the same name.
+    """
+    hints = dict(cls.__annotations__)
+    defaults = {name: cls.__dict__.get(name) for name in hints}
+
+    if BACKEND == "msgspec":
+        import msgspec
+        fields = [
+            (name, hint, msgspec.field(default_factory=defaults[name].make)
+             if isinstance(defaults[name], Factory) else defaults[name])
+            for name, hint in hints.items()
+        ]
+        built = msgspec.defstruct(cls.__name__, fields, module=cls.__module__)
+    else:
+        slots = tuple(hints)
+
+        def __init__(self, **values):
+            for name in slots:
+                if name in values:
+                    value = values[name]
+                else:
+                    default = defaults[name]
+                    value = default.make() if isinstance(default, Factory) else default
+                setattr(self, name, value)
+
+        def __repr__(self):
+            fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in slots)
+            return f"{cls.__name__}({fields})"
+
+        built = type(cls.__name__, (), {
+            "__slots__": slots,
+            "__init__": __init__,
+            "__repr__": __repr__,
+            "__annotations__": hints,
+            "__module__": cls.__module__,
+            "__qualname__": cls.__qualname__,
+        })
+    built.__doc__ = cls.__doc__
+    _RECORDS.add(built)
+    return built
+
+
+# Payload records, listing only the fields the fetchers read. Defaults are
+# what the fetchers used for a missing field.
+
+Number = Union[int, float]
+
+
+@record
+class RedditPost:
+    id: Optional[str] = None
+    title: Optional[str] = None
+    selftext: Optional[str] = ""
+    author: Optional[str] = None
+    subreddit: Optional[str] = None
+    permalink: Optional[str] = None
+    score: Optional[Number] = 0
+    num_comments: Optional[Number] = 0
+    created_utc: Optional[Number] = 0
+
+
+@record
+class RedditChild:
+    data: RedditPost = Factory(RedditPost)
+
+
+@record
+class RedditListingData:
+    children: List[RedditChild] = Factory(list)
+    after: Optional[str] = None
+
+
+@record
+class RedditListing:
+    data: RedditListingData = Factory(RedditListingData)
+
+
+@record
+class PushshiftResponse:
+    data: List[RedditPost] = Factory(list)
+
+
+@record
+class TweetMetrics:
+    like_count: Optional[Number] = 0
+    retweet_count: Optional[Number] = 0
+    reply_count: Optional[Number] = 0
+
+
+@record
+class Tweet:
+    id: Optional[str] = None
+    text: Optional[str] = None
+    author_id: Optional[str] = None
+    created_at: Optional[str] = None
+    public_metrics: TweetMetrics = Factory(TweetMetrics)
+
+
+@record
+class TwitterUser:
+    id: Optional[str] = None
+    username: Optional[str] = None
+    name: Optional[str] = None
+
+
+@record
+class TwitterIncludes:
+    users: List[TwitterUser] = Factory(list)
+
+
+@record
+class TwitterMeta:
+    next_token: Optional[str] = None
+
+
+@record
+class TwitterSearch:
+    data: List[Tweet] = Factory(list)
+    includes: TwitterIncludes = Factory(TwitterIncludes)
+    meta: TwitterMeta = Factory(TwitterMeta)
+
+
+_builders: Dict[Any, List] = {}
+
+
+def _field_builder(hint: Any) -> Optional[Callable[[Any], Any]]:
+    if hint in _RECORDS:
+        return lambda value: build(hint, value)
+    if get_origin(hint) in (list, List) and get_args(hint)[0] in _RECORDS:
+        item = get_args(hint)[0]
+        return lambda value: [build(item, v) for v in value] if isinstance(value, list) else []
+    return None
+
+
+def build(shape: Any, value: Any) -> Any:
+    """
+    Build a record of type shape from a decoded JSON object.
+
+    Only the record's fields are copied. Nested records and lists of
+    records are built in turn; a nested field that is missing, null or of
+    the wrong type gets its default.
+    """
+    builders = _builders.get(shape)
+    if builders is None:
+        builders = _builders[shape] = [
+            (name, _field_builder(hint)) for name, hint in shape.__annotations__.items()
+        ]
+    if not isinstance(value, dict):
+        return shape()
+    fields = {}
+    for name, builder in builders:
+        if name in value:
+            fields[name] = builder(value[name]) if builder else value[name]
+    return shape(**fields)
+
+
+_decoders: Dict[Any, Callable[[bytes], Any]] = {}
+
+
+def _decoder(shape: Any) -> Callable[[bytes], Any]:
+    decoder = _decoders.get(shape)
+    if decoder is None:
+        if BACKEND == "msgspec":
+            import msgspec
+            decoder = msgspec.json.Decoder(Any if shape is None else shape).decode
+        elif BACKEND == "orjson":
+            import orjson
+            decoder = orjson.loads
+        else:
+            decoder = json.loads
+        if shape is not None and BACKEND != "msgspec":
+            parse = decoder
+            decoder = lambda data: build(shape, parse(data))
+        _decoders[shape] = decoder
+    return decoder
+
+
+def _decode_errors() -> tuple:
+    if BACKEND == "msgspec":
+        import msgspec
+        return (ValueError, msgspec.DecodeError)
+    return (ValueError,)
+
+
+# Raised by loads() for malformed JSON (json's and orjson's errors are
+# ValueErrors; msgspec's are not)
+DecodeError = _decode_errors()
+
+
+def loads(data: Union[bytes, str], shape: Any = None) -> Any:
+    """
+    Decode a JSON document, into a payload record if shape is one.
+
+    With msgspec only the record's fields are decoded and checked. Other
+    backends parse the whole document and build the record from it. A
+    document that doesn't match the shape's types is built field by field
+    instead, so an API changing a field's type never breaks a fetch.
+    """
+    if BACKEND == "msgspec" and shape is not None:
+        import msgspec
+        try:
+            return _decoder(shape)(data)
+        except msgspec.ValidationError:
+            return build(shape, _decoder(None)(data))
+    return _decoder(shape)(data)
+
+
+def _dumps_stdlib(obj: Any, indent: bool) -> bytes:
+    return json.dumps(
+        obj, indent=2 if indent else None, default=str, ensure_ascii=False
+    ).encode("utf-8")
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Encode obj as UTF-8 JSON, like json.dumps(obj, default=str), with the
+    library that decodes. Values it cannot encode (such as integers beyond
+    64 bits) fall back to the json module.
+    """
+    if BACKEND == "orjson":
+        import orjson
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=str, option=option)
+        except TypeError:
+            return _dumps_stdlib(obj, indent)
+
+    if BACKEND == "msgspec":
+        import msgspec
+        try:
+            encoded = msgspec.json.encode(obj, enc_hook=str)
+        except (TypeError, OverflowError, msgspec.EncodeError):
+            return _dumps_stdlib(obj, indent)
+        return msgspec.json.format(encoded, indent=2) if indent else encoded
+
+    return _dumps_stdlib(obj, indent)
+
+
+def dump(obj: Any, fp, indent: bool = False):
+    """Write obj as JSON to a binary file (see dumps)."""
+    fp.write(dumps(obj, indent=indent))
@@ -0,0 +1,144 @@
+"""
+HTTP pool module - Shared HTTP sessions, cached OAuth tokens and rate limits
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import profiler
+
+
+POOL_SIZE = 16
+
+# Requests per second allowed for each search API, shared by every thread
+# in the process
+RATE_LIMITS = {
+    "reddit": 1.0,
+    "pushshift": 1.0,
+    "twitter": 1.0,
+}
+
+_sessions: "queue.LifoQueue[requests.Session]" = queue.LifoQueue()
+_tokens: Dict[str, Tuple[str, float]] = {}
+_tokens_lock = threading.Lock()
+_limiters: Dict[str, "RateLimiter"] = {}
+_limiters_lock = threading.Lock()
+
+
+def _new_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@contextmanager
+def session() -> Iterator[requests.Session]:
+    """
+    Check out an HTTP session from the process-wide pool.
+
+    Sessions keep TCP/TLS connections alive and are returned to the pool
+    afterwards, so a long-running process only pays connection setup once
+    per host, whichever thread makes the next request.
+    """
+    try:
+        current = _sessions.get_nowait()
+    except queue.Empty:
+        current = _new_session()
+    try:
+        yield current
+    finally:
+        _sessions.put(current)
+
+
+def get_token(
+    key: str, fetch: Callable[[], Optional[Tuple[str, float]]], margin: float = 60
+) -> Optional[str]:
+    """
+    Return a cached access token, calling fetch() when it is missing or expired.
+
+    fetch returns (token, lifetime_seconds) or None on failure. Tokens are
+    refreshed `margin` seconds before they expire.
+    """
+    with _tokens_lock:
+        cached = _tokens.get(key)
+        if cached and cached[1] > time.time():
+            return cached[0]
+
+        result = fetch()
+        if not result:
+            return None
+
+        token, lifetime = result
+        _tokens[key] = (token, time.time() + max(lifetime - margin, 0))
+        return token
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all threads calling one API.
+
+    Callers reserve a slot under the lock and sleep outside it, so waiting
+    threads are served in arrival order and the API sees at most `rate`
+    requests per second after an initial burst of `burst`.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a request may be sent; return the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+def set_rate_limit(api: str, rate: float, burst: int = 1):
+    """Change an API's shared request budget (requests per second)."""
+    with _limiters_lock:
+        RATE_LIMITS[api] = rate
+        _limiters[api] = RateLimiter(rate, burst)
+
+
+def throttle(api: str) -> float:
+    """Wait for the shared budget of `api`; return the seconds waited."""
+    with _limiters_lock:
+        limiter = _limiters.get(api)
+        if limiter is None:
+            limiter = _limiters[api] = RateLimiter(RATE_LIMITS.get(api, 1.0))
+    wait = limiter.acquire()
+    profiler.count(f"{api}_requests")
+    profiler.count("rate_limit_wait_s", wait)
+    return wait
+
+
+def clear_tokens():
+    """Forget all cached tokens."""
+    with _tokens_lock:
+        _tokens.clear()
+
+
+def close_sessions():
+    """Close every pooled session and its connections."""
+    while True:
+        try:
+            _sessions.get_nowait().close()
+        except queue.Empty:
+            break
@@ -0,0 +1,63 @@
+"""
+Job output module - Route print() output of concurrent jobs to per-job buffers
+"""
+
+import contextvars
+import io
+import sys
+from contextlib import contextmanager
+from typing import IO, Iterator, Optional, Tuple
+
+_job_stdout: contextvars.ContextVar = contextvars.ContextVar("job_stdout", default=None)
+_job_stderr: contextvars.ContextVar = contextvars.ContextVar("job_stderr", default=None)
+
+
+class ContextStream:
+    """
+    Stand-in for sys.stdout/sys.stderr that writes to the current job's buffer.
+
+    Jobs run concurrently in one process, so output is routed by context
+    variable rather than by swapping the global stream.
+    """
+
+    def __init__(self, var: contextvars.ContextVar, fallback):
+        self._var = var
+        self._fallback = fallback
+
+    def write(self, text: str) -> int:
+        return (self._var.get() or self._fallback).write(text)
+
+    def flush(self):
+        (self._var.get() or self._fallback).flush()
+
+    def __getattr__(self, name):
+        return getattr(self._fallback, name)
+
+
+def install():
+    """Replace sys.stdout/sys.stderr with context-routed streams (idempotent)."""
+    if not isinstance(sys.stdout, ContextStream):
+        sys.stdout = ContextStream(_job_stdout, sys.stdout)
+    if not isinstance(sys.stderr, ContextStream):
+        sys.stderr = ContextStream(_job_stderr, sys.stderr)
+
+
+@contextmanager
+def capture(
+    stdout: Optional[IO[str]] = None, stderr: Optional[IO[str]] = None
+) -> Iterator[Tuple[IO[str], IO[str]]]:
+    """
+    Send this context's output to stdout/stderr buffers (new StringIOs if omitted).
+
+    Threads started with contextvars.copy_context() inherit the routing.
+    Requires install().
+    """
+    stdout = stdout if stdout is not None else io.StringIO()
+    stderr = stderr if stderr is not None else io.StringIO()
+    out_token = _job_stdout.set(stdout)
+    err_token = _job_stderr.set(stderr)
+    try:
+        yield stdout, stderr
+    finally:
+        _job_stdout.reset(out_token)
+        _job_stderr.reset(err_token)
@@ -0,0 +1,437 @@
+"""
+Knowledge export module - Add research results to the second-brain knowledge base
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .output_formatter import post_timestamp
+
+DEFAULT_KNOWLEDGE_DIR = Path(
+    os.getenv(
+        "SOCIAL_RESEARCH_KNOWLEDGE_DIR",
+        Path(__file__).resolve().parents[4] / "second-brain" / "data",
+    )
+)
+
+DB_FILE = "knowledge-db.json"
+GRAPH_FILE = "knowledge-graph.json"
+LOG_FILE = "knowledge-log.jsonl"
+INDEX_FILE = "knowledge-index.sqlite"
+
+# Highest-engagement posts exported per report, besides the topics' and
+# themes' example posts
+MAX_POSTS = 100
+
+# The snapshots are rewritten once the log holds this fraction of their
+# size in new records, so compaction work stays proportional to the records
+# exported since the last one
+COMPACT_RATIO = 0.5
+
+# Ids looked up per query (SQLite's default variable limit is 999)
+LOOKUP_BATCH = 500
+
+SOURCE = "social-research"
+
+# Node styles, as lib/graph-builder.ts draws notes, logs and tags
+NODE_STYLES = {
+    "note": {"size": 20, "color": "#4F46E5"},
+    "log": {"size": 15, "color": "#A855F7"},
+    "tag": {"size": 10, "color": "#EC4899"},
+}
+
+# Fields a record's digest ignores, so re-exporting unchanged content is a no-op
+VOLATILE_FIELDS = ("created_at", "updated_at")
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    digest TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def slugify(text: str) -> str:
+    """Lowercase id-safe form of a term: letters and digits joined by dashes."""
+    slug = "".join(c if c.isalnum() else "-" for c in text.lower())
+    return "-".join(part for part in slug.split("-") if part) or "untitled"
+
+
+def record_digest(data: Dict) -> str:
+    """Digest of a record's content, without its timestamps."""
+    content = {key: value for key, value in data.items() if key not in VOLATILE_FIELDS}
+    return hashlib.sha1(
+        json.dumps(content, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def edge_id(edge: Dict) -> str:
+    return f"{edge['source']}|{edge['target']}|{edge['type']}"
+
+
+def _isoformat(ts: int) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="seconds")
+
+
+def _post_key(post: Dict) -> str:
+    return f"post-{post.get('platform', 'post')}-{post.get('id') or record_digest(post)[:12]}"
+
+
+class KnowledgeRecords:
+    """Knowledge entries, graph nodes and graph edges for one report."""
+
+    def __init__(self):
+        self.items: Dict[str, Tuple[str, Dict]] = {}
+
+    def add(self, kind: str, item_id: str, data: Dict):
+        self.items[item_id] = (kind, data)
+
+    def entry(self, entry: Dict):
+        self.add("entry", entry["id"], entry)
+
+    def node(self, node_id: str, label: str, node_type: str, metadata: Dict):
+        node = {"id": node_id, "label": label, "type": node_type, **NODE_STYLES[node_type]}
+        node["metadata"] = metadata
+        self.add("node", node_id, node)
+
+    def edge(self, source: str, target: str, edge_type: str, weight: int = 1):
+        edge = {"source": source, "target": target, "weight": weight, "type": edge_type}
+        self.add("edge", edge_id(edge), edge)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+def build_records(data: Dict, max_posts: int = MAX_POSTS) -> KnowledgeRecords:
+    """
+    Turn a report (the output_data of a research run) into knowledge records.
+
+    The research topic becomes a note, each exported post a log related to
+    it, and each trending keyword and theme a tag on the research note and
+    on its example posts. Tags are shared by every report that finds the
+    same term, which links related research in the graph.
+    """
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    topic = data["topic"]
+    trends = data.get("trends") or {}
+    topics = trends.get("topics", [])
+    themes = trends.get("themes", [])
+    records = KnowledgeRecords()
+
+    research_id = f"research-{slugify(topic)}"
+    research_node = f"note-{research_id}"
+    topic_tags = [slugify(item["keyword"]) for item in topics]
+    date_range = data.get("date_range", {})
+    summary = (
+        f"{data.get('stats', {}).get('total_posts', 0)} posts from Reddit and X "
+        f"between {date_range.get('start', '')[:10]} and {date_range.get('end', '')[:10]}."
+    )
+    if topics:
+        summary += " Trending topics: " + ", ".join(item["keyword"] for item in topics[:10]) + "."
+    if themes:
+        summary += " Common themes: " + ", ".join(item["theme"] for item in themes[:5]) + "."
+
+    posts: Dict[str, Dict] = {}
+    tagged_posts: Dict[str, List[str]] = {}
+    for post in islice(data.get("posts", []), max_posts):
+        posts.setdefault(_post_key(post), post)
+    for tag, examples in (
+        *((slugify(item["keyword"]), item.get("example_posts", [])) for item in topics),
+        *((slugify(item["theme"]), item.get("posts", [])) for item in themes),
+    ):
+        for post in examples:
+            key = _post_key(post)
+            posts.setdefault(key, post)
+            tagged_posts.setdefault(key, []).append(tag)
+
+    records.entry({
+        "id": research_id,
+        "title": f"Social research: {topic}",
+        "summary": summary,
+        "tags": [SOURCE, slugify(topic), *topic_tags[:5]],
+        "related_logs": [key for key in posts],
+        "created_at": now,
+        "updated_at": now,
+        "source": SOURCE,
+        "type": "research",
+    })
+    records.node(research_node, f"Research: {topic}", "note", {"topic": topic, "source": SOURCE})
+
+    for item in topics:
+        tag = slugify(item["keyword"])
+        records.entry({
+            "id": f"{research_id}-topic-{tag}",
+            "title": item["keyword"],
+            "summary": f"Trending in {topic} research: {item['frequency']} mentions "
+                       f"({item.get('percentage', 0)}% of posts).",
+            "tags": [SOURCE, slugify(topic), tag],
+            "related_logs": [_post_key(post) for post in item.get("example_posts", [])],
+            "created_at": now,
+            "updated_at": now,
+            "source": SOURCE,
+            "type": "topic",
+        })
+        records.node(f"tag-{tag}", item["keyword"], "tag", {"kind": "topic"})
+        records.edge(f"tag-{tag}", research_node, "tagged")
+
+    for item in themes:
+        tag = slugify(item["theme"])
+        records.entry({
+            "id": f"{research_id}-theme-{tag}",
+            "title": item["theme"],
+            "summary": f"Common theme in {topic} research: {item['frequency']} mentions.",
+            "tags": [SOURCE, slugify(topic), tag],
+            "related_logs": [_post_key(post) for post in item.get("posts", [])],
+            "created_at": now,
+            "updated_at": now,
+            "source": SOURCE,
+            "type": "theme",
+        })
+        records.node(f"tag-{tag}", item["theme"], "tag", {"kind": "theme"})
+        records.edge(f"tag-{tag}", research_node, "tagged")
+
+    for key, post in posts.items():
+        title = (post.get("title") or post.get("text") or "").strip().split("\n")[0][:120]
+        created = post_timestamp(post)
+        records.entry({
+            "id": key,
+            "title": title,
+            "summary": (post.get("text") or post.get("title") or "")[:500],
+            "tags": [SOURCE, post.get("platform", "post"), *tagged_posts.get(key, [])],
+            "related_logs": [],
+            "created_at": _isoformat(created) if created else now,
+            "updated_at": now,
+            "source": SOURCE,
+            "type": "post",
+            "url": post.get("url"),
+            "author": post.get("author"),
+            "engagement": post.get("engagement_score", 0),
+        })
+        records.node(f"log-{key}", title or key, "log", {
+            "platform": post.get("platform"),
+            "url": post.get("url"),
+            "engagement": post.get("engagement_score", 0),
+        })
+        records.edge(research_node, f"log-{key}", "related", weight=2)
+        for tag in tagged_posts.get(key, []):
+            records.edge(f"tag-{tag}", f"log-{key}", "tagged")
+
+    return records
+
+
+class KnowledgeExporter:
+    """
+    Incremental writer of the knowledge DB and graph snapshots.
+
+    Every export appends its new or changed records to an append-only log
+    (knowledge-log.jsonl) and notes their ids and content digests in an
+    index (knowledge-index.sqlite), so unchanged records cost one indexed
+    lookup and are never written again. The snapshots the web app reads
+    (knowledge-db.json and knowledge-graph.json) are rewritten from the log
+    only when enough new records have piled up (see COMPACT_RATIO), or on
+    compact(). Entries written by other tools are kept; a snapshot changed
+    by another tool since the last compaction gets the whole log replayed
+    into it.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory) if directory else DEFAULT_KNOWLEDGE_DIR
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.directory / DB_FILE
+        self.graph_path = self.directory / GRAPH_FILE
+        self.log_path = self.directory / LOG_FILE
+        self.index_path = self.directory / INDEX_FILE
+
+        self._lock = threading.Lock()
+        # Autocommit mode: writes are explicit BEGIN IMMEDIATE transactions,
+        # which also serialize exports from separate processes
+        self._conn = sqlite3.connect(
+            str(self.index_path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.executescript(INDEX_SCHEMA)
+        if self.log_path.exists() and not self._conn.execute("SELECT 1 FROM items LIMIT 1").fetchone():
+            self._rebuild_index()
+
+    def _meta(self, key: str, default: str = "") -> str:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key: str, value: str):
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _read_log(self, offset: int = 0) -> Iterable[Dict]:
+        """Yield log records from a byte offset on, skipping a torn last line."""
+        with open(self.log_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def _rebuild_index(self):
+        """Recreate a lost index from the log; the snapshots are rebuilt on the next export."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for record in self._read_log():
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO items (id, kind, digest) VALUES (?, ?, ?)",
+                        (record["id"], record["kind"], record_digest(record["data"])),
+                    )
+                self._conn.execute("DELETE FROM meta")
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _changed(self, records: KnowledgeRecords) -> List[Tuple[str, str, Dict, str]]:
+        """(kind, id, data, digest) of the records the index doesn't have as they are."""
+        ids = list(records.items)
+        stored = {}
+        for start in range(0, len(ids), LOOKUP_BATCH):
+            batch = ids[start:start + LOOKUP_BATCH]
+            stored.update(self._conn.execute(
+                f"SELECT id, digest FROM items WHERE id IN ({','.join('?' * len(batch))})", batch
+            ).fetchall())
+
+        changed = []
+        for item_id, (kind, data) in records.items.items():
+            digest = record_digest(data)
+            if stored.get(item_id) != digest:
+                changed.append((kind, item_id, data, digest))
+        return changed
+
+    def _snapshot_stat(self) -> str:
+        stats = []
+        for path in (self.db_path, self.graph_path):
+            try:
+                stat = path.stat()
+                stats.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+            except FileNotFoundError:
+                stats.append("-")
+        return ",".join(stats)
+
+    def _snapshot_size(self) -> int:
+        return sum(path.stat().st_size for path in (self.db_path, self.graph_path) if path.exists())
+
+    def export(self, records: KnowledgeRecords, compact: bool = False) -> Dict:
+        """
+        Append the new and changed records and compact the snapshots if due.
+
+        Returns counts of the records written by kind, the number unchanged,
+        and whether the snapshots were rewritten.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                changed = self._changed(records)
+                if changed:
+                    lines = [
+                        json.dumps({"kind": kind, "id": item_id, "data": data}, ensure_ascii=False)
+                        for kind, item_id, data, _ in changed
+                    ]
+                    with open(self.log_path, "a", encoding="utf-8") as f:
+                        f.write("\n".join(lines) + "\n")
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO items (id, kind, digest) VALUES (?, ?, ?)",
+                        [(item_id, kind, digest) for kind, item_id, _, digest in changed],
+                    )
+
+                compacted = self._compact_if_due(force=compact)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        counts = {"entry": 0, "node": 0, "edge": 0}
+        for kind, *_ in changed:
+            counts[kind] += 1
+        return {
+            "entries": counts["entry"],
+            "nodes": counts["node"],
+            "edges": counts["edge"],
+            "unchanged": len(records) - len(changed),
+            "compacted": compacted,
+        }
+
+    def compact(self) -> bool:
+        """Rewrite the snapshots with every logged record now."""
+        return self.export(KnowledgeRecords(), compact=True)["compacted"]
+
+    def _compact_if_due(self, force: bool) -> bool:
+        if not self.log_path.exists():
+            return False
+        log_size = self.log_path.stat().st_size
+        offset = int(self._meta("compacted_offset", "0"))
+        if self._meta("snapshot_stat") != self._snapshot_stat():
+            offset = 0  # snapshots are new, or were rewritten by another tool
+        elif log_size <= offset or (
+            not force and log_size - offset < self._snapshot_size() * COMPACT_RATIO
+        ):
+            return False
+
+        self._compact(offset)
+        self._set_meta("compacted_offset", str(log_size))
+        self._set_meta("snapshot_stat", self._snapshot_stat())
+        return True
+
+    def _load_snapshot(self, path: Path, lists: Tuple[str, ...]) -> Dict:
+        try:
+            with open(path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            snapshot = {}
+        for key in lists:
+            snapshot.setdefault(key, [])
+        snapshot.setdefault("version", "1.0")
+        return snapshot
+
+    def _write_snapshot(self, path: Path, snapshot: Dict):
+        snapshot["lastUpdated"] = datetime.now().astimezone().isoformat(timespec="seconds")
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        os.replace(tmp_path, path)
+
+    def _compact(self, offset: int):
+        """Fold the log from offset into the snapshots, replacing records by id."""
+        db = self._load_snapshot(self.db_path, ("entries",))
+        graph = self._load_snapshot(self.graph_path, ("nodes", "edges"))
+        entries = {entry.get("id"): entry for entry in db["entries"]}
+        nodes = {node.get("id"): node for node in graph["nodes"]}
+        edges = {edge_id(edge): edge for edge in graph["edges"]}
+        targets = {"entry": entries, "node": nodes, "edge": edges}
+
+        for record in self._read_log(offset):
+            items = targets[record["kind"]]
+            data = record["data"]
+            previous = items.get(record["id"])
+            if previous and "created_at" in previous and "created_at" in data:
+                data["created_at"] = previous["created_at"]
+            items[record["id"]] = data
+
+        db["entries"] = list(entries.values())
+        graph["nodes"] = list(nodes.values())
+        graph["edges"] = list(edges.values())
+        self._write_snapshot(self.db_path, db)
+        self._write_snapshot(self.graph_path, graph)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
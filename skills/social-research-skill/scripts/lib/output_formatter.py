@@ -2,8 +2,35 @@
 Output formatter module - Format research results for display
 """
 
-from typing import Dict, List
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
 import csv
+import struct
+import zipfile
+
+from . import fast_json, report_schema
+
+
+CSV_FIELDNAMES = [
+    'platform', 'title', 'text', 'author', 'url',
+    'engagement_score', 'created_date'
+]
+
+# Columnar export layout
+COLUMNAR_INT_FIELDS = [
+    'engagement_score', 'score', 'num_comments', 'likes', 'retweets', 'replies'
+]
+COLUMNAR_STRING_FIELDS = ['id', 'platform', 'author', 'subreddit', 'url']
+SENTIMENT_LABELS = ['none', 'positive', 'negative', 'neutral', 'mixed']
+
+
+def format_percentage(item: Dict, field: str) -> str:
+    """A percentage field, with its confidence interval when it was sampled."""
+    interval = item.get(f"{field}_ci")
+    if not interval:
+        return f"{item[field]}%"
+    return f"{item[field]}% [95% CI {interval[0]}–{interval[1]}]"
 
 
 def format_summary(data: Dict) -> str:
@@ -20,6 +47,10 @@ def format_summary(data: Dict) -> str:
     output.append(f"- Total posts analyzed: {stats.get('total_posts', 0)}")
     output.append(f"- Reddit posts: {stats.get('reddit_posts', 0)}")
     output.append(f"- X/Twitter posts: {stats.get('twitter_posts', 0)}")
+    sample = stats.get("sample")
+    if sample:
+        output.append(f"- Sampled {sample['size']} of {sample['population']} posts "
+                      f"(stratified by engagement; percentages are estimates)")
     output.append(f"- Date range: {data['date_range']['days']} days\n")
     
     # Top trending topics
@@ -27,14 +58,14 @@ def format_summary(data: Dict) -> str:
     if topics:
         output.append("**Top Trending Topics:**")
         for topic in topics:
-            output.append(f"- **{topic['keyword']}** ({topic['percentage']}% of discussions)")
+            output.append(f"- **{topic['keyword']}** ({format_percentage(topic, 'percentage')} of discussions)")
         output.append("")
     
     # Sentiment
     if sentiment:
         output.append("**Community Sentiment:**")
-        output.append(f"- Positive: {sentiment['positive_pct']}%")
-        output.append(f"- Negative: {sentiment['negative_pct']}%")
+        output.append(f"- Positive: {format_percentage(sentiment, 'positive_pct')}")
+        output.append(f"- Negative: {format_percentage(sentiment, 'negative_pct')}")
         output.append(f"- Neutral/Mixed: {sentiment['neutral_pct'] + sentiment['mixed_pct']}%")
         output.append("")
     
@@ -43,7 +74,7 @@ def format_summary(data: Dict) -> str:
 
 def format_top_discussions(data: Dict, limit: int = 10) -> str:
     """Format top discussions by engagement."""
-    posts = data.get("posts", [])[:limit]
+    posts = list(islice(data.get("posts", []), limit))
     
     if not posts:
         return "No discussions found.\n"
@@ -137,7 +168,7 @@ def format_markdown(data: Dict) -> str:
     if topics:
         output.append("## 🔥 Trending Topics\n")
         for i, topic in enumerate(topics[:10], 1):
-            output.append(f"{i}. **{topic['keyword']}** - mentioned {topic['frequency']} times ({topic['percentage']}%)")
+            output.append(f"{i}. **{topic['keyword']}** - mentioned {topic['frequency']} times ({format_percentage(topic, 'percentage')})")
         output.append("\n---\n")
     
     # Common themes
@@ -148,6 +179,17 @@ def format_markdown(data: Dict) -> str:
             output.append(f"{i}. **{theme['theme']}** - {theme['frequency']} mentions")
         output.append("\n---\n")
     
+    # Discussion clusters
+    clusters = trends.get("clusters", [])
+    if clusters:
+        output.append("## 🧩 Discussion Clusters\n")
+        for i, cluster in enumerate(clusters, 1):
+            output.append(f"{i}. **{cluster['label']}** - {cluster['size']} posts ({cluster['percentage']}%)")
+            for post in cluster.get("posts", [])[:2]:
+                title = post.get("title") or post.get("text", "")[:80]
+                output.append(f"   - [{title}]({post.get('url', '')})")
+        output.append("\n---\n")
+    
     # Temporal trends
     temporal = trends.get("temporal", {})
     if temporal.get("trending_up"):
@@ -165,10 +207,10 @@ def format_markdown(data: Dict) -> str:
     sentiment = data.get("sentiment")
     if sentiment:
         output.append("## 😊 Sentiment Analysis\n")
-        output.append(f"- **Positive**: {sentiment['positive_pct']}% ({sentiment['positive']} posts)")
-        output.append(f"- **Negative**: {sentiment['negative_pct']}% ({sentiment['negative']} posts)")
-        output.append(f"- **Neutral**: {sentiment['neutral_pct']}% ({sentiment['neutral']} posts)")
-        output.append(f"- **Mixed**: {sentiment['mixed_pct']}% ({sentiment['mixed']} posts)")
+        output.append(f"- **Positive**: {format_percentage(sentiment, 'positive_pct')} ({sentiment['positive']} posts)")
+        output.append(f"- **Negative**: {format_percentage(sentiment, 'negative_pct')} ({sentiment['negative']} posts)")
+        output.append(f"- **Neutral**: {format_percentage(sentiment, 'neutral_pct')} ({sentiment['neutral']} posts)")
+        output.append(f"- **Mixed**: {format_percentage(sentiment, 'mixed_pct')} ({sentiment['mixed']} posts)")
         output.append("\n---\n")
     
     # Errors
@@ -182,32 +224,286 @@ def format_markdown(data: Dict) -> str:
     return "\n".join(output)
 
 
+def csv_row(post: Dict) -> Dict:
+    """Flatten a post into a CSV row."""
+    return {
+        'platform': post.get('platform', ''),
+        'title': post.get('title', ''),
+        'text': post.get('text', ''),
+        'author': post.get('author', ''),
+        'url': post.get('url', ''),
+        'engagement_score': post.get('engagement_score', 0),
+        'created_date': post.get('created_date') or post.get('created_at', ''),
+    }
+
+
+class CsvPostWriter:
+    """Write posts to CSV one row at a time as they are finalized."""
+
+    def __init__(self, output_file: str):
+        self.path = output_file
+        self.count = 0
+        self._file = open(output_file, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(
+            self._file, fieldnames=CSV_FIELDNAMES, extrasaction='ignore'
+        )
+        self._writer.writeheader()
+
+    def write(self, post: Dict):
+        self._writer.writerow(csv_row(post))
+        self.count += 1
+
+    def write_many(self, posts: Iterable[Dict]):
+        for post in posts:
+            self.write(post)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonlPostWriter:
+    """Write posts as JSON Lines one record at a time as they are finalized."""
+
+    def __init__(self, output_file: str):
+        self.path = output_file
+        self.count = 0
+        self._file = open(output_file, 'wb')
+
+    def write(self, post: Dict):
+        self._file.write(fast_json.dumps(post) + b'\n')
+        self.count += 1
+
+    def write_many(self, posts: Iterable[Dict]):
+        for post in posts:
+            self.write(post)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_json(data: Dict, output_file: str):
+    """
+    Export the full report as normalized JSON.
+
+    Each post is stored once and referenced by ID elsewhere; use
+    report_schema.load_report to read it back in the embedded shape. The
+    report is encoded without its posts, then the post table is written
+    one post at a time as data["posts"] is iterated, so the posts are never
+    copied or encoded as one document.
+    """
+    report = report_schema.normalize(data, keep_posts=False)
+    del report['post_table']
+    head = fast_json.dumps(report, indent=True)
+
+    with open(output_file, 'wb') as f:
+        # Reopen the encoded object to append the table as its last key
+        f.write(head[:head.rindex(b'}')].rstrip() + b',\n  "post_table": {')
+        separator = b'\n    '
+        for key, post in report_schema.iter_post_table(data):
+            # Encoded JSON has no raw newlines inside strings, so indenting
+            # every line nests the post one level deeper
+            post_json = fast_json.dumps(post, indent=True).replace(b'\n', b'\n    ')
+            f.write(separator + fast_json.dumps(key) + b': ' + post_json)
+            separator = b',\n    '
+        f.write(b'\n  }\n}' if separator != b'\n    ' else b'}\n}')
+
+
+def export_report_document(data: Dict, output_file: str, posts_file: str = None):
+    """
+    Export the summary, trends and suggestions without the post list.
+
+    Used alongside a streamed JSONL or CSV post file. posts_file names a
+    JSONL file; posts are referenced by ID and resolved against it on load.
+    """
+    report = report_schema.normalize(data, keep_posts=False)
+    del report['post_table']
+    if posts_file:
+        report['posts_file'] = str(posts_file)
+
+    with open(output_file, 'wb') as f:
+        fast_json.dump(report, f, indent=True)
+
+
+def export_jsonl(data: Dict, output_file: str):
+    """Export posts to a JSON Lines file."""
+    with JsonlPostWriter(output_file) as writer:
+        writer.write_many(data.get("posts", []))
+
+
 def export_csv(data: Dict, output_file: str):
     """Export posts to CSV file."""
     posts = data.get("posts", [])
-    
+
     if not posts:
         return
-    
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        fieldnames = [
-            'platform', 'title', 'text', 'author', 'url',
-            'engagement_score', 'created_date'
-        ]
-        
-        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-        writer.writeheader()
-        
+
+    with CsvPostWriter(output_file) as writer:
+        writer.write_many(posts)
+
+
+def post_timestamp(post: Dict) -> int:
+    """Return a post's creation time as epoch seconds (0 if unknown)."""
+    if post.get('created_utc'):
+        return int(post['created_utc'])
+
+    date_str = post.get('created_date') or post.get('created_at')
+    if not date_str:
+        return 0
+    try:
+        return int(datetime.fromisoformat(date_str.replace('Z', '+00:00')).timestamp())
+    except (TypeError, ValueError):
+        return 0
+
+
+def build_columns(data: Dict, sentiment_results: Optional[List[Dict]] = None) -> Dict[str, List]:
+    """
+    Flatten posts into typed columns.
+
+    String fields are dictionary-encoded as <field>_codes (row -> index) and
+    <field>_dict (index -> value). Sentiment is included when the report was
+    run with sentiment analysis: sentiment_results, the run's per-post
+    results in post order, or else each post is scored here.
+    """
+    posts = data.get('posts', [])
+    columns: Dict[str, List] = {}
+
+    for field in COLUMNAR_INT_FIELDS:
+        columns[field] = [int(post.get(field) or 0) for post in posts]
+    columns['created_ts'] = [post_timestamp(post) for post in posts]
+
+    for field in COLUMNAR_STRING_FIELDS:
+        index: Dict[str, int] = {}
+        codes = []
         for post in posts:
-            # Prepare row
-            row = {
-                'platform': post.get('platform', ''),
-                'title': post.get('title', ''),
-                'text': post.get('text', ''),
-                'author': post.get('author', ''),
-                'url': post.get('url', ''),
-                'engagement_score': post.get('engagement_score', 0),
-                'created_date': post.get('created_date') or post.get('created_at', ''),
-            }
-            writer.writerow(row)
+            value = str(post.get(field) or '')
+            codes.append(index.setdefault(value, len(index)))
+        columns[f'{field}_codes'] = codes
+        columns[f'{field}_dict'] = list(index)
+
+    if sentiment_results is not None:
+        results = sentiment_results
+    elif data.get('sentiment') is not None:
+        from . import sentiment_analyzer
+        results = sentiment_analyzer.score_posts(posts)
+    else:
+        results = [None] * len(posts)
+
+    columns['sentiment_codes'] = [
+        SENTIMENT_LABELS.index(r['sentiment']) if r else 0 for r in results
+    ]
+    columns['sentiment_dict'] = list(SENTIMENT_LABELS)
+    columns['sentiment_confidence'] = [float(r['confidence']) if r else 0.0 for r in results]
+    columns['positive_score'] = [float(r['positive_score']) if r else 0.0 for r in results]
+    columns['negative_score'] = [float(r['negative_score']) if r else 0.0 for r in results]
+
+    return columns
+
+
+def export_npz(data: Dict, output_file: str, sentiment_results: Optional[List[Dict]] = None):
+    """
+    Export posts as an uncompressed NumPy .npz of typed columns.
+
+    Members are stored uncompressed so load_npz can memory-map them.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise RuntimeError("NumPy is required for .npz export: pip install numpy")
+
+    columns = build_columns(data, sentiment_results)
+    arrays = {}
+    for name, values in columns.items():
+        if name.endswith('_dict'):
+            arrays[name] = np.array(values, dtype=str) if values else np.array([], dtype='<U1')
+        elif name.endswith('_codes'):
+            arrays[name] = np.array(values, dtype=np.int32)
+        elif name in ('sentiment_confidence', 'positive_score', 'negative_score'):
+            arrays[name] = np.array(values, dtype=np.float32)
+        else:
+            arrays[name] = np.array(values, dtype=np.int64)
+    arrays['sentiment_codes'] = arrays['sentiment_codes'].astype(np.int8)
+
+    with open(output_file, 'wb') as f:
+        np.savez(f, **arrays)
+
+
+def load_npz(path: str, mmap: bool = True) -> Dict:
+    """
+    Load a columnar .npz export.
+
+    With mmap=True every column is a read-only np.memmap into the file, so
+    filtering touches only the pages it reads.
+    """
+    import numpy as np
+
+    if not mmap:
+        with np.load(path) as npz:
+            return {name: npz[name] for name in npz.files}
+
+    columns = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{info.filename} is compressed and cannot be memory-mapped")
+
+            # Skip the local file header to reach the .npy payload
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_len, extra_len = struct.unpack('<HH', header[26:30])
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if 0 in shape:
+                columns[name] = np.empty(shape, dtype=dtype)
+                continue
+            columns[name] = np.memmap(
+                path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                order='F' if fortran_order else 'C',
+            )
+
+    return columns
+
+
+def export_parquet(data: Dict, output_file: str, sentiment_results: Optional[List[Dict]] = None):
+    """Export posts as a Parquet table with dictionary-encoded string columns."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("pyarrow is required for Parquet export: pip install pyarrow")
+
+    columns = build_columns(data, sentiment_results)
+    fields = {}
+    for name in COLUMNAR_INT_FIELDS + ['created_ts']:
+        fields[name] = pa.array(columns[name], type=pa.int64())
+    fields['created_ts'] = fields['created_ts'].cast(pa.timestamp('s', tz='UTC'))
+
+    for field in COLUMNAR_STRING_FIELDS + ['sentiment']:
+        codes = columns[f'{field}_codes']
+        indices = pa.array(codes, type=pa.int8() if field == 'sentiment' else pa.int32())
+        fields[field] = pa.DictionaryArray.from_arrays(
+            indices, pa.array(columns[f'{field}_dict'], type=pa.string())
+        )
+
+    for name in ('sentiment_confidence', 'positive_score', 'negative_score'):
+        fields[name] = pa.array(columns[name], type=pa.float32())
 
+    pq.write_table(pa.table(fields), output_file)
@@ -0,0 +1,590 @@
+"""
+Post store module - Persistent SQLite store of every fetched post
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from . import engagement_filter, fast_json, tokenizer, trend_analyzer
+from .output_formatter import post_timestamp
+
+DEFAULT_STORE_PATH = Path(
+    os.getenv(
+        "SOCIAL_RESEARCH_STORE",
+        Path(__file__).resolve().parent.parent.parent / "data" / "posts.sqlite",
+    )
+)
+
+BATCH_SIZE = 500
+
+METRIC_FIELDS = ("score", "num_comments", "likes", "retweets", "replies")
+
+# Lower bounds of the engagement buckets rollups are kept in; a report's
+# --min-engagement is answered from the buckets at or above it
+ENGAGEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+# Bucket of posts with negative engagement (downvoted Reddit posts)
+NEGATIVE_BUCKET = -1
+# Bump when the shape of the rollup rows changes, so they are rebuilt
+ROLLUP_VERSION = "2"
+
+SECONDS_PER_DAY = 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    rowid INTEGER PRIMARY KEY,
+    platform TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    text TEXT NOT NULL DEFAULT '',
+    author TEXT,
+    url TEXT,
+    created_ts INTEGER NOT NULL DEFAULT 0,
+    score INTEGER NOT NULL DEFAULT 0,
+    num_comments INTEGER NOT NULL DEFAULT 0,
+    likes INTEGER NOT NULL DEFAULT 0,
+    retweets INTEGER NOT NULL DEFAULT 0,
+    replies INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL,
+    first_seen INTEGER NOT NULL,
+    last_seen INTEGER NOT NULL,
+    UNIQUE (platform, post_id)
+);
+
+CREATE INDEX IF NOT EXISTS posts_created ON posts (created_ts);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5 (
+    title, text, content='posts', content_rowid='rowid'
+);
+
+CREATE TRIGGER IF NOT EXISTS posts_ai AFTER INSERT ON posts BEGIN
+    INSERT INTO posts_fts (rowid, title, text) VALUES (new.rowid, new.title, new.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS posts_ad AFTER DELETE ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, title, text)
+    VALUES ('delete', old.rowid, old.title, old.text);
+END;
+
+CREATE TABLE IF NOT EXISTS post_topics (
+    topic TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    day TEXT NOT NULL DEFAULT '',
+    bucket INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (topic, platform, post_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS post_topics_post ON post_topics (platform, post_id);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    topic TEXT NOT NULL,
+    day TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    platform TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    term TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (topic, day, bucket, platform, kind, term)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS posts_au AFTER UPDATE OF title, text ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, title, text)
+    VALUES ('delete', old.rowid, old.title, old.text);
+    INSERT INTO posts_fts (rowid, title, text) VALUES (new.rowid, new.title, new.text);
+END;
+"""
+
+UPSERT = """
+INSERT INTO posts (
+    platform, post_id, title, text, author, url, created_ts,
+    score, num_comments, likes, retweets, replies, data, first_seen, last_seen
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (platform, post_id) DO UPDATE SET
+    title = excluded.title,
+    text = excluded.text,
+    score = excluded.score,
+    num_comments = excluded.num_comments,
+    likes = excluded.likes,
+    retweets = excluded.retweets,
+    replies = excluded.replies,
+    data = excluded.data,
+    last_seen = excluded.last_seen
+"""
+
+ADD_ROLLUP = """
+INSERT INTO rollups (topic, day, bucket, platform, kind, term, count) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (topic, day, bucket, platform, kind, term) DO UPDATE SET count = count + excluded.count
+"""
+
+PLACE_POST_TOPIC = """
+UPDATE post_topics SET day = ?, bucket = ? WHERE topic = ? AND platform = ? AND post_id = ?
+"""
+
+DROP_EMPTY_ROLLUP = """
+DELETE FROM rollups WHERE topic = ? AND day = ? AND bucket = ? AND platform = ? AND kind = ?
+AND term = ? AND count <= 0
+"""
+
+
+def normalize_topic(topic: str) -> str:
+    """Canonical form of a search topic, used to key rollups."""
+    return " ".join(re.findall(r"\w+", topic.lower()))
+
+
+def post_key(post: Dict) -> Tuple[str, str]:
+    """Return the (platform, id) a post is stored under."""
+    return post.get("platform"), str(post.get("id") or post.get("url"))
+
+
+def _utc_day(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d")
+
+
+def post_day(post: Dict) -> str:
+    """Return the UTC day a post was created, as YYYY-MM-DD."""
+    return _utc_day(post_timestamp(post))
+
+
+def engagement_bucket(engagement: int) -> int:
+    """Return the lower bound of the ENGAGEMENT_BUCKETS bucket an engagement score falls in."""
+    if engagement < 0:
+        return NEGATIVE_BUCKET
+    return max(bound for bound in ENGAGEMENT_BUCKETS if bound <= engagement)
+
+
+def post_bucket(post: Dict) -> int:
+    return engagement_bucket(engagement_filter.calculate_engagement_score(post, post["platform"]))
+
+
+def whole_days(
+    start_date: Optional[datetime], end_date: Optional[datetime]
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Return the first and last UTC day lying wholly within [start_date, end_date].
+
+    Days are YYYY-MM-DD; None means unbounded. The bounds are compared as
+    epoch seconds, like iter_query() compares created_ts.
+    """
+    first = last = None
+    if start_date:
+        start = int(start_date.timestamp())
+        first = _utc_day(-(-start // SECONDS_PER_DAY) * SECONDS_PER_DAY)
+    if end_date:
+        end = int(end_date.timestamp())
+        last = _utc_day((end + 1) // SECONDS_PER_DAY * SECONDS_PER_DAY - SECONDS_PER_DAY)
+    return first, last
+
+
+def count_post_terms(daily: Dict[str, Dict], post: Dict, sign: int = 1):
+    """
+    Add (or with sign=-1, remove) a post's term counts to daily rollups in place.
+
+    daily has the shape rollups() returns; terms whose count drops to zero
+    are removed.
+    """
+    day = daily.setdefault(post_day(post), _empty_day())
+    day["posts"] += sign
+    for kind, counts in trend_analyzer.post_term_counts(post).items():
+        totals = day[kind]
+        for term, count in counts.items():
+            totals[term] += sign * count
+            if totals[term] <= 0:
+                del totals[term]
+
+
+def _empty_day() -> Dict:
+    return {"posts": 0, **{kind: Counter() for kind in trend_analyzer.ROLLUP_KINDS}}
+
+
+def fts_query(topic: str) -> str:
+    """Turn a free-text topic into an FTS5 query matching all of its words."""
+    words = re.findall(r"\w+", topic.lower())
+    return " ".join(f'"{word}"' for word in words)
+
+
+class PostStore:
+    """
+    SQLite store of posts with an FTS5 index on title and text.
+
+    Posts are upserted by (platform, id); re-fetching a post refreshes its
+    engagement metrics and keeps its first_seen time.
+
+    Alongside the posts it keeps per-topic, per-UTC-day, per-engagement-bucket,
+    per-platform counts of keywords, phrases and hashtags. Each post is
+    counted once per topic it was fetched for, when it is first stored under
+    that topic; a refresh that moves it to another day or bucket or changes
+    its text moves its counts. Rollups built with a different tokenizer are
+    recounted from the stored posts on open.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else DEFAULT_STORE_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._check_rollups()
+
+    def _migrate(self):
+        """Bring rollup tables from before engagement buckets up to SCHEMA."""
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(rollups)")]
+        if not columns or "bucket" in columns:
+            return
+        with self._conn:
+            self._conn.execute("DROP TABLE rollups")
+            self._conn.execute("ALTER TABLE post_topics ADD COLUMN day TEXT NOT NULL DEFAULT ''")
+            self._conn.execute("ALTER TABLE post_topics ADD COLUMN bucket INTEGER NOT NULL DEFAULT 0")
+
+    def _check_rollups(self):
+        version = f"{ROLLUP_VERSION}:{tokenizer.get_tokenizer().version}"
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'rollup_tokenizer'").fetchone()
+        if row and row[0] == version:
+            return
+        if row or self._conn.execute("SELECT 1 FROM post_topics LIMIT 1").fetchone():
+            self.rebuild_rollups()
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('rollup_tokenizer', ?)", (version,)
+            )
+
+    def rebuild_rollups(self):
+        """Recount every topic's rollups from the stored posts."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM rollups")
+                cursor = self._conn.execute(
+                    "SELECT t.topic, p.data FROM post_topics t JOIN posts p "
+                    "ON p.platform = t.platform AND p.post_id = t.post_id ORDER BY t.topic"
+                )
+                while True:
+                    rows = cursor.fetchmany(BATCH_SIZE)
+                    if not rows:
+                        break
+                    deltas = Counter()
+                    placed = []
+                    for topic, data in rows:
+                        post = fast_json.loads(data)
+                        day, bucket = self._count_terms(topic, post, deltas)
+                        placed.append((day, bucket, topic, *post_key(post)))
+                    self._conn.executemany(
+                        ADD_ROLLUP, [(*key, count) for key, count in deltas.items()]
+                    )
+                    self._conn.executemany(PLACE_POST_TOPIC, placed)
+
+    @staticmethod
+    def _count_terms(topic: str, post: Dict, deltas: Counter, sign: int = 1) -> Tuple[str, int]:
+        """Add a post's counts to deltas under topic; return the (day, bucket) they went to."""
+        day = post_day(post)
+        bucket = post_bucket(post)
+        platform = post["platform"]
+        deltas[(topic, day, bucket, platform, "posts", "")] += sign
+        for kind, counts in trend_analyzer.post_term_counts(post).items():
+            for term, count in counts.items():
+                deltas[(topic, day, bucket, platform, kind, term)] += sign * count
+        return day, bucket
+
+    def _apply_deltas(self, deltas: Counter):
+        self._conn.executemany(
+            ADD_ROLLUP, [(*key, count) for key, count in deltas.items() if count]
+        )
+        self._conn.executemany(
+            DROP_EMPTY_ROLLUP, [key for key, count in deltas.items() if count < 0]
+        )
+
+    def _row(self, post: Dict, now: int) -> Optional[tuple]:
+        post_id = post.get("id") or post.get("url")
+        platform = post.get("platform")
+        if not post_id or not platform:
+            return None
+
+        # Derived fields are recomputed per run and not stored
+        data = {k: v for k, v in post.items() if k not in ("engagement_score", "sentiment_data")}
+        return (
+            platform,
+            str(post_id),
+            post.get("title") or "",
+            post.get("text") or "",
+            post.get("author"),
+            post.get("url"),
+            post_timestamp(post),
+            *(int(post.get(field) or 0) for field in METRIC_FIELDS),
+            json.dumps(data, default=str, ensure_ascii=False),
+            now,
+            now,
+        )
+
+    def _refresh_rollups(self, posts: List[Dict]):
+        """
+        Move the counts of already-counted posts whose day, bucket or text
+        changed; caller holds a transaction and upserts the posts after.
+        """
+        deltas = Counter()
+        moved = []
+        for post in posts:
+            key = post_key(post)
+            topics = self._conn.execute(
+                "SELECT topic FROM post_topics WHERE platform = ? AND post_id = ?", key
+            ).fetchall()
+            if not topics:
+                continue
+            row = self._conn.execute(
+                "SELECT data FROM posts WHERE platform = ? AND post_id = ?", key
+            ).fetchone()
+            old = fast_json.loads(row[0])
+            if (
+                post_day(old) == post_day(post)
+                and post_bucket(old) == post_bucket(post)
+                and (old.get("title") or "") == (post.get("title") or "")
+                and (old.get("text") or "") == (post.get("text") or "")
+            ):
+                continue
+            for (topic,) in topics:
+                self._count_terms(topic, old, deltas, sign=-1)
+                day, bucket = self._count_terms(topic, post, deltas)
+                moved.append((day, bucket, topic, *key))
+
+        if moved:
+            self._apply_deltas(deltas)
+            self._conn.executemany(PLACE_POST_TOPIC, moved)
+
+    def _add_rollups(self, topic: str, posts: List[Dict]):
+        """Count newly seen (topic, post) pairs into the rollups; caller holds a transaction."""
+        deltas = Counter()
+        for post in posts:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO post_topics (topic, platform, post_id) VALUES (?, ?, ?)",
+                (topic, *post_key(post)),
+            )
+            if cursor.rowcount != 1:
+                continue
+
+            day, bucket = self._count_terms(topic, post, deltas)
+            self._conn.execute(PLACE_POST_TOPIC, (day, bucket, topic, *post_key(post)))
+
+        self._apply_deltas(deltas)
+
+    def upsert_posts(self, posts: Iterable[Dict], topic: Optional[str] = None) -> int:
+        """
+        Insert or refresh posts in batched transactions; return rows written.
+
+        If topic is given, posts not yet stored under it are added to that
+        topic's rollups in the same transaction.
+        """
+        now = int(time.time())
+        topic = normalize_topic(topic) if topic else None
+        rows = []
+        stored = []
+        for post in posts:
+            row = self._row(post, now)
+            if row:
+                rows.append(row)
+                stored.append(post)
+
+        with self._lock:
+            for start in range(0, len(rows), BATCH_SIZE):
+                batch = stored[start:start + BATCH_SIZE]
+                with self._conn:
+                    self._refresh_rollups(batch)
+                    self._conn.executemany(UPSERT, rows[start:start + BATCH_SIZE])
+                    if topic:
+                        self._add_rollups(topic, batch)
+
+        return len(rows)
+
+    @staticmethod
+    def _rollup_clauses(
+        topic: str,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        min_engagement: Optional[int],
+    ) -> Optional[Tuple[List[str], List]]:
+        """WHERE clauses for the rollups a report may sum, or None if none qualify."""
+        clauses = ["topic = ?"]
+        params: List = [normalize_topic(topic)]
+        first, last = whole_days(start_date, end_date)
+        if first and last and first > last:
+            return None
+        if first:
+            clauses.append("day >= ?")
+            params.append(first)
+        if last:
+            clauses.append("day <= ?")
+            params.append(last)
+        if min_engagement is not None:
+            bounds = [bound for bound in ENGAGEMENT_BUCKETS if bound >= min_engagement]
+            if not bounds:
+                return None
+            clauses.append("bucket >= ?")
+            params.append(bounds[0])
+        return clauses, params
+
+    def rollups(
+        self,
+        topic: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        platforms: Optional[List[str]] = None,
+        min_engagement: Optional[int] = None,
+    ) -> Dict[str, Dict]:
+        """
+        Return a topic's daily term counts, summed over platforms and buckets.
+
+        Maps "YYYY-MM-DD" to {"posts": n, "keyword": Counter, "phrase":
+        Counter, "hashtag": Counter}, the input trend_analyzer.analyze_rollups
+        expects. Only UTC days lying wholly in the date range are included,
+        and with min_engagement only the buckets at or above it; these are
+        the posts rollup_posts() returns. Empty if nothing was fetched for
+        the topic in the range.
+        """
+        selected = self._rollup_clauses(topic, start_date, end_date, min_engagement)
+        if selected is None:
+            return {}
+        clauses, params = selected
+        if platforms:
+            clauses.append(f"platform IN ({','.join('?' * len(platforms))})")
+            params.extend(platforms)
+
+        sql = (
+            "SELECT day, kind, term, SUM(count) FROM rollups WHERE "
+            + " AND ".join(clauses)
+            + " GROUP BY day, kind, term"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        daily = defaultdict(_empty_day)
+        for day, kind, term, count in rows:
+            if kind == "posts":
+                daily[day]["posts"] += count
+            else:
+                daily[day][kind][term] = count
+        return dict(daily)
+
+    def rollup_posts(
+        self,
+        topic: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        min_engagement: Optional[int] = None,
+    ) -> Set[Tuple[str, str]]:
+        """Return the (platform, id) of every post rollups() counts for the same arguments."""
+        selected = self._rollup_clauses(topic, start_date, end_date, min_engagement)
+        if selected is None:
+            return set()
+        clauses, params = selected
+        sql = "SELECT platform, post_id FROM post_topics WHERE " + " AND ".join(clauses)
+        with self._lock:
+            return set(self._conn.execute(sql, params).fetchall())
+
+    def query(
+        self,
+        topic: str = "",
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        platforms: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Return stored posts matching a topic and date range.
+
+        The topic is matched against title and text through the FTS index
+        (all words must appear). Posts come back newest first.
+        """
+        return list(self.iter_query(topic, start_date, end_date, platforms, limit))
+
+    def iter_query(
+        self,
+        topic: str = "",
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        platforms: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Dict]:
+        """Like query(), but yields posts as rows are fetched, BATCH_SIZE at a time."""
+        clauses = []
+        params: List = []
+
+        match = fts_query(topic)
+        if match:
+            clauses.append("posts.rowid IN (SELECT rowid FROM posts_fts WHERE posts_fts MATCH ?)")
+            params.append(match)
+        if start_date:
+            clauses.append("created_ts >= ?")
+            params.append(int(start_date.timestamp()))
+        if end_date:
+            clauses.append("created_ts <= ?")
+            params.append(int(end_date.timestamp()))
+        if platforms:
+            clauses.append(f"platform IN ({','.join('?' * len(platforms))})")
+            params.extend(platforms)
+
+        sql = "SELECT data FROM posts"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_ts DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(BATCH_SIZE)
+            if not rows:
+                return
+            for (data,) in rows:
+                yield fast_json.loads(data)
+
+    def get_posts(self, keys: Iterable[Tuple[str, str]]) -> Iterator[Dict]:
+        """Yield the stored posts with the given (platform, id) keys; missing keys are skipped."""
+        for platform, post_id in keys:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT data FROM posts WHERE platform = ? AND post_id = ?", (platform, post_id)
+                ).fetchone()
+            if row:
+                yield fast_json.loads(row[0])
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_stores: Dict[Path, PostStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: Optional[str] = None) -> Optional[PostStore]:
+    """Return the shared store at path (default store if None), or None if it cannot be opened."""
+    key = Path(path) if path else DEFAULT_STORE_PATH
+
+    with _stores_lock:
+        if key not in _stores:
+            try:
+                _stores[key] = PostStore(key)
+            except (OSError, sqlite3.Error) as e:
+                print(f"Post store unavailable: {e}")
+                return None
+        return _stores[key]
@@ -0,0 +1,273 @@
+"""
+Profiler module - Per-stage timing, memory and counter instrumentation
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# tracemalloc and cProfile are imported only once a Profiler is created, so
+# marking stages costs no import time when profiling is off
+_current: contextvars.ContextVar = contextvars.ContextVar("profiler", default=None)
+
+# tracemalloc is process-global, so profilers in concurrent jobs (e.g. the
+# daemon's threads) share it: it starts with the first memory profiler and
+# stops with the last, if this module started it
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_started_tracing = False
+# Peak so far of each stage measuring memory, by id of its record; folded in
+# from tracemalloc before every reset_peak() so no stage loses its peak
+_open_peaks: Dict[int, int] = {}
+
+
+def _start_tracing():
+    global _tracing_users, _started_tracing
+    import tracemalloc
+
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_users, _started_tracing
+    import tracemalloc
+
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+def _watch_memory(key: int) -> int:
+    """Start tracking a peak under key; return the memory in use now."""
+    import tracemalloc
+
+    with _tracing_lock:
+        current, peak = tracemalloc.get_traced_memory()
+        for other, other_peak in _open_peaks.items():
+            _open_peaks[other] = max(other_peak, peak)
+        tracemalloc.reset_peak()
+        _open_peaks[key] = current
+        return current
+
+
+def _unwatch_memory(key: int) -> tuple:
+    """Stop tracking key's peak; return (memory in use, peak since _watch_memory)."""
+    import tracemalloc
+
+    with _tracing_lock:
+        current, peak = tracemalloc.get_traced_memory()
+        return current, max(_open_peaks.pop(key), peak)
+
+
+class StageRecord:
+    """Measurements for one pipeline stage."""
+
+    def __init__(self, name: str, items_in: Optional[int] = None):
+        self.name = name
+        self.items_in = items_in
+        self.items_out: Optional[int] = None
+        self.counters: Dict[str, float] = {}
+        self.start_us = 0
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.memory_peak_bytes: Optional[int] = None
+        self.memory_delta_bytes: Optional[int] = None
+        self.pid = os.getpid()
+        self.thread_id = threading.get_ident()
+
+    def count(self, name: str, n: float = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def as_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "wall_s": round(self.wall_s, 6),
+            "cpu_s": round(self.cpu_s, 6),
+            "memory_peak_bytes": self.memory_peak_bytes,
+            "memory_delta_bytes": self.memory_delta_bytes,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "counters": self.counters,
+        }
+
+
+class Profiler:
+    """
+    Collects a StageRecord per pipeline stage.
+
+    Wall time uses perf_counter and CPU time process_time (so threads a
+    stage starts are included). With memory=True, tracemalloc runs while
+    the profiler is active and each stage records its allocation peak above
+    the memory in use when it started. If cprofile_stage names a stage,
+    that stage also runs under cProfile.
+
+    tracemalloc traces the whole process, so with profilers active in
+    other threads a stage's memory figures include their allocations.
+    Nested and concurrent stages each keep their own peak. Stages measured
+    elsewhere (e.g. in a worker process whose profiler shares this one's
+    origin) can be added with add().
+    """
+
+    def __init__(
+        self,
+        memory: bool = True,
+        cprofile_stage: Optional[str] = None,
+        origin: Optional[float] = None,
+    ):
+        self.memory = memory
+        self.cprofile_stage = cprofile_stage
+        self.cprofile = None
+        self.stages: List[StageRecord] = []
+        self.metadata: Dict = {}
+        self._active: Optional[StageRecord] = None
+        self._tracing = False
+        self.origin = time.perf_counter() if origin is None else origin
+
+    def start(self):
+        if self.memory and not self._tracing:
+            _start_tracing()
+            self._tracing = True
+
+    def stop(self):
+        if self._tracing:
+            _stop_tracing()
+            self._tracing = False
+
+    @contextmanager
+    def stage(self, name: str, items_in: Optional[int] = None) -> Iterator[StageRecord]:
+        record = StageRecord(name, items_in)
+        outer = self._active
+        self._active = record
+
+        tracing = self._tracing
+        if tracing:
+            mem_start = _watch_memory(id(record))
+        profile = None
+        # "trends" also covers its parts, e.g. "trends.topics"
+        if self.cprofile_stage and name.split(".")[0] == self.cprofile_stage:
+            import cProfile
+            profile = self.cprofile = self.cprofile or cProfile.Profile()
+            profile.enable()
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_s = time.perf_counter() - wall_start
+            record.cpu_s = time.process_time() - cpu_start
+            record.start_us = int((wall_start - self.origin) * 1e6)
+            if profile:
+                profile.disable()
+            if tracing:
+                current, peak = _unwatch_memory(id(record))
+                record.memory_peak_bytes = peak - mem_start
+                record.memory_delta_bytes = current - mem_start
+            self._active = outer
+            self.stages.append(record)
+
+    def add(self, record: StageRecord):
+        """Add a stage measured by another profiler."""
+        self.stages.append(record)
+
+    def count(self, name: str, n: float = 1):
+        """Add to a counter of the stage currently running."""
+        if self._active is not None:
+            self._active.count(name, n)
+
+    def as_dict(self) -> Dict:
+        stages = sorted(self.stages, key=lambda s: s.start_us)
+        total_wall_s = 0.0
+        if stages:
+            end_us = max(s.start_us + s.wall_s * 1e6 for s in stages)
+            total_wall_s = (end_us - stages[0].start_us) / 1e6
+        return {
+            **self.metadata,
+            "total_wall_s": round(total_wall_s, 6),
+            "stages": [s.as_dict() for s in stages],
+        }
+
+    def write_json(self, path: Path):
+        with open(path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def write_chrome_trace(self, path: Path):
+        """Write stages as complete ("X") events for chrome://tracing or Perfetto."""
+        events = [
+            {
+                "name": s.name,
+                "cat": "stage",
+                "ph": "X",
+                "ts": s.start_us,
+                "dur": int(s.wall_s * 1e6),
+                "pid": s.pid,
+                "tid": s.thread_id,
+                "args": {k: v for k, v in s.as_dict().items() if k != "name"},
+            }
+            for s in self.stages
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms", "metadata": self.metadata}, f)
+
+    def write_cprofile(self, path: Path) -> bool:
+        """Dump the selected stage's cProfile stats (pstats format); False if it never ran."""
+        if self.cprofile is None:
+            return False
+        self.cprofile.dump_stats(str(path))
+        return True
+
+
+_NULL_RECORD = StageRecord("")
+
+
+@contextmanager
+def activate(profiler: Optional[Profiler]) -> Iterator[Optional[Profiler]]:
+    """Make profiler the current one in this context (None disables profiling)."""
+    token = _current.set(profiler)
+    if profiler:
+        profiler.start()
+    try:
+        yield profiler
+    finally:
+        if profiler:
+            profiler.stop()
+        _current.reset(token)
+
+
+def current() -> Optional[Profiler]:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str, items_in: Optional[int] = None) -> Iterator[StageRecord]:
+    """
+    Measure a stage with the current profiler.
+
+    Without an active profiler this yields a throwaway record, so stages
+    can be marked unconditionally at negligible cost.
+    """
+    profiler = _current.get()
+    if profiler is None:
+        _NULL_RECORD.counters.clear()
+        yield _NULL_RECORD
+        return
+    with profiler.stage(name, items_in) as record:
+        yield record
+
+
+def count(name: str, n: float = 1):
+    """Add to a counter of the current stage, if profiling."""
+    profiler = _current.get()
+    if profiler is not None:
+        profiler.count(name, n)
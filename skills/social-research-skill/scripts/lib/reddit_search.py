@@ -2,12 +2,21 @@
 Reddit search module - Search Reddit for discussions
 """
 
+import contextvars
+import heapq
 import os
-import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 from typing import List, Dict, Optional
 import requests
 
+from . import fast_json, http_pool, profiler, saturation
+
+# API hosts, overridable to point the fetchers at a stand-in server such as
+# benchmarks/mock_api.py
+REDDIT_AUTH_URL = os.getenv("REDDIT_AUTH_URL", "https://www.reddit.com").rstrip("/")
+REDDIT_API_URL = os.getenv("REDDIT_API_URL", "https://oauth.reddit.com").rstrip("/")
+PUSHSHIFT_API_URL = os.getenv("PUSHSHIFT_API_URL", "https://api.pushshift.io").rstrip("/")
 
 def get_reddit_credentials() -> Optional[Dict[str, str]]:
     """Get Reddit API credentials from environment."""
@@ -25,7 +34,7 @@ def get_reddit_credentials() -> Optional[Dict[str, str]]:
 
 
 def get_access_token(credentials: Dict[str, str]) -> Optional[str]:
-    """Get Reddit OAuth access token."""
+    """Get Reddit OAuth access token, reusing it until it expires."""
     auth = requests.auth.HTTPBasicAuth(
         credentials["client_id"], credentials["client_secret"]
     )
@@ -33,19 +42,24 @@ def get_access_token(credentials: Dict[str, str]) -> Optional[str]:
     data = {"grant_type": "client_credentials"}
     headers = {"User-Agent": credentials["user_agent"]}
     
-    try:
-        response = requests.post(
-            "https://www.reddit.com/api/v1/access_token",
-            auth=auth,
-            data=data,
-            headers=headers,
-            timeout=10,
-        )
-        response.raise_for_status()
-        return response.json()["access_token"]
-    except Exception as e:
-        print(f"Failed to get Reddit access token: {e}")
-        return None
+    def fetch_token():
+        try:
+            with http_pool.session() as session:
+                response = session.post(
+                    f"{REDDIT_AUTH_URL}/api/v1/access_token",
+                    auth=auth,
+                    data=data,
+                    headers=headers,
+                    timeout=10,
+                )
+            response.raise_for_status()
+            payload = response.json()
+            return payload["access_token"], payload.get("expires_in", 3600)
+        except Exception as e:
+            print(f"Failed to get Reddit access token: {e}")
+            return None
+    
+    return http_pool.get_token(f"reddit:{credentials['client_id']}", fetch_token)
 
 
 def search_via_api(
@@ -54,8 +68,15 @@ def search_via_api(
     end_date: datetime,
     limit: int,
     credentials: Dict[str, str],
+    min_yield: float = 0.0,
+    min_engagement: Optional[int] = None,
 ) -> List[Dict]:
-    """Search Reddit using official API."""
+    """
+    Search Reddit using official API.
+
+    With min_yield, paging stops early once pages stop adding new unique
+    posts of at least min_engagement (see saturation.PageYield).
+    """
     access_token = get_access_token(credentials)
     if not access_token:
         return []
@@ -67,6 +88,7 @@ def search_via_api(
     
     results = []
     after = None
+    pages = saturation.PageYield("reddit", min_yield, min_engagement)
     
     # Convert dates to timestamps
     start_ts = int(start_date.timestamp())
@@ -84,109 +106,230 @@ def search_via_api(
             params["after"] = after
         
         try:
-            response = requests.get(
-                "https://oauth.reddit.com/search",
-                headers=headers,
-                params=params,
-                timeout=15,
-            )
+            http_pool.throttle("reddit")
+            with http_pool.session() as session:
+                response = session.get(
+                    f"{REDDIT_API_URL}/search",
+                    headers=headers,
+                    params=params,
+                    timeout=15,
+                )
             response.raise_for_status()
-            data = response.json()
+            data = fast_json.loads(response.content, fast_json.RedditListing)
             
-            posts = data.get("data", {}).get("children", [])
+            posts = data.data.children
             if not posts:
                 break
             
+            page_start = len(results)
             for post in posts:
-                post_data = post.get("data", {})
-                created_utc = post_data.get("created_utc", 0)
+                post_data = post.data
+                created_utc = post_data.created_utc
                 
                 # Filter by date range
                 if start_ts <= created_utc <= end_ts:
                     results.append({
-                        "id": post_data.get("id"),
-                        "title": post_data.get("title"),
-                        "text": post_data.get("selftext", ""),
-                        "author": post_data.get("author"),
-                        "subreddit": post_data.get("subreddit"),
-                        "url": f"https://reddit.com{post_data.get('permalink')}",
-                        "score": post_data.get("score", 0),
-                        "num_comments": post_data.get("num_comments", 0),
+                        "id": post_data.id,
+                        "title": post_data.title,
+                        "text": post_data.selftext,
+                        "author": post_data.author,
+                        "subreddit": post_data.subreddit,
+                        "url": f"https://reddit.com{post_data.permalink}",
+                        "score": post_data.score,
+                        "num_comments": post_data.num_comments,
                         "created_utc": created_utc,
                         "created_date": datetime.fromtimestamp(created_utc).isoformat(),
                         "platform": "reddit",
                     })
             
-            after = data.get("data", {}).get("after")
+            after = data.data.after
             if not after:
                 break
-            
-            # Rate limiting
-            time.sleep(1)
+
+            pages.record(len(posts), results[page_start:])
+            if pages.saturated:
+                print(f"Reddit API: stopped after {pages.pages} pages; "
+                      f"the last {pages.low_pages} added few new posts")
+                break
             
         except Exception as e:
+            # Nothing fetched yet: let the caller see the failure
+            if not results:
+                raise
             print(f"Reddit API error: {e}")
             break
     
     return results[:limit]
 
 
-def search_via_pushshift(
-    query: str, start_date: datetime, end_date: datetime, limit: int
-) -> List[Dict]:
-    """Search Reddit using Pushshift API (fallback)."""
-    base_url = "https://api.pushshift.io/reddit/search/submission"
-    
+PUSHSHIFT_URL = f"{PUSHSHIFT_API_URL}/reddit/search/submission"
+# Posts per Pushshift request (the API's maximum)
+PUSHSHIFT_PAGE_SIZE = 100
+# Equal time slices a range query starts with, and how many are fetched at once
+PUSHSHIFT_SLICES = 8
+PUSHSHIFT_WORKERS = 4
+# Full slices narrower than this are not split further
+PUSHSHIFT_MIN_SLICE_SECONDS = 60
+# Safety cap on the requests one search may make: this many, or four per
+# page of results asked for if that is more
+PUSHSHIFT_MAX_REQUESTS = 200
+
+
+def _pushshift_post(post: fast_json.RedditPost) -> Dict:
+    return {
+        "id": post.id,
+        "title": post.title,
+        "text": post.selftext,
+        "author": post.author,
+        "subreddit": post.subreddit,
+        "url": f"https://reddit.com/r/{post.subreddit}/comments/{post.id}",
+        "score": post.score,
+        "num_comments": post.num_comments,
+        "created_utc": post.created_utc,
+        "created_date": datetime.fromtimestamp(post.created_utc).isoformat(),
+        "platform": "reddit",
+    }
+
+
+def fetch_pushshift_slice(query: str, after: int, before: int, size: int) -> List[Dict]:
+    """Fetch the highest-scoring posts created in [after, before) with one request."""
     params = {
         "q": query,
-        "after": int(start_date.timestamp()),
-        "before": int(end_date.timestamp()),
-        "size": min(100, limit),
+        "after": after,
+        "before": before,
+        "size": size,
         "sort": "desc",
         "sort_type": "score",
     }
-    
-    results = []
-    
-    try:
-        response = requests.get(base_url, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        
-        for post in data.get("data", []):
-            results.append({
-                "id": post.get("id"),
-                "title": post.get("title"),
-                "text": post.get("selftext", ""),
-                "author": post.get("author"),
-                "subreddit": post.get("subreddit"),
-                "url": f"https://reddit.com/r/{post.get('subreddit')}/comments/{post.get('id')}",
-                "score": post.get("score", 0),
-                "num_comments": post.get("num_comments", 0),
-                "created_utc": post.get("created_utc", 0),
-                "created_date": datetime.fromtimestamp(post.get("created_utc", 0)).isoformat(),
-                "platform": "reddit",
-            })
-        
-    except Exception as e:
-        print(f"Pushshift API error: {e}")
-    
+    http_pool.throttle("pushshift")
+    with http_pool.session() as session:
+        response = session.get(PUSHSHIFT_URL, params=params, timeout=15)
+    response.raise_for_status()
+    data = fast_json.loads(response.content, fast_json.PushshiftResponse)
+    return [_pushshift_post(post) for post in data.data]
+
+
+def split_range(after: int, before: int, parts: int) -> List[tuple]:
+    """Split [after, before) into up to `parts` contiguous, near-equal slices."""
+    parts = max(1, min(parts, before - after))
+    bounds = [after + (before - after) * i // parts for i in range(parts + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+
+def search_via_pushshift(
+    query: str,
+    start_date: datetime,
+    end_date: datetime,
+    limit: int,
+    slices: int = PUSHSHIFT_SLICES,
+    workers: int = PUSHSHIFT_WORKERS,
+) -> List[Dict]:
+    """
+    Search Reddit using Pushshift API (fallback).
+
+    The range is split into up to `slices` time slices, about one per page
+    of `limit`, fetched concurrently by `workers` threads (each request
+    still waits for the shared Pushshift rate limit). A slice that fills a
+    whole page may hold more posts than one request returns, so it is split
+    in two and both halves are fetched, unless even its lowest score is
+    below the `limit`-th best found so far: then nothing it hides could
+    make the results. Returns the `limit` highest-scoring posts of the
+    whole range, newest first among equal scores.
+    """
+    size = PUSHSHIFT_PAGE_SIZE
+    # One page holds the top `limit` of a range when limit <= size, so
+    # small searches start with fewer slices
+    slices = min(slices, -(-limit // size))
+    pending = split_range(int(start_date.timestamp()), int(end_date.timestamp()), slices)
+    found: Dict[str, Dict] = {}
+    scores: List[int] = []  # min-heap of the best `limit` scores so far
+    max_requests = max(PUSHSHIFT_MAX_REQUESTS, 4 * -(-limit // size))
+    requests_made = 0
+    failures = []
+
+    def threshold() -> float:
+        return scores[0] if len(scores) >= limit else float("-inf")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        running = {}
+        while pending or running:
+            while pending and requests_made < max_requests:
+                after, before = pending.pop()
+                future = executor.submit(
+                    contextvars.copy_context().run, fetch_pushshift_slice, query, after, before, size
+                )
+                running[future] = (after, before)
+                requests_made += 1
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                after, before = running.pop(future)
+                try:
+                    posts = future.result()
+                except Exception as e:
+                    failures.append(e)
+                    continue
+                profiler.count("pushshift_slices")
+
+                for post in posts:
+                    key = post["id"] or post["url"]
+                    if key in found:
+                        continue
+                    found[key] = post
+                    if len(scores) < limit:
+                        heapq.heappush(scores, post["score"])
+                    elif post["score"] > scores[0]:
+                        heapq.heapreplace(scores, post["score"])
+
+                lowest = min((post["score"] for post in posts), default=0)
+                if len(posts) >= size and lowest > threshold():
+                    if before - after >= 2 * PUSHSHIFT_MIN_SLICE_SECONDS:
+                        pending.extend(split_range(after, before, 2))
+                    else:
+                        profiler.count("pushshift_truncated_slices")
+
+    if pending:
+        print(f"Pushshift: stopped after {requests_made} requests; "
+              f"{len(pending)} dense slices were not fetched")
+    if failures:
+        if not found:
+            raise RuntimeError(f"Pushshift API error: {failures[0]}") from failures[0]
+        print(f"Pushshift API error: {failures[0]} ({len(failures)} slices failed)")
+
+    results = sorted(found.values(), key=lambda post: post["created_utc"], reverse=True)
+    results.sort(key=lambda post: post["score"], reverse=True)
     return results[:limit]
 
 
 def search(
-    query: str, start_date: datetime, end_date: datetime, limit: int = 50
+    query: str,
+    start_date: datetime,
+    end_date: datetime,
+    limit: int = 50,
+    min_yield: float = 0.0,
+    min_engagement: Optional[int] = None,
 ) -> List[Dict]:
     """
     Search Reddit for discussions.
     
-    Tries official API first, falls back to Pushshift if needed.
+    Tries official API first, falls back to Pushshift if needed. min_yield
+    and min_engagement set early stopping for the official API's paging;
+    Pushshift's time slices are ranked by score and already stop where
+    they cannot add top posts.
     """
     credentials = get_reddit_credentials()
     
     if credentials:
         print("Using Reddit official API...")
-        results = search_via_api(query, start_date, end_date, limit, credentials)
+        try:
+            results = search_via_api(
+                query, start_date, end_date, limit, credentials, min_yield, min_engagement
+            )
+        except Exception as e:
+            print(f"Reddit API error: {e}")
+            results = []
         if results:
             return results
     
@@ -0,0 +1,216 @@
+"""
+Report schema module - Normalized report JSON with posts referenced by ID
+"""
+
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from . import fast_json
+
+
+SCHEMA_VERSION = "social-research/normalized-v1"
+
+
+def post_key(post: Dict) -> Optional[str]:
+    """Return a stable ID for a post: "<platform>:<id>", falling back to its URL."""
+    if post.get("id"):
+        return f"{post.get('platform', 'unknown')}:{post['id']}"
+    return post.get("url") or None
+
+
+class _PostTable:
+    """
+    Collects each distinct post once and hands out references to it.
+
+    Without keep_posts only the IDs are tracked (posts map to None), for
+    posts streamed from disk that must not all be held in memory.
+    """
+
+    def __init__(self, keep_posts: bool = True):
+        self.posts: Dict[str, Optional[Dict]] = {}
+        self.keep_posts = keep_posts
+        self._by_identity: Dict[int, str] = {}
+
+    def ref(self, post: Dict) -> str:
+        # Only kept posts stay alive, so only their id()s are safe to cache
+        key = self._by_identity.get(id(post)) if self.keep_posts else None
+        if key is not None:
+            return key
+
+        key = post_key(post)
+        if key is None:
+            key = f"post:{len(self.posts)}"
+
+        if key not in self.posts:
+            # Sentiment examples are copies carrying an extra field
+            self.posts[key] = (
+                {k: v for k, v in post.items() if k != "sentiment_data"}
+                if self.keep_posts else None
+            )
+        if self.keep_posts:
+            self._by_identity[id(post)] = key
+        return key
+
+
+def normalize(data: Dict, keep_posts: bool = True) -> Dict:
+    """
+    Convert a report into the normalized schema.
+
+    Every post is stored once in "post_table"; "posts", trending topic
+    "example_posts", theme and cluster "posts" and sentiment example lists
+    hold post IDs (sentiment examples keep their per-post "sentiment_data"
+    next to the ID).
+    data["posts"] may be any iterable. Without keep_posts the table's
+    values are None, for callers that write the posts elsewhere.
+    """
+    table = _PostTable(keep_posts)
+    doc = {"schema": SCHEMA_VERSION}
+
+    for key, value in data.items():
+        if key not in ("posts", "trends", "sentiment"):
+            doc[key] = value
+
+    doc["posts"] = [table.ref(post) for post in data.get("posts", [])]
+
+    trends = data.get("trends")
+    if trends is not None:
+        trends = dict(trends)
+        trends["topics"] = [
+            {**topic, "example_posts": [table.ref(p) for p in topic.get("example_posts", [])]}
+            for topic in trends.get("topics", [])
+        ]
+        trends["themes"] = [
+            {**theme, "posts": [table.ref(p) for p in theme.get("posts", [])]}
+            for theme in trends.get("themes", [])
+        ]
+        if "clusters" in trends:
+            trends["clusters"] = [
+                {**cluster, "posts": [table.ref(p) for p in cluster.get("posts", [])]}
+                for cluster in trends["clusters"]
+            ]
+    doc["trends"] = trends
+
+    sentiment = data.get("sentiment")
+    if sentiment is not None:
+        sentiment = dict(sentiment)
+        for field in ("positive_posts", "negative_posts"):
+            sentiment[field] = [
+                {"post": table.ref(p), "sentiment_data": p.get("sentiment_data")}
+                for p in sentiment.get(field, [])
+            ]
+    doc["sentiment"] = sentiment
+
+    doc["post_table"] = table.posts
+    return doc
+
+
+def _referenced_posts(data: Dict) -> Iterator[Dict]:
+    """Every post a report references, in the order normalize() visits them."""
+    yield from data.get("posts", [])
+    trends = data.get("trends") or {}
+    for topic in trends.get("topics", []):
+        yield from topic.get("example_posts", [])
+    for theme in trends.get("themes", []):
+        yield from theme.get("posts", [])
+    for cluster in trends.get("clusters", []):
+        yield from cluster.get("posts", [])
+    sentiment = data.get("sentiment") or {}
+    for field in ("positive_posts", "negative_posts"):
+        yield from sentiment.get(field, [])
+
+
+def iter_post_table(data: Dict) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yield the (key, post) entries of normalize(data)'s post table in order.
+
+    Posts are yielded as data["posts"] is iterated, so with a spilled post
+    list only the table's keys are held in memory.
+    """
+    table = _PostTable(keep_posts=False)
+    for post in _referenced_posts(data):
+        known = len(table.posts)
+        key = table.ref(post)
+        if len(table.posts) > known:
+            yield key, {k: v for k, v in post.items() if k != "sentiment_data"}
+
+
+def denormalize(doc: Dict, post_table: Optional[Dict[str, Dict]] = None) -> Dict:
+    """
+    Rehydrate a normalized report into the original embedded shape.
+
+    post_table overrides the document's own table, for reports whose posts
+    were written to a separate JSONL file.
+    """
+    table = post_table if post_table is not None else doc.get("post_table", {})
+    data = {
+        key: value for key, value in doc.items()
+        if key not in ("schema", "post_table", "posts_file")
+    }
+
+    data["posts"] = [table[key] for key in doc.get("posts", []) if key in table]
+
+    trends = doc.get("trends")
+    if trends is not None:
+        trends = dict(trends)
+        trends["topics"] = [
+            {**topic, "example_posts": [table[k] for k in topic.get("example_posts", []) if k in table]}
+            for topic in trends.get("topics", [])
+        ]
+        trends["themes"] = [
+            {**theme, "posts": [table[k] for k in theme.get("posts", []) if k in table]}
+            for theme in trends.get("themes", [])
+        ]
+        if "clusters" in trends:
+            trends["clusters"] = [
+                {**cluster, "posts": [table[k] for k in cluster.get("posts", []) if k in table]}
+                for cluster in trends["clusters"]
+            ]
+    data["trends"] = trends
+
+    sentiment = doc.get("sentiment")
+    if sentiment is not None:
+        sentiment = dict(sentiment)
+        for field in ("positive_posts", "negative_posts"):
+            examples = []
+            for item in sentiment.get(field, []):
+                if item["post"] not in table:
+                    continue
+                post = dict(table[item["post"]])
+                post["sentiment_data"] = item["sentiment_data"]
+                examples.append(post)
+            sentiment[field] = examples
+    data["sentiment"] = sentiment
+
+    return data
+
+
+def load_posts_jsonl(path: str) -> Dict[str, Dict]:
+    """Build a post table from a JSONL post file."""
+    table = {}
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                post = fast_json.loads(line)
+                table[post_key(post) or f"post:{len(table)}"] = post
+    return table
+
+
+def load_report(path: str) -> Dict:
+    """
+    Load a JSON report in the original embedded shape.
+
+    Accepts both normalized and legacy reports. A report that names a
+    "posts_file" has its posts read from that JSONL file next to it.
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        doc = fast_json.loads(f.read())
+
+    if doc.get("schema") != SCHEMA_VERSION:
+        return doc
+
+    post_table = None
+    if doc.get("posts_file"):
+        post_table = load_posts_jsonl(path.parent / doc["posts_file"])
+
+    return denormalize(doc, post_table)
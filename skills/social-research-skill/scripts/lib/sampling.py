@@ -0,0 +1,179 @@
+"""
+Sampling module - Engagement-stratified reservoir samples with confidence intervals
+"""
+
+import math
+import random
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import sentiment_analyzer, trend_analyzer
+
+# Lower engagement bound of each stratum. Engagement is heavy-tailed, so a
+# uniform sample of a large corpus may hold none of its few viral posts;
+# sampling each band separately keeps all of them represented
+ENGAGEMENT_STRATA = (0, 10, 100, 1000, 10000)
+
+# Every stratum that has posts gets at least this many in the sample (if it
+# has that many), so its variance can be estimated
+MIN_STRATUM_POSTS = 2
+
+# Two-sided 95% normal quantile
+Z_95 = 1.96
+
+SENTIMENT_FIELDS = ("positive", "negative", "neutral", "mixed")
+
+
+class StratifiedReservoir:
+    """
+    A fixed-size sample of a post stream, stratified by engagement score.
+
+    Each stratum keeps a uniform reservoir of up to size posts (Algorithm
+    R), so memory is bounded by len(strata) x size posts however long the
+    stream is. draw() then allocates the size posts to the strata in
+    proportion to how many posts each saw.
+    """
+
+    def __init__(self, size: int, strata: Sequence[int] = ENGAGEMENT_STRATA, seed: int = 0):
+        if size < 1:
+            raise ValueError("sample size must be at least 1")
+        self.size = size
+        self.strata = tuple(strata)
+        self.seen = [0] * len(self.strata)
+        self.sampled = [0] * len(self.strata)
+        self._reservoirs: List[List[Dict]] = [[] for _ in self.strata]
+        self._rng = random.Random(seed)
+
+    @property
+    def population(self) -> int:
+        """Posts added so far."""
+        return sum(self.seen)
+
+    def stratum(self, post: Dict) -> int:
+        """Index of the stratum post's engagement score falls in."""
+        return max(bisect_right(self.strata, post.get("engagement_score", 0)) - 1, 0)
+
+    def add(self, post: Dict):
+        stratum = self.stratum(post)
+        self.seen[stratum] += 1
+        reservoir = self._reservoirs[stratum]
+        if len(reservoir) < self.size:
+            reservoir.append(post)
+        else:
+            slot = self._rng.randrange(self.seen[stratum])
+            if slot < self.size:
+                reservoir[slot] = post
+
+    def extend(self, posts: Iterable[Dict]):
+        for post in posts:
+            self.add(post)
+
+    def allocation(self) -> List[int]:
+        """Posts to draw per stratum: proportional, with MIN_STRATUM_POSTS floors."""
+        total = self.population
+        n = min(self.size, total)
+        if not n:
+            return [0] * len(self.strata)
+        quotas = [n * seen / total for seen in self.seen]
+        counts = [
+            max(min(seen, MIN_STRATUM_POSTS), math.floor(quota))
+            for seen, quota in zip(self.seen, quotas)
+        ]
+        # The floors can overshoot n (taken back from the largest strata) and
+        # rounding down undershoots it (given to the largest remainders)
+        while sum(counts) > n:
+            counts[max(range(len(counts)), key=lambda i: counts[i])] -= 1
+        while sum(counts) < n:
+            open_strata = [i for i in range(len(counts)) if counts[i] < self.seen[i]]
+            counts[max(open_strata, key=lambda i: quotas[i] - counts[i])] += 1
+        return counts
+
+    def draw(self) -> List[Dict]:
+        """The sample: a uniform subset of each stratum's reservoir, in stratum order."""
+        sample = []
+        for stratum, count in enumerate(self.allocation()):
+            sample.extend(self._rng.sample(self._reservoirs[stratum], count))
+            self.sampled[stratum] = count
+        return sample
+
+    def interval(
+        self,
+        posts: Iterable[Dict],
+        values: Iterable[float],
+        upper: Optional[float] = 100.0,
+    ) -> Tuple[float, float, float]:
+        """
+        Stratified estimate of a population mean, with a 95% interval.
+
+        posts are the sampled posts (or those of them kept after
+        deduplication) and values the quantity measured on each. Each
+        stratum's sample mean is weighted by the stratum's share of the
+        population; the variance includes the finite population
+        correction. Strata with no posts in the sample are left out and
+        the other weights rescaled. Returns (estimate, low, high), clipped
+        to [0, upper].
+        """
+        strata = defaultdict(list)
+        for post, value in zip(posts, values):
+            strata[self.stratum(post)].append(value)
+        covered = sum(self.seen[stratum] for stratum in strata)
+        if not covered:
+            return 0.0, 0.0, 0.0
+
+        estimate = variance = 0.0
+        for stratum, ys in strata.items():
+            n, size = len(ys), self.seen[stratum]
+            weight = size / covered
+            mean = sum(ys) / n
+            estimate += weight * mean
+            if n > 1:
+                s2 = sum((y - mean) ** 2 for y in ys) / (n - 1)
+                variance += weight * weight * s2 / n * max(1 - n / size, 0)
+
+        half = Z_95 * math.sqrt(variance)
+        high = estimate + half if upper is None else min(estimate + half, upper)
+        return estimate, max(estimate - half, 0.0), high
+
+    def describe(self, sampled_posts: int) -> Dict:
+        """Sample size and per-stratum counts for the report stats."""
+        return {
+            "size": sampled_posts,
+            "population": self.population,
+            "confidence": 0.95,
+            "strata": [
+                {"min_engagement": bound, "population": seen, "sampled": sampled}
+                for bound, seen, sampled in zip(self.strata, self.seen, self.sampled)
+            ],
+        }
+
+
+def _set_estimate(item: Dict, field: str, estimate: Tuple[float, float, float]):
+    value, low, high = estimate
+    item[field] = round(value, 1)
+    item[f"{field}_ci"] = [round(low, 1), round(high, 1)]
+
+
+def annotate_trends(trends: Dict, posts: Sequence[Dict], sample: StratifiedReservoir):
+    """
+    Replace each trending topic's percentage with its population estimate.
+
+    A topic's percentage is its mentions per 100 posts, so the estimate
+    is of the mean per-post mention count (x100), and may exceed 100.
+    Adds a percentage_ci [low, high] to each topic.
+    """
+    counts = [trend_analyzer.post_term_counts(post)["keyword"] for post in posts]
+    for topic in trends.get("topics", []):
+        mentions = [100.0 * count[topic["keyword"]] for count in counts]
+        _set_estimate(topic, "percentage", sample.interval(posts, mentions, upper=None))
+
+
+def annotate_sentiment(sentiment: Dict, posts: Sequence[Dict], sample: StratifiedReservoir):
+    """Replace each *_pct with its population estimate and add *_pct_ci intervals."""
+    if not sentiment or not sentiment.get("total_posts"):
+        return
+    labels = [result["sentiment"] for result in sentiment_analyzer.score_posts(list(posts))]
+    for field in SENTIMENT_FIELDS:
+        shares = [100.0 if label == field else 0.0 for label in labels]
+        _set_estimate(sentiment, f"{field}_pct", sample.interval(posts, shares))
+
@@ -0,0 +1,80 @@
+"""
+Saturation module - Stop paginating a search once its pages stop adding new posts
+"""
+
+from typing import Dict, Iterable, Optional
+
+from . import deduplicator, engagement_filter, profiler
+
+# A typical --min-page-yield when early stopping is turned on (the CLI
+# default is 0, off): the share of a page that must be new, unique posts
+# meeting the engagement threshold for the page to count
+MIN_PAGE_YIELD = 0.2
+# Consecutive pages below the minimum yield after which a query stops
+SATURATED_PAGES = 2
+
+
+class PageYield:
+    """
+    Marginal yield of a paginated search, page by page.
+
+    Each page's posts go through the engagement filter and a
+    deduplicator.DedupIndex with the pipeline's similarity threshold, and
+    the page's yield is the share of its posts that are new, unique and
+    qualifying. Once patience pages in a row yield less than min_yield,
+    saturated turns true and the fetcher stops asking for more pages. The
+    posts themselves are never dropped here.
+
+    The index rejects candidates by URL, exact text, length and difflib's
+    cheap upper bounds before the full ratio, so near-duplicates the
+    pipeline would later drop count against the page. Posts sharing much
+    vocabulary still need many full comparisons, which is why early
+    stopping is opt-in.
+    """
+
+    def __init__(
+        self,
+        platform: str,
+        min_yield: float = MIN_PAGE_YIELD,
+        min_engagement: Optional[int] = None,
+        patience: int = SATURATED_PAGES,
+    ):
+        self.platform = platform
+        self.min_yield = min_yield
+        self.min_engagement = min_engagement
+        self.patience = patience
+        self.index = deduplicator.DedupIndex()
+        self.pages = 0
+        self.low_pages = 0
+        self.useful = 0
+
+    @property
+    def saturated(self) -> bool:
+        return self.min_yield > 0 and self.low_pages >= self.patience
+
+    def qualifies(self, post: Dict) -> bool:
+        if self.min_engagement is not None:
+            score = engagement_filter.calculate_engagement_score(post, self.platform)
+            if score < self.min_engagement:
+                return False
+        return self.index.offer(post)
+
+    def record(self, page_size: int, posts: Iterable[Dict]) -> float:
+        """
+        Score one page and return its yield.
+
+        page_size is how many posts the API returned; posts are those the
+        fetcher kept from it (e.g. after a date check), so posts it
+        discarded count against the page's yield.
+        """
+        if self.min_yield <= 0:
+            return 1.0
+        new = sum(1 for post in posts if self.qualifies(post))
+        page_yield = new / page_size if page_size else 0.0
+        self.pages += 1
+        self.useful += new
+        self.low_pages = self.low_pages + 1 if page_yield < self.min_yield else 0
+        profiler.count(f"{self.platform}_pages")
+        if self.saturated:
+            profiler.count(f"{self.platform}_saturated_queries")
+        return page_yield
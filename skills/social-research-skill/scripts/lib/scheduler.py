@@ -0,0 +1,195 @@
+"""
+Scheduler module - Run many research jobs against shared API budgets
+"""
+
+import contextvars
+import heapq
+import io
+import itertools
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Sequence
+
+# Ready tasks of equal priority: finish reports before starting new fetches,
+# so completed jobs release their posts early
+_REPORT, _FETCH = 0, 1
+
+
+class ResearchJob:
+    """One topic to research: its CLI arguments, fetch results and outcome."""
+
+    def __init__(self, argv: List[str], priority: int = 0):
+        self.argv = list(argv)
+        self.topic = self.argv[0] if self.argv else ""
+        self.priority = priority
+        self.results: Dict[str, Dict] = {}
+        self.attempts: Counter = Counter()
+        self.exit_code: Optional[int] = None
+        self.output = io.StringIO()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    @property
+    def retries(self) -> int:
+        return sum(max(n - 1, 0) for n in self.attempts.values())
+
+    @property
+    def duration(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+class Scheduler:
+    """
+    Run research jobs with bounded concurrency.
+
+    Each job becomes one fetch task per platform plus a report task that
+    runs once every platform has a result. Ready tasks run highest job
+    priority first, in submission order within a priority. A failed fetch
+    (result with an "error") is retried after retry_delay, doubling on each
+    attempt, up to max_retries times; after that the error is passed to
+    the report like a normal search failure.
+
+    Workers share whatever rate limits the fetch function applies (see
+    http_pool.throttle). At most platform_concurrency fetches per platform
+    run at once so one slow API cannot occupy every worker while the
+    other's budget sits idle.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[ResearchJob, str], Dict],
+        report: Callable[[ResearchJob], int],
+        platforms: Sequence[str] = ("reddit", "twitter"),
+        max_workers: int = 6,
+        platform_concurrency: int = 2,
+        max_retries: int = 2,
+        retry_delay: float = 30.0,
+    ):
+        self.fetch = fetch
+        self.report = report
+        self.platforms = tuple(platforms)
+        self.max_workers = max_workers
+        self.platform_concurrency = platform_concurrency
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        self._cond = threading.Condition()
+        self._ready: List[tuple] = []
+        self._delayed: List[tuple] = []
+        self._seq = itertools.count()
+        self._outstanding = 0
+        self._running = Counter()
+        self.on_done: Optional[Callable[[ResearchJob], None]] = None
+
+    def _push(self, stage: int, job: ResearchJob, platform: Optional[str] = None, delay: float = 0):
+        """Queue a task; caller holds the condition."""
+        task = (-job.priority, stage, next(self._seq), job, platform)
+        if delay:
+            heapq.heappush(self._delayed, (time.monotonic() + delay, task))
+        else:
+            heapq.heappush(self._ready, task)
+        self._outstanding += 1
+        self._cond.notify()
+
+    def _next_task(self) -> Optional[tuple]:
+        """Block for the next runnable task, or return None when all work is done."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._delayed and self._delayed[0][0] <= now:
+                    heapq.heappush(self._ready, heapq.heappop(self._delayed)[1])
+
+                held = []
+                task = None
+                while self._ready:
+                    candidate = heapq.heappop(self._ready)
+                    platform = candidate[4]
+                    if platform and self._running[platform] >= self.platform_concurrency:
+                        held.append(candidate)
+                        continue
+                    task = candidate
+                    break
+                for candidate in held:
+                    heapq.heappush(self._ready, candidate)
+
+                if task:
+                    if task[4]:
+                        self._running[task[4]] += 1
+                    return task
+                if self._outstanding == 0:
+                    return None
+
+                timeout = self._delayed[0][0] - now if self._delayed else None
+                self._cond.wait(timeout)
+
+    def _run_task(self, task: tuple):
+        _, stage, _, job, platform = task
+
+        if stage == _FETCH:
+            job.attempts[platform] += 1
+            try:
+                result = self.fetch(job, platform)
+            except Exception as e:
+                result = {"platform": platform, "results": [], "error": str(e)}
+
+            with self._cond:
+                self._running[platform] -= 1
+                if result.get("error") and job.attempts[platform] <= self.max_retries:
+                    delay = self.retry_delay * 2 ** (job.attempts[platform] - 1)
+                    self._push(_FETCH, job, platform, delay=delay)
+                else:
+                    job.results[platform] = result
+                    if len(job.results) == len(self.platforms):
+                        self._push(_REPORT, job)
+        else:
+            try:
+                job.exit_code = self.report(job)
+            except Exception as e:
+                job.output.write(f"\n❌ Error: {e}\n")
+                job.exit_code = 1
+            job.finished = time.monotonic()
+            if self.on_done:
+                self.on_done(job)
+
+    def _worker(self):
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            try:
+                self._run_task(task)
+            finally:
+                with self._cond:
+                    self._outstanding -= 1
+                    self._cond.notify_all()
+
+    def run(
+        self, jobs: List[ResearchJob], on_done: Optional[Callable[[ResearchJob], None]] = None
+    ) -> List[ResearchJob]:
+        """
+        Run all jobs to completion and return them in submission order.
+
+        on_done(job) is called from a worker thread as each job finishes.
+        """
+        self.on_done = on_done
+
+        with self._cond:
+            started = time.monotonic()
+            for job in jobs:
+                job.started = started
+                for platform in self.platforms:
+                    self._push(_FETCH, job, platform)
+
+        threads = [
+            threading.Thread(target=contextvars.copy_context().run, args=(self._worker,), daemon=True)
+            for _ in range(self.max_workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return jobs
@@ -2,7 +2,13 @@
 Sentiment analyzer module - Analyze sentiment of posts
 """
 
-from typing import List, Dict
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import List, Dict, Iterable, Optional, Tuple
+
+from . import profiler, sentiment_cache, tokenizer
 
 
 # Simple sentiment word lists
@@ -22,21 +28,227 @@ NEGATIVE_WORDS = {
     'errors', 'fail', 'failed', 'failure', 'crash', 'crashed', 'wrong', 'sucks'
 }
 
+# Multi-word expressions, matched before their first word is scored alone
+POSITIVE_PHRASES = {
+    'game changer', 'spot on', 'works great', 'works perfectly', 'highly recommend',
+    'life saver', 'worth it', 'worth every penny', 'saves hours', 'saves time',
+}
 
-def analyze_text_sentiment(text: str) -> Dict:
+NEGATIVE_PHRASES = {
+    'waste of time', 'waste of money', 'falls short', 'deal breaker', 'let down',
+    'steep learning curve', 'hard to use', 'does not work', 'stopped working',
+}
+
+# Negators flip the polarity of sentiment terms in the next NEGATION_WINDOW tokens
+NEGATION_WORDS = {
+    'not', 'no', 'never', 'nothing', 'none', 'nobody', 'neither', 'nor',
+    'cannot', 'hardly', 'barely', 'without', "can't", "don't", "doesn't",
+    "didn't", "isn't", "wasn't", "aren't", "weren't", "won't", "wouldn't",
+    "shouldn't", "couldn't", "haven't", "hasn't", "ain't",
+}
+
+NEGATION_WINDOW = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens, dropping punctuation (see tokenizer.words)."""
+    return tokenizer.words(text)
+
+
+class Lexicon:
     """
-    Analyze sentiment of a single text.
-    
-    Returns dict with sentiment label and scores.
+    Compiled sentiment lexicon.
+
+    Every entry is keyed by its first token, so scoring a text is a single
+    left-to-right pass with one dict lookup per token, regardless of how many
+    words or phrases the lexicon holds.
+    """
+
+    def __init__(
+        self,
+        terms: Dict[str, float],
+        negations: Iterable[str] = NEGATION_WORDS,
+        negation_window: int = NEGATION_WINDOW,
+    ):
+        self.terms = dict(terms)
+        self.negations = frozenset(negations)
+        self.negation_window = negation_window
+
+        # first token -> (single-token weight, [(remaining tokens, weight), ...])
+        table: Dict[str, Tuple[float, List[Tuple[Tuple[str, ...], float]]]] = {}
+        for term, weight in self.terms.items():
+            tokens = tuple(tokenize(term))
+            if not tokens or not weight:
+                continue
+            single, phrases = table.get(tokens[0], (0, []))
+            if len(tokens) == 1:
+                single = weight
+            else:
+                phrases.append((tokens[1:], weight))
+            table[tokens[0]] = (single, phrases)
+
+        # Longest phrase wins when several share a first token
+        self.table = {
+            first: (single, tuple(sorted(phrases, key=lambda p: -len(p[0]))))
+            for first, (single, phrases) in table.items()
+        }
+
+        digest = hashlib.sha1()
+        for term in sorted(self.terms):
+            digest.update(f"{term}\t{self.terms[term]}\n".encode("utf-8"))
+        digest.update(f"{sorted(self.negations)}|{self.negation_window}".encode("utf-8"))
+        # Scores depend on how texts are split into tokens too
+        digest.update(tokenizer.get_tokenizer().version.encode("utf-8"))
+        self.version = digest.hexdigest()[:16]
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def score_tokens(self, tokens: List[str]) -> Tuple[float, float]:
+        """Return (positive, negative) totals for a token list."""
+        table = self.table
+        negations = self.negations
+        positive = 0
+        negative = 0
+        negate_until = -1
+        i = 0
+        n = len(tokens)
+
+        while i < n:
+            token = tokens[i]
+
+            if token in negations:
+                negate_until = i + self.negation_window
+                i += 1
+                continue
+
+            entry = table.get(token)
+            if entry is None:
+                i += 1
+                continue
+
+            weight, phrases = entry
+            span = 1
+            for rest, phrase_weight in phrases:
+                end = i + 1 + len(rest)
+                if end <= n and tuple(tokens[i + 1:end]) == rest:
+                    weight = phrase_weight
+                    span = end - i
+                    break
+
+            if weight:
+                if i <= negate_until:
+                    weight = -weight
+                if weight > 0:
+                    positive += weight
+                else:
+                    negative -= weight
+
+            i += span
+
+        return positive, negative
+
+
+def compile_lexicon(
+    positive: Iterable[str],
+    negative: Iterable[str],
+    extra_terms: Optional[Dict[str, float]] = None,
+) -> Lexicon:
+    """Compile word/phrase sets (plus optional weighted terms) into a Lexicon."""
+    terms: Dict[str, float] = {}
+    for term in positive:
+        terms[term] = 1
+    for term in negative:
+        terms[term] = -1
+    if extra_terms:
+        terms.update(extra_terms)
+    return Lexicon(terms)
+
+
+def load_lexicon(path: str, include_defaults: bool = True) -> Lexicon:
+    """
+    Load an external lexicon file.
+
+    Supported formats:
+        - JSON object of {"term": score}
+        - JSON object with "positive" / "negative" term lists
+        - Tab-separated "term<TAB>score" lines (extra columns are ignored,
+          so VADER-style lexicons load as-is)
+
+    Positive scores mark positive terms, negative scores negative ones.
     """
-    text_lower = text.lower()
-    words = text_lower.split()
-    
-    positive_count = sum(1 for word in words if word in POSITIVE_WORDS)
-    negative_count = sum(1 for word in words if word in NEGATIVE_WORDS)
-    
+    path = Path(path)
+    terms: Dict[str, float] = {}
+
+    if path.suffix == ".json":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if "positive" in data or "negative" in data:
+            terms.update({t: 1 for t in data.get("positive", [])})
+            terms.update({t: -1 for t in data.get("negative", [])})
+        else:
+            terms.update({t: float(s) for t, s in data.items()})
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) < 2:
+                    continue
+                try:
+                    terms[parts[0].strip().lower()] = float(parts[1])
+                except ValueError:
+                    continue
+
+    if not include_defaults:
+        return Lexicon(terms)
+
+    return compile_lexicon(
+        POSITIVE_WORDS | POSITIVE_PHRASES, NEGATIVE_WORDS | NEGATIVE_PHRASES, terms
+    )
+
+
+_default_lexicon: Optional[Lexicon] = None
+_default_lexicon_key = None
+_active_lexicon: Optional[Lexicon] = None
+
+
+def set_lexicon(lexicon: Optional[Lexicon]):
+    """Use a loaded lexicon for all analysis (None restores the built-in one)."""
+    global _active_lexicon
+    _active_lexicon = lexicon
+
+
+def get_lexicon() -> Lexicon:
+    """
+    Return the active compiled lexicon.
+
+    The built-in lexicon is recompiled whenever the module-level word or
+    phrase sets or the active tokenizer are changed.
+    """
+    global _default_lexicon, _default_lexicon_key
+
+    if _active_lexicon is not None:
+        return _active_lexicon
+
+    key = (
+        frozenset(POSITIVE_WORDS), frozenset(NEGATIVE_WORDS),
+        frozenset(POSITIVE_PHRASES), frozenset(NEGATIVE_PHRASES),
+        tokenizer.get_tokenizer().version,
+    )
+    if _default_lexicon is None or key != _default_lexicon_key:
+        _default_lexicon = compile_lexicon(
+            POSITIVE_WORDS | POSITIVE_PHRASES, NEGATIVE_WORDS | NEGATIVE_PHRASES
+        )
+        _default_lexicon_key = key
+    return _default_lexicon
+
+
+def classify_scores(positive_count: float, negative_count: float) -> Dict:
+    """Turn positive/negative totals into a sentiment label and confidence."""
     total_sentiment_words = positive_count + negative_count
-    
+
     if total_sentiment_words == 0:
         return {
             "sentiment": "neutral",
@@ -44,10 +256,10 @@ def analyze_text_sentiment(text: str) -> Dict:
             "negative_score": 0,
             "confidence": 0
         }
-    
+
     positive_ratio = positive_count / total_sentiment_words
     negative_ratio = negative_count / total_sentiment_words
-    
+
     # Determine sentiment
     if positive_count > negative_count * 1.5:
         sentiment = "positive"
@@ -58,7 +270,7 @@ def analyze_text_sentiment(text: str) -> Dict:
     else:
         sentiment = "mixed"
         confidence = 0.5
-    
+
     return {
         "sentiment": sentiment,
         "positive_score": positive_count,
@@ -67,14 +279,132 @@ def analyze_text_sentiment(text: str) -> Dict:
     }
 
 
-def analyze(posts: List[Dict]) -> Dict:
+def analyze_tokens(token_lists: Iterable[List[str]], lexicon: Lexicon = None) -> List[Dict]:
+    """Score a batch of pre-tokenized texts in one pass."""
+    lexicon = lexicon or get_lexicon()
+    score = lexicon.score_tokens
+    return [classify_scores(*score(tokens)) for tokens in token_lists]
+
+
+def analyze_texts(texts: Iterable[str], lexicon: Lexicon = None) -> List[Dict]:
+    """Score a batch of raw texts in one pass."""
+    return analyze_tokens((tokenize(text) for text in texts), lexicon)
+
+
+def analyze_text_sentiment(text: str) -> Dict:
+    """
+    Analyze sentiment of a single text.
+
+    Returns dict with sentiment label and scores.
+    """
+    return analyze_texts([text])[0]
+
+
+def get_post_text(post: Dict) -> str:
+    """Extract the text that sentiment is scored on."""
+    if post.get("platform") == "reddit":
+        return post.get("title", "") + " " + post.get("text", "")
+    return post.get("text", "")
+
+
+def score_texts(texts: List[str], use_cache: bool = True) -> List[Dict]:
+    """
+    Score texts, reusing cached results where available.
+
+    Cached entries are keyed by text hash plus the active lexicon version,
+    and are read and written in batches.
+    """
+    lexicon = get_lexicon()
+    cache = sentiment_cache.get_default_cache() if use_cache else None
+    if cache is None:
+        return analyze_texts(texts, lexicon)
+
+    keys = [sentiment_cache.text_hash(text) for text in texts]
+    try:
+        cached = cache.get_many(keys, lexicon.version)
+    except sqlite3.Error as e:
+        print(f"Sentiment cache read error: {e}")
+        return analyze_texts(texts, lexicon)
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in cached and key not in missing:
+            missing[key] = text
+
+    profiler.count("cache_hits", len(keys) - len(missing))
+    profiler.count("cache_misses", len(missing))
+
+    if missing:
+        fresh = dict(zip(missing, analyze_texts(missing.values(), lexicon)))
+        try:
+            cache.put_many(fresh, lexicon.version)
+        except sqlite3.Error as e:
+            print(f"Sentiment cache write error: {e}")
+        cached.update(fresh)
+
+    return [cached[key] for key in keys]
+
+
+def score_posts(posts: List[Dict], use_cache: bool = True) -> List[Dict]:
+    """Return per-post sentiment results in input order."""
+    return score_texts([get_post_text(post) for post in posts], use_cache)
+
+
+def analyze(posts: List[Dict], use_cache: bool = True, keep_results: bool = False) -> Dict:
     """
     Analyze sentiment across all posts.
-    
+
+    Per-post results are served from the persistent sentiment cache when
+    use_cache is set. With keep_results, they are also returned in input
+    order under "post_results".
+
     Returns aggregated sentiment data.
     """
-    if not posts:
-        return {
+    return analyze_batches([posts], use_cache, keep_results)
+
+
+def analyze_batches(
+    batches: Iterable[List[Dict]], use_cache: bool = True, keep_results: bool = False
+) -> Dict:
+    """
+    Analyze sentiment across posts given in batches.
+
+    Only one batch is scored at a time, so the posts never need to be in
+    memory together (unless keep_results collects every post's result).
+    Returns the same result as analyze() on all of them.
+    """
+    sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0, "mixed": 0}
+    positive_posts = []
+    negative_posts = []
+    post_results = []
+    total = 0
+
+    for posts in batches:
+        if not posts:
+            continue
+        results = score_posts(posts, use_cache)
+        total += len(posts)
+        if keep_results:
+            post_results.extend(results)
+
+        for post, sentiment_data in zip(posts, results):
+            sentiment = sentiment_data["sentiment"]
+
+            # Update counts
+            sentiment_counts[sentiment] += 1
+
+            # Store examples
+            if sentiment == "positive" and len(positive_posts) < 10:
+                post_with_sentiment = post.copy()
+                post_with_sentiment["sentiment_data"] = sentiment_data
+                positive_posts.append(post_with_sentiment)
+            elif sentiment == "negative" and len(negative_posts) < 10:
+                post_with_sentiment = post.copy()
+                post_with_sentiment["sentiment_data"] = sentiment_data
+                negative_posts.append(post_with_sentiment)
+
+    if not total:
+        summary = {
             "total_posts": 0,
             "positive": 0,
             "negative": 0,
@@ -87,47 +417,21 @@ def analyze(posts: List[Dict]) -> Dict:
             "positive_posts": [],
             "negative_posts": [],
         }
-    
-    sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0, "mixed": 0}
-    positive_posts = []
-    negative_posts = []
-    
-    for post in posts:
-        # Get text
-        if post.get("platform") == "reddit":
-            text = post.get("title", "") + " " + post.get("text", "")
-        else:
-            text = post.get("text", "")
-        
-        # Analyze
-        sentiment_data = analyze_text_sentiment(text)
-        sentiment = sentiment_data["sentiment"]
-        
-        # Update counts
-        sentiment_counts[sentiment] += 1
-        
-        # Store examples
-        post_with_sentiment = post.copy()
-        post_with_sentiment["sentiment_data"] = sentiment_data
-        
-        if sentiment == "positive" and len(positive_posts) < 10:
-            positive_posts.append(post_with_sentiment)
-        elif sentiment == "negative" and len(negative_posts) < 10:
-            negative_posts.append(post_with_sentiment)
-    
-    total = len(posts)
-    
-    return {
-        "total_posts": total,
-        "positive": sentiment_counts["positive"],
-        "negative": sentiment_counts["negative"],
-        "neutral": sentiment_counts["neutral"],
-        "mixed": sentiment_counts["mixed"],
-        "positive_pct": round(sentiment_counts["positive"] / total * 100, 1),
-        "negative_pct": round(sentiment_counts["negative"] / total * 100, 1),
-        "neutral_pct": round(sentiment_counts["neutral"] / total * 100, 1),
-        "mixed_pct": round(sentiment_counts["mixed"] / total * 100, 1),
-        "positive_posts": positive_posts,
-        "negative_posts": negative_posts,
-    }
+    else:
+        summary = {
+            "total_posts": total,
+            "positive": sentiment_counts["positive"],
+            "negative": sentiment_counts["negative"],
+            "neutral": sentiment_counts["neutral"],
+            "mixed": sentiment_counts["mixed"],
+            "positive_pct": round(sentiment_counts["positive"] / total * 100, 1),
+            "negative_pct": round(sentiment_counts["negative"] / total * 100, 1),
+            "neutral_pct": round(sentiment_counts["neutral"] / total * 100, 1),
+            "mixed_pct": round(sentiment_counts["mixed"] / total * 100, 1),
+            "positive_posts": positive_posts,
+            "negative_posts": negative_posts,
+        }
 
+    if keep_results:
+        summary["post_results"] = post_results
+    return summary
@@ -0,0 +1,169 @@
+"""
+Sentiment cache module - Persist per-post sentiment results between runs
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+DEFAULT_CACHE_DIR = Path(
+    os.getenv(
+        "SOCIAL_RESEARCH_CACHE_DIR",
+        Path(__file__).resolve().parent.parent.parent / ".cache",
+    )
+)
+
+# Stay well under SQLite's host-parameter limit
+BATCH_SIZE = 500
+
+# Results of a lexicon version nobody has used for this long are dropped
+STALE_VERSION_SECONDS = 30 * 24 * 3600
+# A version's last-used time is rewritten at most this often per process, so
+# a long-lived daemon's version never looks stale while it is still in use
+TOUCH_INTERVAL_SECONDS = STALE_VERSION_SECONDS // 10
+
+
+def text_hash(text: str) -> str:
+    """Hash post text into a cache key."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    """
+    SQLite-backed cache of sentiment results keyed by text hash and lexicon version.
+
+    Results of different lexicon versions are kept side by side, so editing
+    the word lists or loading a different lexicon never reuses a stale
+    result, and processes scoring with different lexicons share the cache
+    without evicting each other. A version's results are dropped once it
+    has not been used for STALE_VERSION_SECONDS.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else DEFAULT_CACHE_DIR / "sentiment.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._touched: Dict[str, float] = {}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            -- The earlier schema kept one version per text
+            DROP TABLE IF EXISTS sentiment;
+
+            CREATE TABLE IF NOT EXISTS results (
+                text_hash TEXT NOT NULL,
+                version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (text_hash, version)
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS versions (
+                version TEXT PRIMARY KEY,
+                used REAL NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def _touch(self, version: str):
+        """
+        Mark version as used and drop versions unused for STALE_VERSION_SECONDS.
+
+        Runs on first use of a version and again once TOUCH_INTERVAL_SECONDS
+        have passed, not on every lookup.
+        """
+        now = time.time()
+        if now - self._touched.get(version, float("-inf")) < TOUCH_INTERVAL_SECONDS:
+            return
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO versions (version, used) VALUES (?, ?)", (version, now)
+            )
+            stale = [
+                row[0] for row in self._conn.execute(
+                    "SELECT version FROM versions WHERE used < ?", (now - STALE_VERSION_SECONDS,)
+                )
+            ]
+            for old in stale:
+                self._conn.execute("DELETE FROM results WHERE version = ?", (old,))
+                self._conn.execute("DELETE FROM versions WHERE version = ?", (old,))
+        self._touched[version] = now
+
+    def get_many(self, keys: List[str], version: str) -> Dict[str, Dict]:
+        """Look up cached results for many text hashes."""
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+
+        with self._lock:
+            self._touch(version)
+            for start in range(0, len(unique_keys), BATCH_SIZE):
+                batch = unique_keys[start:start + BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, result FROM results "
+                    f"WHERE version = ? AND text_hash IN ({placeholders})",
+                    [version, *batch],
+                )
+                for key, result in rows:
+                    found[key] = json.loads(result)
+
+        return found
+
+    def put_many(self, results: Dict[str, Dict], version: str):
+        """Store many results in a single transaction."""
+        if not results:
+            return
+
+        rows = [(key, version, json.dumps(result)) for key, result in results.items()]
+        with self._lock:
+            self._touch(version)
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO results (text_hash, version, result) "
+                    "VALUES (?, ?, ?)",
+                    rows,
+                )
+
+    def clear(self):
+        """Remove every cached result."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM results")
+                self._conn.execute("DELETE FROM versions")
+            self._touched.clear()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache: Optional[SentimentCache] = None
+_default_cache_pid: Optional[int] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[SentimentCache]:
+    """
+    Return the shared on-disk cache, or None if it cannot be opened.
+
+    A forked worker process opens its own connection rather than using the
+    one inherited from its parent.
+    """
+    global _default_cache, _default_cache_pid
+
+    with _default_cache_lock:
+        if _default_cache is None or _default_cache_pid != os.getpid():
+            try:
+                _default_cache = SentimentCache()
+                _default_cache_pid = os.getpid()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Sentiment cache unavailable: {e}")
+                return None
+        return _default_cache
@@ -0,0 +1,324 @@
+"""
+Spill module - Memory-bounded buffers that overflow to temporary files
+"""
+
+import heapq
+import itertools
+import os
+import pickle
+import re
+import shutil
+import sys
+import tempfile
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from . import profiler
+
+# At most this many runs are merged at once; more are first merged into
+# intermediate runs, which bounds open files and merge heap size
+MERGE_FAN_IN = 64
+# Buffers smaller than this are not worth a run file of their own
+MIN_SPILL_BYTES = 1 << 20
+# Approximate cost of a counter entry beyond its key (dict slot, count list)
+COUNTER_ENTRY_BYTES = 120
+READ_BUFFER = 1 << 16
+
+_SIZE_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30}
+
+
+def parse_size(value: str) -> int:
+    """Parse a size such as 512M, 1.5G or 1048576 into bytes."""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([kmg]?)(?:i?b)?", value.strip().lower())
+    if not match:
+        raise ValueError(f"invalid size {value!r} (e.g. 512M or 2G)")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def format_size(size: float) -> str:
+    """Format a byte count for display."""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def estimate_size(value) -> int:
+    """Approximate memory held by a post-like value (containers and their scalars)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for item in value.values():
+            size += estimate_size(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += estimate_size(item)
+    return size
+
+
+def by_engagement(post: Dict) -> int:
+    """Sort key ranking posts by engagement, highest first."""
+    return -post.get("engagement_score", 0)
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    """Yield lists of up to size items."""
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def read_run(path: str) -> Iterator:
+    """Yield the items of a run file in order."""
+    with open(path, "rb", buffering=READ_BUFFER) as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+class MemoryBudget:
+    """
+    Approximate memory limit shared by the pipeline's buffers.
+
+    Every watched consumer exposes `footprint`, its estimated size in bytes;
+    spillable ones also have spill(). When a spillable buffer grows it calls
+    check(), which spills the largest spillable buffers until the total fits
+    again. Consumers that cannot spill still count towards the total; if
+    they alone exceed the limit, over_budget is set.
+
+    Run files go to a private temporary directory that close() removes.
+    """
+
+    def __init__(self, max_bytes: int, directory: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.consumers: List = []
+        self.peak = 0
+        self.runs_written = 0
+        self.bytes_written = 0
+        self.over_budget = False
+        self._tmpdir: Optional[str] = None
+        self._run_ids = itertools.count()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def watch(self, consumer):
+        """Count consumer's footprint towards the budget; returns consumer."""
+        self.consumers.append(consumer)
+        return consumer
+
+    @property
+    def used(self) -> int:
+        return sum(consumer.footprint for consumer in self.consumers)
+
+    def check(self):
+        """Spill the largest buffers while the tracked total is over the limit."""
+        used = self.used
+        if used > self.peak:
+            self.peak = used
+
+        min_spill = min(MIN_SPILL_BYTES, self.max_bytes // 16)
+        while used > self.max_bytes:
+            spillable = [
+                consumer for consumer in self.consumers
+                if hasattr(consumer, "spill") and consumer.footprint >= min_spill
+            ]
+            if not spillable:
+                self.over_budget = True
+                return
+            max(spillable, key=lambda consumer: consumer.footprint).spill()
+            used = self.used
+
+    def new_path(self, suffix: str) -> str:
+        """Return an unused path in the budget's temporary directory."""
+        if self._tmpdir is None:
+            self._tmpdir = tempfile.mkdtemp(prefix="social-research-spill-", dir=self.directory)
+        return os.path.join(self._tmpdir, f"run{next(self._run_ids)}{suffix}")
+
+    def write_run(self, items: Iterable) -> str:
+        """Write items to a new run file and return its path."""
+        path = self.new_path(".pickle")
+
+        with open(path, "wb") as f:
+            for item in items:
+                pickle.dump(item, f, pickle.HIGHEST_PROTOCOL)
+
+        size = os.path.getsize(path)
+        self.runs_written += 1
+        self.bytes_written += size
+        profiler.count("spill_runs")
+        profiler.count("spill_bytes", size)
+        return path
+
+    def compact(self, runs: List[str], merge: Callable[[List[Iterator]], Iterable]) -> List[str]:
+        """
+        Merge the oldest runs together until at most MERGE_FAN_IN remain.
+
+        merge(iterators) combines run readers into one ordered stream. The
+        merged run takes the place of the runs it replaces, so merges stay
+        stable.
+        """
+        while len(runs) > MERGE_FAN_IN:
+            oldest, runs = runs[:MERGE_FAN_IN], runs[MERGE_FAN_IN:]
+            merged = self.write_run(merge([read_run(path) for path in oldest]))
+            for path in oldest:
+                os.remove(path)
+            runs = [merged] + runs
+        return runs
+
+    def close(self):
+        if self._tmpdir:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+
+class SpillList:
+    """
+    Append-only list that moves its buffer to a run file when the budget is
+    exceeded. Iterates in append order and can be iterated repeatedly.
+
+    Other buffers growing while this one is iterated may make it spill;
+    iteration picks up the new run, so no item is skipped or repeated.
+    """
+
+    def __init__(self, budget: MemoryBudget):
+        self.budget = budget
+        self.runs: List[str] = []
+        self.buffer: List = []
+        self.footprint = 0
+        self._length = 0
+        budget.watch(self)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def append(self, item):
+        self.buffer.append(item)
+        self.footprint += estimate_size(item)
+        self._length += 1
+        self.budget.check()
+
+    def spill(self):
+        if self.buffer:
+            self.runs.append(self.budget.write_run(self.buffer))
+            self.buffer = []
+            self.footprint = 0
+
+    def __iter__(self) -> Iterator:
+        done = 0
+        while done < len(self.runs):
+            yield from read_run(self.runs[done])
+            done += 1
+        # A spill from here on replaces self.buffer, leaving this list intact
+        yield from self.buffer
+
+
+class SortedSpill(SpillList):
+    """
+    External sort: each spilled buffer becomes a sorted run, and iteration
+    merges the runs with what is still buffered.
+
+    Items with equal keys come out in the order they were appended, like
+    a stable sort of the whole input.
+    """
+
+    def __init__(self, budget: MemoryBudget, key: Callable):
+        super().__init__(budget)
+        self.key = key
+
+    def spill(self):
+        if self.buffer:
+            self.buffer.sort(key=self.key)
+            super().spill()
+
+    def _merge(self, iterators: List[Iterator]) -> Iterator:
+        return heapq.merge(*iterators, key=self.key)
+
+    def __iter__(self) -> Iterator:
+        if self.runs:
+            # Merge from disk only, so the buffer is not held through the merge
+            self.spill()
+        self.runs = self.budget.compact(self.runs, self._merge)
+        self.buffer.sort(key=self.key)
+        runs = [read_run(path) for path in self.runs]
+        return self._merge(runs + [iter(self.buffer)])
+
+
+class SpillCounter:
+    """
+    Counter whose entries move to sorted run files when the budget is
+    exceeded; counts for the same key are summed when the runs are merged.
+
+    Supports the parts of collections.Counter the trend analyzer uses:
+    update(), items() and most_common(). Each key remembers when it was
+    first counted, so most_common() breaks ties in first-counted order
+    exactly like Counter.
+    """
+
+    def __init__(self, budget: MemoryBudget):
+        self.budget = budget
+        self.runs: List[str] = []
+        self.counts: Dict = {}
+        self.footprint = 0
+        self._order = itertools.count()
+        budget.watch(self)
+
+    def update(self, counts: Dict):
+        for key, n in counts.items():
+            entry = self.counts.get(key)
+            if entry is None:
+                self.counts[key] = [n, next(self._order)]
+                self.footprint += estimate_size(key) + COUNTER_ENTRY_BYTES
+            else:
+                entry[0] += n
+        self.budget.check()
+
+    def _sorted_entries(self) -> List[tuple]:
+        return sorted((key, n, first) for key, (n, first) in self.counts.items())
+
+    def spill(self):
+        if self.counts:
+            self.runs.append(self.budget.write_run(self._sorted_entries()))
+            self.counts = {}
+            self.footprint = 0
+
+    @staticmethod
+    def _combine(iterators: List[Iterator]) -> Iterator[tuple]:
+        """Merge sorted (key, count, first) runs, summing counts per key."""
+        merged = heapq.merge(*iterators)
+        for key, entries in itertools.groupby(merged, key=itemgetter(0)):
+            total = 0
+            first = None
+            for _, n, order in entries:
+                total += n
+                if first is None or order < first:
+                    first = order
+            yield key, total, first
+
+    def _entries(self) -> Iterator[tuple]:
+        self.runs = self.budget.compact(self.runs, self._combine)
+        runs = [read_run(path) for path in self.runs]
+        return self._combine(runs + [iter(self._sorted_entries())])
+
+    def items(self) -> Iterator[tuple]:
+        """Yield (key, count) pairs in key order."""
+        for key, n, _ in self._entries():
+            yield key, n
+
+    def most_common(self, n: Optional[int] = None) -> List[tuple]:
+        """Return the n most common (key, count) pairs, as Counter.most_common does."""
+        rank = lambda entry: (-entry[1], entry[2])
+        if n is None:
+            entries = sorted(self._entries(), key=rank)
+        else:
+            entries = heapq.nsmallest(n, self._entries(), key=rank)
+        return [(key, count) for key, count, _ in entries]
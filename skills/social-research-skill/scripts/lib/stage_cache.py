@@ -0,0 +1,167 @@
+"""
+Stage cache module - Memoize pipeline stage results between runs
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from types import ModuleType
+from typing import Any, Dict, Optional, Sequence
+
+from .sentiment_cache import DEFAULT_CACHE_DIR
+
+# Least recently used results beyond this many are dropped
+MAX_ENTRIES = 256
+
+# Post fields a stage's result can depend on
+FINGERPRINT_FIELDS = (
+    "platform", "id", "url", "title", "text",
+    "score", "num_comments", "likes", "retweets", "replies", "engagement_score",
+    "created_utc", "created_at",
+)
+
+
+class CorpusFingerprint:
+    """
+    Incremental hash of a post sequence: IDs, metrics, timestamps and text,
+    in order. Two runs with the same fingerprint analyze the same corpus.
+    """
+
+    def __init__(self):
+        self._hash = hashlib.blake2b(digest_size=16)
+        self.count = 0
+
+    def update(self, post: Dict):
+        values = tuple(post.get(field) for field in FINGERPRINT_FIELDS)
+        self._hash.update(repr(values).encode("utf-8", "backslashreplace"))
+        self.count += 1
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _source_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def code_version(modules: Sequence[ModuleType]) -> str:
+    """Digest of the modules' source, so editing an analyzer invalidates its results."""
+    return hashlib.sha1(
+        "".join(_source_digest(module.__file__) for module in modules).encode()
+    ).hexdigest()[:16]
+
+
+def stage_key(stage: str, corpus: str, modules: Sequence[ModuleType], **config) -> str:
+    """
+    Cache key for a stage result.
+
+    corpus is the input's CorpusFingerprint digest, modules the code that
+    computes the result and config every other setting it depends on
+    (topic, seed, lexicon version, ...).
+    """
+    document = {
+        "stage": stage,
+        "corpus": corpus,
+        "code": code_version(modules),
+        "config": config,
+    }
+    return hashlib.sha1(json.dumps(document, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class StageCache:
+    """
+    SQLite-backed store of pickled stage results.
+
+    Results are only ever looked up by key, so stale ones are never returned;
+    they just age out once more than MAX_ENTRIES results are stored.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or str(DEFAULT_CACHE_DIR / "stages.sqlite")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS stages (
+                key TEXT PRIMARY KEY,
+                stage TEXT NOT NULL,
+                used REAL NOT NULL,
+                result BLOB NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the stored result for key, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM stages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE stages SET used = ? WHERE key = ?", (time.time(), key))
+
+        try:
+            return pickle.loads(row[0])
+        except Exception as e:
+            print(f"Stage cache error: {e}")
+            return None
+
+    def put(self, key: str, stage: str, result: Any):
+        """Store a result (None is not stored) and drop the oldest beyond MAX_ENTRIES."""
+        if result is None:
+            return
+        blob = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO stages (key, stage, used, result) VALUES (?, ?, ?, ?)",
+                    (key, stage, time.time(), blob),
+                )
+                self._conn.execute(
+                    "DELETE FROM stages WHERE key NOT IN "
+                    "(SELECT key FROM stages ORDER BY used DESC LIMIT ?)",
+                    (MAX_ENTRIES,),
+                )
+
+    def clear(self):
+        """Remove every stored result."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM stages")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache: Optional[StageCache] = None
+_default_cache_pid: Optional[int] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[StageCache]:
+    """Return the shared on-disk stage cache, or None if it cannot be opened."""
+    global _default_cache, _default_cache_pid
+
+    with _default_cache_lock:
+        if _default_cache is None or _default_cache_pid != os.getpid():
+            try:
+                _default_cache = StageCache()
+                _default_cache_pid = os.getpid()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Stage cache unavailable: {e}")
+                return None
+        return _default_cache
@@ -0,0 +1,167 @@
+"""
+Stage graph module - Run pipeline stages as soon as their inputs are ready
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from . import profiler
+
+# Functions of the parallel stages being run. Worker processes are forked
+# after this is set and inherit it, so neither the functions nor the posts
+# they close over are ever pickled; only stage names, dependency results
+# and return values cross the process boundary.
+_forked_stages: Dict[str, Callable] = {}
+
+
+class Stage:
+    """One node of a StageGraph."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        deps: Sequence[str],
+        parallel: bool,
+        items_in: Optional[int],
+        items_out: Optional[Callable[[Any], int]],
+    ):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.parallel = parallel
+        self.items_in = items_in
+        self.items_out = items_out
+
+
+def can_fork() -> bool:
+    """
+    Whether worker processes can be forked safely here.
+
+    Forking needs the fork start method and a single-threaded process: a
+    lock held by another thread at fork time would stay locked in the
+    child. The daemon and batch runner are multi-threaded, so their jobs
+    run every stage in-process.
+    """
+    return "fork" in multiprocessing.get_all_start_methods() and threading.active_count() == 1
+
+
+def _run_forked(name: str, args: tuple, origin: Optional[float], memory: bool):
+    """Worker side: run one stage, measured against the parent profiler's clock if profiling."""
+    func = _forked_stages[name]
+    if origin is None:
+        return func(*args), None
+
+    prof = profiler.Profiler(memory=memory, origin=origin)
+    with profiler.activate(prof), prof.stage(name) as record:
+        result = func(*args)
+    return result, record
+
+
+class StageGraph:
+    """
+    Pipeline stages with dependencies.
+
+    Each stage is called with its dependencies' results as positional
+    arguments once they are all available. Parallel stages can run in
+    forked worker processes: give them closures over the inputs they share
+    (e.g. the post list) rather than passing those through dependencies,
+    since dependency results and return values are pickled. Other stages
+    run in the calling thread, between waits on the workers, so a cheap
+    stage starts as soon as its inputs are ready.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Stage] = {}
+
+    def add(
+        self,
+        name: str,
+        func: Callable,
+        deps: Sequence[str] = (),
+        parallel: bool = False,
+        items_in: Optional[int] = None,
+        items_out: Optional[Callable[[Any], int]] = None,
+    ):
+        """Add a stage; items_in and items_out(result) feed the profiler."""
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"stage {name!r} depends on unknown stage {dep!r}")
+        self.stages[name] = Stage(name, func, deps, parallel, items_in, items_out)
+
+    def _ready(self, pending: Dict[str, Stage], results: Dict[str, Any]) -> list:
+        return [
+            stage for stage in pending.values()
+            if all(dep in results for dep in stage.deps)
+        ]
+
+    def _run_local(self, stage: Stage, results: Dict[str, Any]):
+        with profiler.stage(stage.name, items_in=stage.items_in) as record:
+            result = stage.func(*(results[dep] for dep in stage.deps))
+            if stage.items_out:
+                record.items_out = stage.items_out(result)
+        results[stage.name] = result
+
+    def run(self, workers: int = 1) -> Dict[str, Any]:
+        """
+        Run every stage and return their results by name.
+
+        With workers > 1 and can_fork(), parallel stages run in a pool of
+        up to that many forked processes; otherwise all stages run here in
+        dependency order.
+        """
+        results: Dict[str, Any] = {}
+        pending = dict(self.stages)
+        parallel = [stage.name for stage in self.stages.values() if stage.parallel]
+
+        if workers <= 1 or not parallel or not can_fork():
+            while pending:
+                for stage in self._ready(pending, results):
+                    del pending[stage.name]
+                    self._run_local(stage, results)
+            return results
+
+        global _forked_stages
+        _forked_stages = {name: self.stages[name].func for name in parallel}
+        prof = profiler.current()
+        origin = prof.origin if prof else None
+        memory = prof.memory if prof else False
+
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(parallel)),
+                mp_context=multiprocessing.get_context("fork"),
+            ) as pool:
+                running = {}
+                while pending or running:
+                    ready = self._ready(pending, results)
+                    # Hand work to the pool first so it overlaps the local stages
+                    for stage in ready:
+                        if stage.parallel:
+                            del pending[stage.name]
+                            args = tuple(results[dep] for dep in stage.deps)
+                            future = pool.submit(_run_forked, stage.name, args, origin, memory)
+                            running[future] = stage
+                    local = [stage for stage in ready if not stage.parallel]
+                    for stage in local:
+                        del pending[stage.name]
+                        self._run_local(stage, results)
+                    if local:
+                        continue
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage = running.pop(future)
+                        result, record = future.result()
+                        results[stage.name] = result
+                        if record and prof:
+                            record.items_in = stage.items_in
+                            if stage.items_out:
+                                record.items_out = stage.items_out(result)
+                            prof.add(record)
+        finally:
+            _forked_stages = {}
+
+        return results
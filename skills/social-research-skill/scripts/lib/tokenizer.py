@@ -0,0 +1,307 @@
+"""
+Tokenizer module - Unicode-aware word and keyword extraction shared by the analyzers
+"""
+
+import hashlib
+import re
+import sys
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Bump when tokenization changes in a way that changes counts, so stored
+# rollups and memoized results built with the old rules are rebuilt
+VERSION = "3"
+
+# Texts whose tokens are kept per tokenizer; a report tokenizes each post
+# once per analysis, so repeats within a run are cache hits
+CACHE_SIZE = 8192
+
+# Han and kana; these scripts do not separate words with spaces. Hangul does,
+# so it is tokenized like Latin text.
+HAN = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+HIRAGANA = "\u3040-\u309f"
+KATAKANA = "\u30a0-\u30ff"
+CJK = HAN + HIRAGANA + KATAKANA
+CJK_PATTERN = re.compile(f"[{CJK}]+")
+# Same-script pieces of a CJK run; Han pieces are further split at particles
+# that never start or end a word
+SCRIPT_PATTERN = re.compile(f"[{HAN}]+|[{HIRAGANA}]+|[{KATAKANA}]+")
+HAN_PARTICLE_PATTERN = re.compile("[的很吗呢吧啊]")
+
+# Removed before keyword extraction: URLs, @mentions and #hashtags
+NOISE_PATTERN = re.compile(r"http\S+|www\.\S+|@\w+|#\w+")
+HASHTAG_PATTERN = re.compile(r"#(\w+)")
+MENTION_PATTERN = re.compile(r"@(\w+)")
+
+# Keyword: starts with a letter at a word boundary and may continue with
+# letters, digits and underscores (python3, useEffect, snake_case, café).
+# A CJK character before it counts as a boundary.
+KEYWORD_PATTERN = re.compile(f"(?<![^\\W{CJK}])[^\\W\\d_]\\w*")
+# The same for text without CJK characters, where a plain word boundary will do
+LATIN_KEYWORD_PATTERN = re.compile(r"\b[^\W\d_]\w*")
+# Word: letters and digits with an optional apostrophe suffix (don't)
+WORD_PATTERN = re.compile(r"[^\W_]+(?:'[^\W_]+)?")
+
+# CJK words are short but meaningful, so min_length applies to other
+# scripts only; single characters are still dropped
+CJK_MIN_LENGTH = 2
+_ANY_LENGTH = sys.maxsize
+
+STOP_WORDS: Dict[str, frozenset] = {
+    "en": frozenset({
+        'the', 'is', 'at', 'which', 'on', 'and', 'or', 'but', 'in', 'with',
+        'to', 'for', 'of', 'as', 'by', 'an', 'be', 'this', 'that', 'from',
+        'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+        'should', 'may', 'might', 'can', 'are', 'was', 'were', 'been', 'being',
+        'not', 'no', 'yes', 'all', 'any', 'some', 'more', 'most', 'very',
+        'just', 'only', 'also', 'too', 'than', 'then', 'now', 'here', 'there',
+        'when', 'where', 'why', 'how', 'what', 'who', 'their', 'them',
+        'they', 'these', 'those', 'such', 'into', 'through', 'during', 'before',
+        'after', 'above', 'below', 'between', 'under', 'again', 'further',
+        'once', 'both', 'each', 'few', 'other', 'don', 'use', 'using',
+        'used', 'get', 'got', 'like', 'know', 'think', 'want', 'need', 'make',
+        'see', 'look', 'find', 'give', 'tell', 'work', 'call', 'try', 'ask',
+        'feel', 'become', 'leave', 'put'
+    }),
+    "zh": frozenset({
+        '我们', '你们', '他们', '她们', '它们', '自己', '这个', '那个', '这些', '那些',
+        '这样', '那样', '什么', '怎么', '为什么', '因为', '所以', '但是', '而且', '如果',
+        '虽然', '然后', '还是', '或者', '可以', '可能', '应该', '需要', '就是', '不是',
+        '没有', '已经', '一个', '一些', '一下', '一直', '非常', '真的', '现在', '时候',
+        '还有', '其实', '知道', '觉得', '感觉', '大家', '这里', '那里', '之后', '之前',
+    }),
+    "ja": frozenset({
+        'です', 'ます', 'ました', 'でした', 'します', 'しました', 'した', 'して', 'する',
+        'いる', 'ある', 'なる', 'これ', 'それ', 'あれ', 'この', 'その', 'こと', 'もの',
+        'ため', 'よう', 'から', 'まで', 'けど', 'ので', 'のは', 'には', 'では', 'とは',
+    }),
+    "es": frozenset({
+        'que', 'los', 'las', 'una', 'por', 'para', 'con', 'del', 'como', 'pero',
+        'más', 'este', 'esta', 'son', 'sus', 'muy', 'sin', 'sobre', 'también',
+        'hay', 'todo', 'cuando', 'ser', 'está', 'porque', 'donde',
+    }),
+    "fr": frozenset({
+        'les', 'des', 'une', 'est', 'pour', 'que', 'qui', 'dans', 'par', 'sur',
+        'pas', 'avec', 'son', 'ses', 'mais', 'comme', 'plus', 'sont', 'cette',
+        'tout', 'aussi', 'très', 'être', 'avoir', 'fait', 'nous', 'vous',
+    }),
+    "de": frozenset({
+        'der', 'die', 'das', 'und', 'ist', 'nicht', 'ein', 'eine', 'mit', 'den',
+        'von', 'auf', 'für', 'sich', 'dem', 'des', 'auch', 'als', 'noch', 'wie',
+        'aber', 'nur', 'sehr', 'oder', 'wenn', 'kann', 'sind', 'wird', 'ich',
+    }),
+}
+
+# Languages whose stop words the default tokenizer drops
+DEFAULT_LANGUAGES = ("en", "zh", "ja")
+
+
+# Chinese stop words also mark word boundaries for the dictionary-free
+# segmenter, longest first so the regex prefers them
+HAN_STOP_PATTERN = re.compile(
+    "(" + "|".join(sorted(STOP_WORDS["zh"], key=len, reverse=True)) + ")"
+)
+# Han pieces up to this long are taken as one word; longer ones are split
+# into bigrams
+HAN_WORD_MAX_LENGTH = 4
+
+
+def bigram_segment(run: str) -> List[str]:
+    """
+    Split a CJK run without a dictionary; kana pieces are kept whole.
+
+    Han text is cut at particles and Chinese stop words (which are kept as
+    segments of their own), so no segment spans a word boundary they mark.
+    Pieces of up to HAN_WORD_MAX_LENGTH characters are kept whole, and
+    longer ones split into overlapping character bigrams.
+    """
+    segments = []
+    for piece in SCRIPT_PATTERN.findall(run):
+        if "\u3040" <= piece[0] <= "\u30ff":  # kana
+            segments.append(piece)
+            continue
+        for clause in HAN_PARTICLE_PATTERN.split(piece):
+            for part in HAN_STOP_PATTERN.split(clause):
+                if len(part) > HAN_WORD_MAX_LENGTH:
+                    segments.extend(part[i:i + 2] for i in range(len(part) - 1))
+                elif part:
+                    segments.append(part)
+    return segments
+
+
+def jieba_segment(run: str) -> List[str]:
+    """Split a CJK run into dictionary words with jieba."""
+    import jieba
+    return jieba.lcut(run)
+
+
+def _jieba_available() -> bool:
+    try:
+        import jieba
+    except ImportError:
+        return False
+    jieba.setLogLevel(60)  # silence "Building prefix dict" on first use
+    return True
+
+
+# Segmentation backends by name; register_backend() adds more
+BACKENDS: Dict[str, Callable[[str], List[str]]] = {
+    "bigram": bigram_segment,
+    "jieba": jieba_segment,
+}
+
+
+def register_backend(name: str, segment: Callable[[str], List[str]]):
+    """Make segment(run) -> words available as a CJK backend."""
+    BACKENDS[name] = segment
+
+
+class Tokenizer:
+    """
+    Word and keyword extraction with per-text LRU caches.
+
+    languages selects the stop-word sets dropped from keywords. cjk_backend
+    names the segmenter for runs of Chinese/Japanese characters: "auto"
+    uses jieba when it is installed and character bigrams otherwise.
+
+    version identifies everything that affects the output, so results
+    computed with a different tokenizer can be told apart.
+    """
+
+    def __init__(
+        self,
+        languages: Sequence[str] = DEFAULT_LANGUAGES,
+        cjk_backend: str = "auto",
+        cache_size: int = CACHE_SIZE,
+    ):
+        unknown = [lang for lang in languages if lang not in STOP_WORDS]
+        if unknown:
+            raise ValueError(f"no stop words for language(s): {', '.join(unknown)}")
+        if cjk_backend == "auto":
+            cjk_backend = "jieba" if _jieba_available() else "bigram"
+        if cjk_backend not in BACKENDS:
+            raise ValueError(f"unknown CJK backend {cjk_backend!r} ({', '.join(BACKENDS)})")
+
+        self.languages = tuple(languages)
+        self.cjk_backend = cjk_backend
+        self.segment = BACKENDS[cjk_backend]
+        self.stop_words = frozenset().union(*(STOP_WORDS[lang] for lang in self.languages))
+
+        digest = hashlib.sha1(f"{VERSION}|{cjk_backend}".encode("utf-8"))
+        for word in sorted(self.stop_words):
+            digest.update(word.encode("utf-8") + b"\n")
+        self.version = digest.hexdigest()[:16]
+
+        self._keyword_cache = lru_cache(maxsize=cache_size)(self._keyword_candidates)
+        self._word_cache = lru_cache(maxsize=cache_size)(self._words)
+
+    def _split(self, text: str, pattern: re.Pattern) -> Iterable[Tuple[str, bool]]:
+        """Yield (token, is_cjk) in text order."""
+        if text.isascii() or not CJK_PATTERN.search(text):
+            for token in pattern.findall(text):
+                yield token, False
+            return
+
+        position = 0
+        for match in CJK_PATTERN.finditer(text):
+            for token in pattern.findall(text, position, match.start()):
+                yield token, False
+            for token in self.segment(match.group()):
+                token = token.strip()
+                if token:
+                    yield token, True
+            position = match.end()
+        for token in pattern.findall(text, position):
+            yield token, False
+
+    def _keyword_candidates(self, text: str) -> Tuple[Tuple[str, ...], Tuple[int, ...]]:
+        # Lengths compared against min_length; CJK words pass any min_length
+        text = NOISE_PATTERN.sub(" ", text.lower())
+        stop_words = self.stop_words
+        if text.isascii() or not CJK_PATTERN.search(text):
+            tokens = tuple(
+                token for token in LATIN_KEYWORD_PATTERN.findall(text) if token not in stop_words
+            )
+            return tokens, tuple(map(len, tokens))
+
+        tokens = []
+        lengths = []
+        for token, is_cjk in self._split(text, KEYWORD_PATTERN):
+            if token in stop_words:
+                continue
+            if is_cjk:
+                if len(token) < CJK_MIN_LENGTH:
+                    continue
+                tokens.append(token)
+                lengths.append(_ANY_LENGTH)
+            else:
+                tokens.append(token)
+                lengths.append(len(token))
+        return tuple(tokens), tuple(lengths)
+
+    def _words(self, text: str) -> Tuple[str, ...]:
+        return tuple(
+            token for token, _ in self._split(text.lower().replace("’", "'"), WORD_PATTERN)
+        )
+
+    def keywords(self, text: str, min_length: int = 3) -> List[str]:
+        """
+        Keywords of a text, in order: lowercase words of at least min_length
+        characters (or CJK words), without URLs, mentions, hashtags and stop words.
+        """
+        tokens, lengths = self._keyword_cache(text)
+        if min_length <= 1:
+            return list(tokens)
+        return [token for token, length in zip(tokens, lengths) if length >= min_length]
+
+    def words(self, text: str) -> List[str]:
+        """All lowercase word tokens of a text, punctuation dropped, apostrophes kept."""
+        return list(self._word_cache(text))
+
+    def cache_info(self) -> Dict[str, object]:
+        return {"keywords": self._keyword_cache.cache_info(), "words": self._word_cache.cache_info()}
+
+    def clear_cache(self):
+        self._keyword_cache.cache_clear()
+        self._word_cache.cache_clear()
+
+
+def hashtags(text: str) -> List[str]:
+    """Hashtags in a text, without the #."""
+    return HASHTAG_PATTERN.findall(text)
+
+
+def mentions(text: str) -> List[str]:
+    """Mentioned usernames in a text, without the @."""
+    return MENTION_PATTERN.findall(text)
+
+
+_default_tokenizer: Optional[Tokenizer] = None
+_active_tokenizer: Optional[Tokenizer] = None
+
+
+def set_tokenizer(tokenizer: Optional[Tokenizer]):
+    """Use a configured tokenizer for all analysis (None restores the default one)."""
+    global _active_tokenizer
+    _active_tokenizer = tokenizer
+
+
+def get_tokenizer() -> Tokenizer:
+    """Return the active tokenizer, creating the default one on first use."""
+    global _default_tokenizer
+
+    if _active_tokenizer is not None:
+        return _active_tokenizer
+    if _default_tokenizer is None:
+        _default_tokenizer = Tokenizer()
+    return _default_tokenizer
+
+
+def keywords(text: str, min_length: int = 3) -> List[str]:
+    """Keywords of a text with the active tokenizer (see Tokenizer.keywords)."""
+    return get_tokenizer().keywords(text, min_length)
+
+
+def words(text: str) -> List[str]:
+    """Word tokens of a text with the active tokenizer (see Tokenizer.words)."""
+    return get_tokenizer().words(text)
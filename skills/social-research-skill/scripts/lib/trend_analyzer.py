@@ -2,51 +2,78 @@
 Trend analyzer module - Analyze trends and themes from posts
 """
 
-from typing import List, Dict, Counter
-from collections import Counter
-import re
+from typing import Callable, Iterable, List, Dict, Counter, Optional, Sequence
+from collections import Counter, defaultdict
+from datetime import datetime
+from itertools import chain
+
+from . import tokenizer
+
+
+# Common stop words to filter (English; the tokenizer holds the other languages)
+STOP_WORDS = tokenizer.STOP_WORDS["en"]
+
+# Term kinds counted per post and kept in the post store's daily rollups
+ROLLUP_KINDS = ("keyword", "phrase", "hashtag")
 
 
 def extract_keywords(text: str, min_length: int = 3) -> List[str]:
-    """Extract keywords from text."""
-    # Remove URLs, mentions, hashtags
-    text = re.sub(r'http\S+|www\.\S+', '', text)
-    text = re.sub(r'@\w+', '', text)
-    text = re.sub(r'#\w+', '', text)
-    
-    # Extract words
-    words = re.findall(r'\b[a-zA-Z]{' + str(min_length) + r',}\b', text.lower())
-    
-    # Common stop words to filter
-    stop_words = {
-        'the', 'is', 'at', 'which', 'on', 'and', 'or', 'but', 'in', 'with',
-        'to', 'for', 'of', 'as', 'by', 'an', 'be', 'this', 'that', 'from',
-        'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-        'should', 'may', 'might', 'can', 'are', 'was', 'were', 'been', 'being',
-        'not', 'no', 'yes', 'all', 'any', 'some', 'more', 'most', 'very',
-        'just', 'only', 'also', 'too', 'than', 'then', 'now', 'here', 'there',
-        'when', 'where', 'why', 'how', 'what', 'who', 'which', 'their', 'them',
-        'they', 'these', 'those', 'such', 'into', 'through', 'during', 'before',
-        'after', 'above', 'below', 'between', 'under', 'again', 'further',
-        'once', 'here', 'there', 'when', 'where', 'why', 'how', 'all', 'both',
-        'each', 'few', 'more', 'most', 'other', 'some', 'such', 'than', 'too',
-        'very', 'can', 'will', 'just', 'don', 'should', 'now', 'use', 'using',
-        'used', 'get', 'got', 'like', 'know', 'think', 'want', 'need', 'make',
-        'see', 'look', 'find', 'give', 'tell', 'work', 'call', 'try', 'ask',
-        'feel', 'become', 'leave', 'put'
-    }
-    
-    return [w for w in words if w not in stop_words]
+    """Extract keywords from text (see tokenizer.Tokenizer.keywords)."""
+    return tokenizer.keywords(text, min_length)
 
 
 def extract_hashtags(text: str) -> List[str]:
     """Extract hashtags from text."""
-    return re.findall(r'#(\w+)', text)
+    return tokenizer.hashtags(text)
 
 
 def extract_mentions(text: str) -> List[str]:
     """Extract mentions from text."""
-    return re.findall(r'@(\w+)', text)
+    return tokenizer.mentions(text)
+
+
+def _post_text(post: Dict) -> str:
+    if post.get("platform") == "reddit":
+        return post.get("title", "") + " " + post.get("text", "")
+    return post.get("text", "")
+
+
+def _phrases(words: List[str]) -> List[str]:
+    """Bigrams then trigrams, in the order find_common_themes counts them."""
+    return (
+        [" ".join(pair) for pair in zip(words, words[1:])]
+        + [" ".join(triple) for triple in zip(words, words[1:], words[2:])]
+    )
+
+
+def post_week(post: Dict) -> Optional[str]:
+    """Return the "%Y-W%U" week a post was created in, or None if its date is unknown."""
+    date_str = post.get("created_date") or post.get("created_at", "")
+    if not date_str:
+        return None
+    try:
+        date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+    except (TypeError, ValueError, AttributeError):
+        return None
+    return date.strftime("%Y-W%U")
+
+
+def post_term_counts(post: Dict) -> Dict[str, Counter]:
+    """
+    Count one post's keywords, phrases and hashtags.
+
+    Counting matches find_trending_topics, find_common_themes and
+    analyze_hashtags, so summing these per-post counts gives the same
+    frequencies those functions compute.
+    """
+    text = _post_text(post)
+    phrases = Counter(_phrases(extract_keywords(text, min_length=4)))
+
+    return {
+        "keyword": Counter(extract_keywords(text)),
+        "phrase": phrases,
+        "hashtag": Counter(extract_hashtags(post.get("text", "") or post.get("title", ""))),
+    }
 
 
 def find_trending_topics(posts: List[Dict], top_n: int = 10) -> List[Dict]:
@@ -155,33 +182,19 @@ def analyze_hashtags(posts: List[Dict], top_n: int = 10) -> List[Dict]:
 
 def analyze_temporal_trends(posts: List[Dict]) -> Dict:
     """Analyze how trends change over time."""
-    from datetime import datetime
-    from collections import defaultdict
-    
     # Group posts by week
     weekly_keywords = defaultdict(Counter)
     
     for post in posts:
-        date_str = post.get("created_date") or post.get("created_at", "")
-        if not date_str:
-            continue
-        
-        try:
-            date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            week = date.strftime("%Y-W%U")
-            
-            text = ""
-            if post.get("platform") == "reddit":
-                text = post.get("title", "") + " " + post.get("text", "")
-            else:
-                text = post.get("text", "")
-            
-            keywords = extract_keywords(text)
-            weekly_keywords[week].update(keywords)
-        except:
-            continue
-    
-    # Find trending up/down
+        week = post_week(post)
+        if week:
+            weekly_keywords[week].update(extract_keywords(_post_text(post)))
+
+    return compare_weeks(weekly_keywords)
+
+
+def compare_weeks(weekly_keywords: Dict[str, Counter]) -> Dict:
+    """Find keywords trending up/down between the first and last week."""
     weeks = sorted(weekly_keywords.keys())
     if len(weeks) < 2:
         return {"trending_up": [], "trending_down": [], "stable": []}
@@ -192,7 +205,8 @@ def analyze_temporal_trends(posts: List[Dict]) -> Dict:
     trending_up = []
     trending_down = []
     
-    all_keywords = set(first_week.keys()) | set(last_week.keys())
+    # Keywords in first-seen order, so ties rank the same way on every run
+    all_keywords = dict.fromkeys(chain(first_week, last_week))
     
     for keyword in all_keywords:
         first_count = first_week.get(keyword, 0)
@@ -219,18 +233,203 @@ def analyze_temporal_trends(posts: List[Dict]) -> Dict:
     }
 
 
-def analyze(posts: List[Dict], topic: str) -> Dict:
+def find_discussion_clusters(posts: List[Dict], max_clusters: int = 10) -> List[Dict]:
+    """
+    Group posts into discussion clusters (needs NumPy).
+
+    Returns clusters with their top terms, size and representative posts.
+    """
+    from . import clustering
+    return clustering.cluster_posts(posts, max_clusters=max_clusters)
+
+
+# The independent parts of analyze(), by result key; each takes the post list
+ANALYSES: Dict[str, Callable[[List[Dict]], object]] = {
+    "topics": lambda posts: find_trending_topics(posts, top_n=15),
+    "themes": lambda posts: find_common_themes(posts, min_posts=3),
+    "hashtags": lambda posts: analyze_hashtags(posts, top_n=10),
+    "temporal": analyze_temporal_trends,
+}
+
+# Parts analyze() only runs when asked for, by result key
+OPTIONAL_ANALYSES: Dict[str, Callable[[List[Dict]], object]] = {
+    "clusters": find_discussion_clusters,
+}
+
+
+def select_analyses(extra: Sequence[str] = ()) -> Dict[str, Callable[[List[Dict]], object]]:
+    """ANALYSES plus the named OPTIONAL_ANALYSES."""
+    return {**ANALYSES, **{key: OPTIONAL_ANALYSES[key] for key in extra}}
+
+
+def combine(topic: str, total_posts: int, parts: Dict) -> Dict:
+    """Assemble the analyze() result from the outputs of ANALYSES (and any optional ones)."""
+    trends = {"topic": topic, "total_posts": total_posts}
+    for key in ANALYSES:
+        trends[key] = parts[key]
+    for key in OPTIONAL_ANALYSES:
+        if key in parts:
+            trends[key] = parts[key]
+    return trends
+
+
+def analyze(posts: List[Dict], topic: str, extra: Sequence[str] = ()) -> Dict:
     """
     Comprehensive trend analysis.
     
+    extra names OPTIONAL_ANALYSES to add, e.g. ("clusters",).
+
     Returns dictionary with all trend data.
     """
+    parts = {key: analysis(posts) for key, analysis in select_analyses(extra).items()}
+    return combine(topic, len(posts), parts)
+
+
+def analyze_rollups(
+    daily: Dict[str, Dict],
+    topic: str,
+    examples: Optional[Callable[[str, int], List[Dict]]] = None,
+) -> Dict:
+    """
+    Comprehensive trend analysis from daily term counts.
+
+    daily maps "YYYY-MM-DD" to {"posts": n, "keyword": Counter, "phrase":
+    Counter, "hashtag": Counter}, as kept by the post store. Cost grows with
+    the number of days and distinct terms, not posts. examples(term, n), if
+    given, returns up to n example posts for a keyword or phrase.
+
+    Returns the same structure as analyze().
+    """
+    totals = {kind: Counter() for kind in ROLLUP_KINDS}
+    weekly_keywords = defaultdict(Counter)
+    total_posts = 0
+
+    for day, counts in daily.items():
+        total_posts += counts.get("posts", 0)
+        for kind in ROLLUP_KINDS:
+            totals[kind].update(counts.get(kind, {}))
+        week = datetime.strptime(day, "%Y-%m-%d").strftime("%Y-W%U")
+        weekly_keywords[week].update(counts.get("keyword", {}))
+
+    return summarize_counts(totals, weekly_keywords, total_posts, topic, examples)
+
+
+def summarize_counts(
+    totals: Dict,
+    weekly_keywords: Dict[str, Counter],
+    total_posts: int,
+    topic: str,
+    examples: Optional[Callable[[str, int], List[Dict]]] = None,
+) -> Dict:
+    """
+    Build the analyze() structure from summed term counts.
+
+    totals maps each of ROLLUP_KINDS to a counter with most_common();
+    weekly_keywords maps weeks to keyword Counters (only the first and
+    last week are compared).
+    """
+    find_examples = examples or (lambda term, n: [])
+
+    topics = [
+        {
+            "keyword": keyword,
+            "frequency": count,
+            "percentage": round(count / max(total_posts, 1) * 100, 1),
+            "example_posts": find_examples(keyword, 3),
+        }
+        for keyword, count in totals["keyword"].most_common(15)
+    ]
+    themes = [
+        {"theme": phrase, "frequency": count, "posts": find_examples(phrase, 5)}
+        for phrase, count in totals["phrase"].most_common(20)
+        if count >= 3
+    ]
+    hashtags = [
+        {"hashtag": f"#{tag}", "count": count}
+        for tag, count in totals["hashtag"].most_common(10)
+    ]
+
     return {
         "topic": topic,
-        "total_posts": len(posts),
-        "topics": find_trending_topics(posts, top_n=15),
-        "themes": find_common_themes(posts, min_posts=3),
-        "hashtags": analyze_hashtags(posts, top_n=10),
-        "temporal": analyze_temporal_trends(posts),
+        "total_posts": total_posts,
+        "topics": topics,
+        "themes": themes,
+        "hashtags": hashtags,
+        "temporal": compare_weeks(weekly_keywords),
     }
 
+
+def analyze_stream(
+    posts: Iterable[Dict], topic: str, counter: Callable[[], Counter] = Counter
+) -> Dict:
+    """
+    Comprehensive trend analysis without holding the posts in memory.
+
+    posts must yield the same posts in the same order each time it is
+    iterated (a list, or a spill.SpillList). The first pass sums per-post
+    term counts into counter() objects, which need update(), items() and
+    most_common() (e.g. spill.SpillCounter); the second pass picks example
+    posts for the top keywords and themes.
+
+    Returns the same result as analyze() on the same posts.
+    """
+    totals = {kind: counter() for kind in ROLLUP_KINDS}
+    keywords_by_week = counter()
+    weeks = set()
+    total_posts = 0
+
+    for post in posts:
+        total_posts += 1
+        counts = post_term_counts(post)
+        for kind in ROLLUP_KINDS:
+            totals[kind].update(counts[kind])
+        week = post_week(post)
+        if week:
+            weeks.add(week)
+            keywords_by_week.update({(week, keyword): n for keyword, n in counts["keyword"].items()})
+
+    # Only the first and last week are compared
+    weekly_keywords = {week: Counter() for week in weeks}
+    if len(weeks) >= 2:
+        ends = (min(weeks), max(weeks))
+        for (week, keyword), n in keywords_by_week.items():
+            if week in ends:
+                weekly_keywords[week][keyword] = n
+
+    trends = summarize_counts(totals, weekly_keywords, total_posts, topic)
+    collect_examples(posts, trends)
+    return trends
+
+
+def collect_examples(posts: Iterable[Dict], trends: Dict):
+    """
+    Fill in the example posts of trends' topics and themes in place.
+
+    Picks the same posts as find_trending_topics (first 3 mentions of a
+    keyword) and find_common_themes (first 5 of a phrase), stopping as
+    soon as every list is full.
+    """
+    topic_examples = {item["keyword"]: item["example_posts"] for item in trends["topics"]}
+    theme_examples = {item["theme"]: item["posts"] for item in trends["themes"]}
+    open_slots = (
+        sum(3 - len(examples) for examples in topic_examples.values())
+        + sum(5 - len(examples) for examples in theme_examples.values())
+    )
+
+    for post in posts:
+        if open_slots <= 0:
+            break
+        text = _post_text(post)
+
+        for keyword in extract_keywords(text):
+            examples = topic_examples.get(keyword)
+            if examples is not None and len(examples) < 3:
+                examples.append(post)
+                open_slots -= 1
+
+        if theme_examples:
+            for phrase in _phrases(extract_keywords(text, min_length=4)):
+                examples = theme_examples.get(phrase)
+                if examples is not None and len(examples) < 5:
+                    examples.append(post)
+                    open_slots -= 1
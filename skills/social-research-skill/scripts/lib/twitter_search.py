@@ -3,10 +3,17 @@ Twitter/X search module - Search X for discussions
 """
 
 import os
-import time
 from datetime import datetime
 from typing import List, Dict, Optional
-import requests
+
+from . import fast_json, http_pool, saturation
+
+# API host, overridable to point the fetcher at a stand-in server such as
+# benchmarks/mock_api.py
+TWITTER_API_URL = os.getenv("TWITTER_API_URL", "https://api.twitter.com").rstrip("/")
+
+# Author of tweets whose user the response doesn't include
+NO_USER = fast_json.TwitterUser()
 
 
 def get_twitter_credentials() -> Optional[str]:
@@ -15,9 +22,20 @@ def get_twitter_credentials() -> Optional[str]:
 
 
 def search_via_api(
-    query: str, start_date: datetime, end_date: datetime, limit: int, bearer_token: str
+    query: str,
+    start_date: datetime,
+    end_date: datetime,
+    limit: int,
+    bearer_token: str,
+    min_yield: float = 0.0,
+    min_engagement: Optional[int] = None,
 ) -> List[Dict]:
-    """Search Twitter using official API v2."""
+    """
+    Search Twitter using official API v2.
+
+    With min_yield, paging stops early once pages stop adding new unique
+    posts of at least min_engagement (see saturation.PageYield).
+    """
     headers = {"Authorization": f"Bearer {bearer_token}"}
     
     # Format dates for Twitter API
@@ -36,53 +54,62 @@ def search_via_api(
     
     results = []
     next_token = None
+    pages = saturation.PageYield("twitter", min_yield, min_engagement)
     
     while len(results) < limit:
         if next_token:
             params["pagination_token"] = next_token
         
         try:
-            response = requests.get(
-                "https://api.twitter.com/2/tweets/search/recent",
-                headers=headers,
-                params=params,
-                timeout=15,
-            )
+            http_pool.throttle("twitter")
+            with http_pool.session() as session:
+                response = session.get(
+                    f"{TWITTER_API_URL}/2/tweets/search/recent",
+                    headers=headers,
+                    params=params,
+                    timeout=15,
+                )
             response.raise_for_status()
-            data = response.json()
+            data = fast_json.loads(response.content, fast_json.TwitterSearch)
             
-            tweets = data.get("data", [])
-            users = {u["id"]: u for u in data.get("includes", {}).get("users", [])}
+            tweets = data.data
+            users = {user.id: user for user in data.includes.users}
             
             if not tweets:
                 break
             
+            page_start = len(results)
             for tweet in tweets:
-                author_id = tweet.get("author_id")
-                author = users.get(author_id, {})
-                metrics = tweet.get("public_metrics", {})
+                author = users.get(tweet.author_id) or NO_USER
+                metrics = tweet.public_metrics
                 
                 results.append({
-                    "id": tweet.get("id"),
-                    "text": tweet.get("text"),
-                    "author": author.get("username"),
-                    "author_name": author.get("name"),
-                    "url": f"https://twitter.com/{author.get('username')}/status/{tweet.get('id')}",
-                    "likes": metrics.get("like_count", 0),
-                    "retweets": metrics.get("retweet_count", 0),
-                    "replies": metrics.get("reply_count", 0),
-                    "created_at": tweet.get("created_at"),
+                    "id": tweet.id,
+                    "text": tweet.text,
+                    "author": author.username,
+                    "author_name": author.name,
+                    "url": f"https://twitter.com/{author.username}/status/{tweet.id}",
+                    "likes": metrics.like_count,
+                    "retweets": metrics.retweet_count,
+                    "replies": metrics.reply_count,
+                    "created_at": tweet.created_at,
                     "platform": "twitter",
                 })
             
-            next_token = data.get("meta", {}).get("next_token")
+            next_token = data.meta.next_token
             if not next_token:
                 break
-            
-            # Rate limiting
-            time.sleep(1)
+
+            pages.record(len(tweets), results[page_start:])
+            if pages.saturated:
+                print(f"Twitter API: stopped after {pages.pages} pages; "
+                      f"the last {pages.low_pages} added few new posts")
+                break
             
         except Exception as e:
+            # Nothing fetched yet: let the caller see the failure
+            if not results:
+                raise
             print(f"Twitter API error: {e}")
             break
     
@@ -105,18 +132,26 @@ def search_via_nitter(
 
 
 def search(
-    query: str, start_date: datetime, end_date: datetime, limit: int = 50
+    query: str,
+    start_date: datetime,
+    end_date: datetime,
+    limit: int = 50,
+    min_yield: float = 0.0,
+    min_engagement: Optional[int] = None,
 ) -> List[Dict]:
     """
     Search Twitter/X for discussions.
     
     Tries official API first, falls back to alternative methods if needed.
+    min_yield and min_engagement set early stopping for the API's paging.
     """
     bearer_token = get_twitter_credentials()
     
     if bearer_token:
         print("Using Twitter official API...")
-        return search_via_api(query, start_date, end_date, limit, bearer_token)
+        return search_via_api(
+            query, start_date, end_date, limit, bearer_token, min_yield, min_engagement
+        )
     
     print("Twitter API credentials not available...")
     return search_via_nitter(query, start_date, end_date, limit)
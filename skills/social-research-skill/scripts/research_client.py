@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+research_client.py - Run social research through research_daemon.py
+
+Takes exactly the same arguments as social_research.py and prints the same
+output, but hands the job to a running daemon instead of starting the
+pipeline in a fresh interpreter. If no daemon is listening the job runs
+in-process; if the daemon fails after accepting the connection, the error
+is reported instead, since the job may already have run there.
+
+Usage:
+    python3 research_client.py [--daemon=ADDRESS] <topic> [social_research options]
+
+The daemon address defaults to $SOCIAL_RESEARCH_DAEMON, then
+http://127.0.0.1:8765. Use unix:///path/to.sock for a Unix socket.
+"""
+
+import http.client
+import json
+import os
+import socket
+import sys
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+DEFAULT_DAEMON = os.getenv("SOCIAL_RESEARCH_DAEMON", "http://127.0.0.1:8765")
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket."""
+
+    def __init__(self, path: str, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def connect(address: str, timeout=None) -> http.client.HTTPConnection:
+    """Open a connection to a daemon address."""
+    if address.startswith("unix://"):
+        return UnixHTTPConnection(address[len("unix://"):], timeout=timeout)
+    parts = urlsplit(address)
+    return http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+
+
+class DaemonUnavailable(Exception):
+    """No daemon accepted the connection, so the job was never sent."""
+
+
+def submit(address: str, argv: List[str]) -> Dict:
+    """
+    Send one research job to the daemon and wait for its result.
+
+    Raises DaemonUnavailable if nothing listens at address. Any later
+    failure may come after the daemon accepted the job, and is raised as is.
+    """
+    conn = connect(address)
+    try:
+        try:
+            conn.connect()
+        except (ConnectionRefusedError, FileNotFoundError) as e:
+            raise DaemonUnavailable(str(e)) from e
+
+        body = json.dumps({"argv": argv})
+        conn.request(
+            "POST", "/research", body=body,
+            headers={"Content-Type": "application/json"},
+        )
+        response = conn.getresponse()
+        payload = json.loads(response.read())
+    finally:
+        conn.close()
+
+    if response.status != 200:
+        raise RuntimeError(payload.get("error", f"daemon returned HTTP {response.status}"))
+    return payload
+
+
+def main() -> int:
+    """Main execution function."""
+    argv = sys.argv[1:]
+    address = DEFAULT_DAEMON
+    if argv and argv[0].startswith("--daemon="):
+        address = argv.pop(0).split("=", 1)[1]
+
+    try:
+        result = submit(address, argv)
+    except DaemonUnavailable:
+        # No daemon running: fall back to running the pipeline here
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import social_research
+        return social_research.run(argv)
+    except (OSError, http.client.HTTPException, ValueError, RuntimeError) as e:
+        # The daemon may already be running the job, so it is not retried here
+        print(f"❌ Daemon at {address} failed: {e}", file=sys.stderr)
+        return 1
+
+    sys.stdout.write(result["stdout"])
+    sys.stderr.write(result["stderr"])
+    return result["exit_code"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
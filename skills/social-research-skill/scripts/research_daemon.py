@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+research_daemon.py - Serve social research jobs from one long-running process
+
+The daemon imports the research pipeline once and keeps HTTP sessions, OAuth
+tokens and caches warm between jobs. Each job runs the same code path as
+social_research.py and returns exactly what the CLI would have printed.
+
+Usage:
+    python3 research_daemon.py [options]
+
+Options:
+    --host=HOST           Bind address (default: 127.0.0.1)
+    --port=N              TCP port (default: 8765)
+    --socket=PATH         Listen on a Unix socket instead of TCP
+    --max-jobs=N          Maximum concurrent research jobs (default: 4)
+
+Endpoints:
+    POST /research        {"argv": ["topic", "--days=7", ...]}
+                          -> {"exit_code": 0, "stdout": "...", "stderr": "..."}
+    GET  /health          -> {"status": "ok", "active_jobs": 0, "max_jobs": 4}
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import social_research
+from lib import http_pool, job_output
+
+
+class JobRunner:
+    """Runs research jobs with a bounded number in flight."""
+
+    def __init__(self, max_jobs: int):
+        self.max_jobs = max_jobs
+        self.active_jobs = 0
+        self._slots = threading.BoundedSemaphore(max_jobs)
+        self._lock = threading.Lock()
+
+    def run(self, argv: List[str]) -> Dict:
+        with self._slots:
+            with self._lock:
+                self.active_jobs += 1
+            try:
+                with job_output.capture() as (stdout, stderr):
+                    exit_code = social_research.run(argv)
+            finally:
+                with self._lock:
+                    self.active_jobs -= 1
+
+        return {
+            "exit_code": exit_code,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+        }
+
+
+class ResearchHandler(BaseHTTPRequestHandler):
+    """HTTP front end for JobRunner."""
+
+    runner: JobRunner = None
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": "not found"})
+            return
+        self._send_json(200, {
+            "status": "ok",
+            "active_jobs": self.runner.active_jobs,
+            "max_jobs": self.runner.max_jobs,
+        })
+
+    def do_POST(self):
+        if self.path != "/research":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            argv = request["argv"]
+            if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+                raise ValueError("argv must be a list of strings")
+        except (KeyError, ValueError) as e:
+            self._send_json(400, {"error": f"invalid request: {e}"})
+            return
+
+        self._send_json(200, self.runner.run(argv))
+
+    def address_string(self) -> str:
+        # Unix socket peers have no host/port
+        return str(self.client_address[0]) if self.client_address else "local"
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Serve social research jobs")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument("--socket", help="Listen on a Unix socket instead of TCP")
+    parser.add_argument(
+        "--max-jobs", type=int, default=4,
+        help="Maximum concurrent research jobs (default: 4)",
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+
+    job_output.install()
+
+    handler = type("Handler", (ResearchHandler,), {"runner": JobRunner(args.max_jobs)})
+
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+        server = ThreadingUnixHTTPServer(args.socket, handler)
+        address = f"unix://{args.socket}"
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), handler)
+        address = f"http://{args.host}:{server.server_address[1]}"
+
+    print(f"🧠 Research daemon listening on {address} (max {args.max_jobs} jobs)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+    finally:
+        server.server_close()
+        http_pool.close_sessions()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
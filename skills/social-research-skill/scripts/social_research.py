@@ -9,18 +9,48 @@ Options:
     --days=N              Days to look back (default: 30)
     --min-engagement=N    Minimum engagement threshold (default: 5)
     --max-results=N       Maximum results per platform (default: 50)
+    --min-page-yield=F    Stop paging a search once pages are less than F new,
+                          unique posts meeting --min-engagement (default: 0, off)
     --include-comments    Include comment analysis
     --sentiment           Enable sentiment analysis
-    --export=FORMAT       Export format: json|csv|md (default: md)
+    --clusters            Group posts into discussion clusters (needs numpy)
+    --export=FORMATS      Comma-separated export formats:
+                          json|jsonl|csv|npz|parquet|md (default: md)
+    --input=PATH          Analyze saved posts instead of fetching (JSON, JSONL
+                          or .gz; globs allowed; repeatable)
+    --from-store          Build the report from the local post store instead
+                          of fetching
+    --end-date=YYYY-MM-DD Last day of the time range (default: today)
+    --store=PATH          Post store database (default: data/posts.sqlite)
+    --no-store            Do not save fetched posts to the post store
+    --output-dir=PATH     Directory for reports (default: output/)
+    --max-memory=SIZE     Keep the pipeline's buffers under SIZE (e.g. 512M),
+                          spilling to temporary files; md/json/jsonl/csv only
+    --sample=N            Analyze an engagement-stratified sample of N posts,
+                          with confidence intervals (--input/--from-store)
+    --seed=N              Seed for content suggestion wording and --sample
+                          (default: 0)
+    --recompute           Ignore memoized stage results from earlier runs
+    --knowledge-export[=DIR]
+                          Add new posts, topics and themes to the second-brain
+                          knowledge DB and graph (default: second-brain/data)
+    --knowledge-compact   Rewrite the knowledge snapshots after exporting
+    --workers=N           Processes for the trend and sentiment analyses
+                          (default: up to 5 from 2000 posts; 1 disables)
+    --profile[=FORMAT]    Save per-stage timing, memory and counters next to
+                          the report: json (default) or chrome trace
+    --profile-stage=STAGE Also run one stage under cProfile and save its stats
     --debug               Enable debug logging
 """
 
 import argparse
-import json
+import contextvars
+import heapq
 import os
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from array import array
 from datetime import datetime, timedelta
+from itertools import chain
 from pathlib import Path
 from typing import Dict, List, Optional
 
@@ -28,22 +58,50 @@ from typing import Dict, List, Optional
 SCRIPT_DIR = Path(__file__).parent.resolve()
 sys.path.insert(0, str(SCRIPT_DIR))
 
-from lib import (
-    reddit_search,
-    twitter_search,
-    engagement_filter,
-    deduplicator,
-    trend_analyzer,
-    content_suggester,
-    sentiment_analyzer,
-    output_formatter,
-)
+# lib modules are imported inside the functions that use them, so --help and
+# offline runs never load the networking stack
 
+EXPORT_FORMATS = ["json", "jsonl", "csv", "npz", "parquet", "md"]
+# Formats written without holding every post in memory (see --max-memory)
+STREAMED_FORMATS = ["md", "json", "jsonl", "csv"]
+SENTIMENT_BATCH = 1000
+# Analysis stages run in forked workers from this many unique posts
+PARALLEL_MIN_POSTS = 2000
+PARALLEL_WORKERS = 5
 
-def parse_args():
+PROFILE_FORMATS = ["json", "chrome"]
+PROFILE_STAGES = [
+    "fetch", "filter", "dedup", "trends", "suggestions", "sentiment", "formatting", "knowledge",
+]
+
+
+def export_formats(value: str) -> List[str]:
+    """Parse a comma-separated --export value."""
+    formats = [fmt.strip().lower() for fmt in value.split(",") if fmt.strip()]
+    invalid = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+    if not formats or invalid:
+        raise argparse.ArgumentTypeError(
+            f"invalid format(s) {', '.join(invalid) or value!r} "
+            f"(choose from {', '.join(EXPORT_FORMATS)})"
+        )
+    return list(dict.fromkeys(formats))
+
+
+def memory_size(value: str) -> int:
+    """Parse a --max-memory value such as 512M or 2G."""
+    from lib import spill
+
+    try:
+        return spill.parse_size(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_args(argv: Optional[List[str]] = None):
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(
-        description="Research trending topics from Reddit and X"
+        prog="social_research.py",
+        description="Research trending topics from Reddit and X",
     )
     parser.add_argument("topic", help="Topic to research")
     parser.add_argument(
@@ -61,6 +119,15 @@ def parse_args():
         default=50,
         help="Maximum results per platform (default: 50)",
     )
+    parser.add_argument(
+        "--min-page-yield",
+        type=float,
+        default=0.0,
+        metavar="FRACTION",
+        help="Stop paging a search once consecutive pages are less than this share "
+        "new, unique posts meeting --min-engagement, e.g. 0.2 (default: 0, always page "
+        "to --max-results)",
+    )
     parser.add_argument(
         "--include-comments",
         action="store_true",
@@ -69,28 +136,278 @@ def parse_args():
     parser.add_argument(
         "--sentiment", action="store_true", help="Enable sentiment analysis"
     )
+    parser.add_argument(
+        "--clusters",
+        action="store_true",
+        help="Group posts into discussion clusters with their top terms (needs numpy)",
+    )
     parser.add_argument(
         "--export",
-        choices=["json", "csv", "md"],
-        default="md",
-        help="Export format (default: md)",
+        type=export_formats,
+        default=["md"],
+        help="Comma-separated export formats, e.g. md,json,csv (default: md)",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--input",
+        action="append",
+        metavar="PATH",
+        help="Analyze saved posts from JSON/JSONL/.gz files or globs instead of "
+        "fetching (repeatable)",
+    )
+    source.add_argument(
+        "--from-store",
+        action="store_true",
+        help="Build the report from the local post store instead of fetching",
+    )
+    parser.add_argument(
+        "--end-date",
+        type=lambda value: datetime.strptime(value, "%Y-%m-%d"),
+        metavar="YYYY-MM-DD",
+        help="Last day of the time range (default: today)",
+    )
+    parser.add_argument(
+        "--store", metavar="PATH", help="Post store database (default: data/posts.sqlite)"
+    )
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="Do not save fetched posts to the post store",
+    )
+    parser.add_argument(
+        "--output-dir", metavar="PATH", help="Directory for reports (default: output/)"
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=memory_size,
+        metavar="SIZE",
+        help="Approximate memory budget, e.g. 512M; buffers beyond it spill to "
+        "temporary files (md, json, jsonl and csv exports only)",
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        metavar="N",
+        help="Analyze an engagement-stratified sample of N posts and report "
+        "percentages with 95%% confidence intervals (--input and --from-store only)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for content suggestion wording and --sample (default: 0)",
+    )
+    parser.add_argument(
+        "--recompute",
+        action="store_true",
+        help="Recompute every analysis stage instead of reusing memoized results",
+    )
+    parser.add_argument(
+        "--knowledge-export",
+        nargs="?",
+        const="",
+        metavar="DIR",
+        help="Add new posts, topics and themes to the second-brain knowledge DB "
+        "and graph in DIR (default: second-brain/data)",
+    )
+    parser.add_argument(
+        "--knowledge-compact",
+        action="store_true",
+        help="Rewrite the knowledge DB and graph snapshots from the export log "
+        "(implies --knowledge-export)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Processes for the trend and sentiment analyses (default: up to "
+        f"{PARALLEL_WORKERS} from {PARALLEL_MIN_POSTS} posts; 1 disables)",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="json",
+        choices=PROFILE_FORMATS,
+        help="Record per-stage timing, memory and counters and save a json "
+        "(default) or chrome trace next to the report",
+    )
+    parser.add_argument(
+        "--profile-stage",
+        choices=PROFILE_STAGES,
+        help="Also run one stage under cProfile and save its stats (implies --profile)",
     )
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
 
-    return parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.knowledge_compact and args.knowledge_export is None:
+        args.knowledge_export = ""
+    if args.sample is not None:
+        if args.sample < 1:
+            parser.error("--sample must be at least 1")
+        if not (args.input or args.from_store):
+            parser.error("--sample needs --input or --from-store")
+    if args.profile_stage and not args.profile:
+        args.profile = "json"
+    if args.max_memory:
+        unbounded = [fmt for fmt in args.export if fmt not in STREAMED_FORMATS]
+        if unbounded:
+            parser.error(
+                f"--max-memory cannot export {', '.join(unbounded)}, which holds every "
+                f"post in memory (use {', '.join(STREAMED_FORMATS)})"
+            )
+    return args
 
 
-def calculate_date_range(days: int) -> tuple:
+def calculate_date_range(days: int, end_date: Optional[datetime] = None) -> tuple:
     """Calculate start and end dates for search."""
-    end_date = datetime.now()
+    if end_date is None:
+        end_date = datetime.now()
+    else:
+        # A bare date covers that whole day
+        end_date = end_date.replace(hour=23, minute=59, second=59)
     start_date = end_date - timedelta(days=days)
     return start_date, end_date
 
 
+def filter_by_platform(posts, min_engagement: int, budget=None, sample=None) -> tuple:
+    """
+    Run posts through the engagement filter, grouped by platform.
+
+    With a sampling.StratifiedReservoir, only its sample of the posts that
+    pass the filter is kept. Returns (filtered_reddit, filtered_twitter,
+    scanned_count), each sorted by engagement: lists, or with a memory
+    budget, spill.SortedSpills.
+    """
+    from lib import engagement_filter
+
+    if budget:
+        from lib import spill
+        filtered = {
+            "reddit": spill.SortedSpill(budget, key=spill.by_engagement),
+            "twitter": spill.SortedSpill(budget, key=spill.by_engagement),
+        }
+    else:
+        filtered = {"reddit": [], "twitter": []}
+    scanned = 0
+
+    def counted(posts):
+        nonlocal scanned
+        for post in posts:
+            scanned += 1
+            yield post
+
+    kept = engagement_filter.iter_filtered(counted(posts), min_engagement=min_engagement)
+    if sample is not None:
+        sample.extend(post for post in kept if post.get("platform") in filtered)
+        kept = sample.draw()
+    for post in kept:
+        if post.get("platform") in filtered:
+            filtered[post["platform"]].append(post)
+
+    if not budget:
+        for platform_posts in filtered.values():
+            platform_posts.sort(key=lambda x: x.get("engagement_score", 0), reverse=True)
+
+    return filtered["reddit"], filtered["twitter"], scanned
+
+
+def load_saved_posts(
+    patterns: List[str], min_engagement: int, budget=None, sample=None
+) -> tuple:
+    """
+    Stream saved posts from disk through the engagement filter.
+
+    Only posts that pass the filter are kept (in memory, or spilled under
+    a memory budget), or with a sample, only the sampled ones. Returns
+    (filtered_reddit, filtered_twitter, scanned_count, start_date,
+    end_date), with the date range taken from the kept posts.
+    """
+    from lib import corpus_loader, output_formatter
+
+    filtered_reddit, filtered_twitter, scanned = filter_by_platform(
+        corpus_loader.iter_posts(patterns), min_engagement, budget, sample
+    )
+
+    first = last = None
+    for post in chain(filtered_reddit, filtered_twitter):
+        ts = output_formatter.post_timestamp(post)
+        if ts:
+            first = ts if first is None else min(first, ts)
+            last = ts if last is None else max(last, ts)
+    if first is not None:
+        start_date = datetime.fromtimestamp(first)
+        end_date = datetime.fromtimestamp(last)
+    else:
+        start_date = end_date = datetime.now()
+
+    return filtered_reddit, filtered_twitter, scanned, start_date, end_date
+
+
+def load_stored_posts(store, args, budget=None, sample=None) -> tuple:
+    """
+    Query the local post store for the topic and time range.
+
+    Returns (filtered_reddit, filtered_twitter, scanned_count, start_date, end_date).
+    """
+    start_date, end_date = calculate_date_range(args.days, args.end_date)
+    posts = store.iter_query(args.topic, start_date=start_date, end_date=end_date)
+
+    filtered_reddit, filtered_twitter, scanned = filter_by_platform(
+        posts, args.min_engagement, budget, sample
+    )
+    return filtered_reddit, filtered_twitter, scanned, start_date, end_date
+
+
+def stored_rollups(store, args, start_date, end_date, ranked, kept) -> Optional[Dict]:
+    """
+    Daily term counts of the report's unique posts, built from the store's rollups.
+
+    The rollups cover the posts fetched for the topic on the UTC days wholly
+    inside the range, in the engagement buckets at or above --min-engagement.
+    ranked yields the filtered posts in dedup order and kept holds the
+    positions of those deduplication kept. Only the differences are
+    tokenized: counted posts that were dropped as duplicates or don't match
+    the topic's words are subtracted, and kept posts the rollups don't cover
+    (edge days, the lowest buckets, posts fetched for other topics) are added.
+
+    Returns None if the rollups count no posts.
+    """
+    from lib import post_store
+    counted = store.rollup_posts(args.topic, start_date, end_date, args.min_engagement)
+    if not counted:
+        return None
+    daily = store.rollups(args.topic, start_date, end_date, min_engagement=args.min_engagement)
+
+    unmatched = set(counted)
+    for position, post in enumerate(ranked):
+        key = post_store.post_key(post)
+        if key in counted:
+            unmatched.discard(key)
+            if position not in kept:
+                post_store.count_post_terms(daily, post, sign=-1)
+        elif position in kept:
+            post_store.count_post_terms(daily, post)
+    for post in store.get_posts(unmatched):
+        post_store.count_post_terms(daily, post, sign=-1)
+    return {day: counts for day, counts in daily.items() if counts["posts"] > 0}
+
+
+def save_to_store(store, results: List[Dict], topic: str, platform: str, debug: bool):
+    """Upsert fetched posts and their topic rollups into the post store; failures only warn."""
+    try:
+        written = store.upsert_posts(results, topic=topic)
+        if debug:
+            print(f"[DEBUG] Stored {written} {platform} posts in {store.path}")
+    except Exception as e:
+        print(f"⚠️  Could not save {platform} posts to store: {e}")
+
+
 def search_reddit(
-    topic: str, start_date: datetime, end_date: datetime, max_results: int, debug: bool
+    topic: str, start_date: datetime, end_date: datetime, max_results: int, debug: bool,
+    store=None, min_yield: float = 0.0, min_engagement: Optional[int] = None,
 ) -> Dict:
     """Search Reddit for topic discussions."""
+    from lib import reddit_search
+
     if debug:
         print(f"[DEBUG] Searching Reddit for: {topic}")
 
@@ -100,11 +417,16 @@ def search_reddit(
             start_date=start_date,
             end_date=end_date,
             limit=max_results,
+            min_yield=min_yield,
+            min_engagement=min_engagement,
         )
 
         if debug:
             print(f"[DEBUG] Found {len(results)} Reddit posts")
 
+        if store is not None:
+            save_to_store(store, results, topic, "reddit", debug)
+
         return {"platform": "reddit", "results": results, "error": None}
 
     except Exception as e:
@@ -114,9 +436,12 @@ def search_reddit(
 
 
 def search_twitter(
-    topic: str, start_date: datetime, end_date: datetime, max_results: int, debug: bool
+    topic: str, start_date: datetime, end_date: datetime, max_results: int, debug: bool,
+    store=None, min_yield: float = 0.0, min_engagement: Optional[int] = None,
 ) -> Dict:
     """Search X/Twitter for topic discussions."""
+    from lib import twitter_search
+
     if debug:
         print(f"[DEBUG] Searching X/Twitter for: {topic}")
 
@@ -126,11 +451,16 @@ def search_twitter(
             start_date=start_date,
             end_date=end_date,
             limit=max_results,
+            min_yield=min_yield,
+            min_engagement=min_engagement,
         )
 
         if debug:
             print(f"[DEBUG] Found {len(results)} X posts")
 
+        if store is not None:
+            save_to_store(store, results, topic, "twitter", debug)
+
         return {"platform": "twitter", "results": results, "error": None}
 
     except Exception as e:
@@ -139,145 +469,639 @@ def search_twitter(
         return {"platform": "twitter", "results": [], "error": str(e)}
 
 
-def main():
-    """Main execution function."""
-    args = parse_args()
+SEARCHES = {"reddit": search_reddit, "twitter": search_twitter}
 
-    # Print header
-    print(f"\n{'='*60}")
-    print(f"Social Research: {args.topic}")
-    print(f"{'='*60}\n")
+
+def search_platform(args, platform: str, start_date: datetime, end_date: datetime) -> Dict:
+    """Search one platform for args.topic, saving results to the post store unless disabled."""
+    from lib import post_store
+
+    # Every fetched post is kept in the local store for --from-store runs
+    store = None if args.no_store else post_store.get_store(args.store)
+    return SEARCHES[platform](
+        args.topic, start_date, end_date, args.max_results, args.debug, store,
+        args.min_page_yield, args.min_engagement,
+    )
+
+
+def open_post_writers(formats: List[str], output_dir: Path, base_filename: str) -> Dict:
+    """Open a streaming post writer for each requested streaming format."""
+    from lib import output_formatter
+
+    writers = {}
+    if "jsonl" in formats:
+        writers["jsonl"] = output_formatter.JsonlPostWriter(
+            output_dir / f"{base_filename}.posts.jsonl"
+        )
+    if "csv" in formats:
+        writers["csv"] = output_formatter.CsvPostWriter(
+            output_dir / f"{base_filename}.csv"
+        )
+    return writers
+
+
+def export_report(
+    fmt: str, output_data: Dict, output_dir: Path, base_filename: str, post_writers: Dict,
+    sentiment_results: Optional[List[Dict]] = None,
+) -> List[tuple]:
+    """
+    Write one export format and return its (label, path) pairs.
+
+    sentiment_results, the run's per-post sentiment in post order, saves the
+    columnar formats from scoring the posts again.
+    """
+    from lib import output_formatter
+
+    if fmt == "json":
+        output_file = output_dir / f"{base_filename}.json"
+        output_formatter.export_json(output_data, output_file)
+        return [("JSON", output_file)]
+
+    if fmt == "jsonl":
+        posts_file = Path(post_writers["jsonl"].path)
+        output_file = output_dir / f"{base_filename}.report.json"
+        output_formatter.export_report_document(
+            output_data, output_file, posts_file=posts_file.name
+        )
+        return [("JSONL posts", posts_file), ("report", output_file)]
+
+    if fmt == "csv":
+        posts_file = Path(post_writers["csv"].path)
+        if "jsonl" in post_writers:
+            # The jsonl export writes the same report document
+            return [("CSV", posts_file)]
+        output_file = output_dir / f"{base_filename}.report.json"
+        output_formatter.export_report_document(output_data, output_file)
+        return [("CSV", posts_file), ("report", output_file)]
+
+    if fmt == "npz":
+        output_file = output_dir / f"{base_filename}.npz"
+        output_formatter.export_npz(output_data, output_file, sentiment_results)
+        return [("columnar NumPy", output_file)]
+
+    if fmt == "parquet":
+        output_file = output_dir / f"{base_filename}.parquet"
+        output_formatter.export_parquet(output_data, output_file, sentiment_results)
+        return [("Parquet", output_file)]
+
+    # markdown
+    output_file = output_dir / f"{base_filename}.md"
+    markdown = output_formatter.format_markdown(output_data)
+    with open(output_file, "w") as f:
+        f.write(markdown)
+    return [("Markdown", output_file)]
+
+
+def export_reports(
+    formats: List[str], output_data: Dict, output_dir: Path, base_filename: str, post_writers: Dict,
+    sentiment_results: Optional[List[Dict]] = None,
+) -> List[tuple]:
+    """
+    Write all requested formats concurrently from one result.
+
+    Returns (label, path) pairs in the order the formats were requested.
+    """
+    if len(formats) == 1:
+        return export_report(
+            formats[0], output_data, output_dir, base_filename, post_writers, sentiment_results
+        )
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=len(formats)) as executor:
+        futures = [
+            executor.submit(
+                contextvars.copy_context().run,
+                export_report, fmt, output_data, output_dir, base_filename, post_writers,
+                sentiment_results,
+            )
+            for fmt in formats
+        ]
+        return [item for future in futures for item in future.result()]
+
+
+def fetch_posts(args, errors: List[str], fetched: Optional[Dict[str, Dict]] = None) -> tuple:
+    """
+    Search both platforms in parallel and filter the results by engagement.
+
+    fetched maps platform to an already completed search result (as
+    returned by search_reddit/search_twitter); only missing platforms are
+    searched. Search failures are appended to errors. Returns
+    (filtered_reddit, filtered_twitter, start_date, end_date).
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from lib import engagement_filter
 
     # Calculate date range
-    start_date, end_date = calculate_date_range(args.days)
+    start_date, end_date = calculate_date_range(args.days, args.end_date)
     print(f"📅 Time range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
     print(f"🔍 Minimum engagement: {args.min_engagement}")
     print(f"📊 Max results per platform: {args.max_results}\n")
 
-    # Parallel search
-    print("🚀 Starting parallel search...\n")
+    from lib import profiler
+
+    fetched = dict(fetched or {})
+    missing = [platform for platform in SEARCHES if platform not in fetched]
 
     all_results = {"reddit": [], "twitter": []}
-    errors = []
 
-    with ThreadPoolExecutor(max_workers=2) as executor:
-        # Submit both searches
-        reddit_future = executor.submit(
-            search_reddit, args.topic, start_date, end_date, args.max_results, args.debug
-        )
-        twitter_future = executor.submit(
-            search_twitter, args.topic, start_date, end_date, args.max_results, args.debug
-        )
+    def collect(result: Dict):
+        platform = result["platform"]
+        if result["error"]:
+            errors.append(f"{platform.title()}: {result['error']}")
+            print(f"⚠️  {platform.title()} search failed: {result['error']}")
+        else:
+            all_results[platform] = result["results"]
+            print(f"✅ {platform.title()}: Found {len(result['results'])} posts")
+
+    with profiler.stage("fetch") as stage:
+        for platform in SEARCHES:
+            if platform in fetched:
+                collect(fetched[platform])
+
+        if missing:
+            # Parallel search
+            print("🚀 Starting parallel search...\n")
+
+            with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                # Submit searches (in the caller's context, so output routing follows)
+                futures = [
+                    executor.submit(
+                        contextvars.copy_context().run,
+                        search_platform, args, platform, start_date, end_date,
+                    )
+                    for platform in missing
+                ]
+
+                # Collect results
+                for future in as_completed(futures):
+                    collect(future.result())
 
-        # Collect results
-        for future in as_completed([reddit_future, twitter_future]):
-            result = future.result()
-            platform = result["platform"]
-            
-            if result["error"]:
-                errors.append(f"{platform.title()}: {result['error']}")
-                print(f"⚠️  {platform.title()} search failed: {result['error']}")
-            else:
-                all_results[platform] = result["results"]
-                print(f"✅ {platform.title()}: Found {len(result['results'])} posts")
+        stage.items_out = sum(len(results) for results in all_results.values())
 
     print()
 
     # Filter by engagement
     print(f"🔎 Filtering by engagement (min: {args.min_engagement})...")
-    
-    filtered_reddit = engagement_filter.filter_posts(
-        all_results["reddit"], min_engagement=args.min_engagement, platform="reddit"
-    )
-    filtered_twitter = engagement_filter.filter_posts(
-        all_results["twitter"], min_engagement=args.min_engagement, platform="twitter"
-    )
+
+    with profiler.stage("filter", items_in=stage.items_out) as stage:
+        filtered_reddit = engagement_filter.filter_posts(
+            all_results["reddit"], min_engagement=args.min_engagement, platform="reddit"
+        )
+        filtered_twitter = engagement_filter.filter_posts(
+            all_results["twitter"], min_engagement=args.min_engagement, platform="twitter"
+        )
+        stage.items_out = len(filtered_reddit) + len(filtered_twitter)
 
     print(f"   Reddit: {len(filtered_reddit)} posts after filtering")
     print(f"   Twitter: {len(filtered_twitter)} posts after filtering\n")
 
+    return filtered_reddit, filtered_twitter, start_date, end_date
+
+
+def analysis_workers(args, post_count: int, budget=None) -> int:
+    """
+    Worker processes for the analysis stages (1 runs them in-process).
+
+    Small corpora are not worth forking for. Memory-bounded runs stay in one
+    process so the budget covers every buffer, and --profile-stage needs
+    its stage to run where cProfile is recording.
+    """
+    if budget or args.profile_stage:
+        return 1
+    if args.workers is not None:
+        return max(args.workers, 1)
+    if post_count < PARALLEL_MIN_POSTS:
+        return 1
+    return min(os.cpu_count() or 1, PARALLEL_WORKERS)
+
+
+def write_profile(prof, fmt: str, output_dir: Path, base_filename: str) -> List[tuple]:
+    """Write the profiler's trace (and cProfile dump, if any); return (label, path) pairs."""
+    if fmt == "chrome":
+        trace_file = output_dir / f"{base_filename}.trace.json"
+        prof.write_chrome_trace(trace_file)
+        files = [("Chrome trace", trace_file)]
+    else:
+        trace_file = output_dir / f"{base_filename}.profile.json"
+        prof.write_json(trace_file)
+        files = [("profile", trace_file)]
+
+    if prof.cprofile_stage:
+        stats_file = output_dir / f"{base_filename}.{prof.cprofile_stage}.prof"
+        if prof.write_cprofile(stats_file):
+            files.append((f"cProfile stats ({prof.cprofile_stage})", stats_file))
+    return files
+
+
+def main(argv: Optional[List[str]] = None, fetched: Optional[Dict[str, Dict]] = None):
+    """
+    Main execution function.
+
+    fetched optionally supplies completed platform searches (see fetch_posts),
+    e.g. from the batch scheduler.
+    """
+    args = parse_args(argv)
+
+    from lib import profiler
+
+    prof = None
+    if args.profile:
+        prof = profiler.Profiler(cprofile_stage=args.profile_stage)
+        prof.metadata = {"topic": args.topic, "started": datetime.now().isoformat()}
+
+    budget = None
+    if args.max_memory:
+        from lib import spill
+        budget = spill.MemoryBudget(args.max_memory)
+
+    with profiler.activate(prof):
+        try:
+            return research(args, fetched, budget)
+        finally:
+            if budget:
+                budget.close()
+
+
+def research(args, fetched: Optional[Dict[str, Dict]] = None, budget=None) -> int:
+    """
+    Run the research pipeline for parsed arguments.
+
+    With a spill.MemoryBudget, post lists and term counters are bounded
+    buffers that spill to disk, and each stage streams through them.
+    """
+    from lib import (
+        deduplicator,
+        trend_analyzer,
+        content_suggester,
+        sentiment_analyzer,
+        output_formatter,
+        profiler,
+    )
+
+    # Print header
+    print(f"\n{'='*60}")
+    print(f"Social Research: {args.topic}")
+    print(f"{'='*60}\n")
+
+    errors = []
+    store = None
+    sample = None
+    if args.sample:
+        from lib import sampling
+        sample = sampling.StratifiedReservoir(args.sample, seed=args.seed)
+
+    if args.input:
+        # Offline: stream saved posts from disk instead of fetching
+        print(f"📂 Input: {', '.join(args.input)}")
+        print(f"🔍 Minimum engagement: {args.min_engagement}\n")
+
+        print(f"🔎 Filtering by engagement (min: {args.min_engagement})...")
+        # Reading and filtering are one streaming pass
+        with profiler.stage("fetch") as stage:
+            filtered_reddit, filtered_twitter, scanned, start_date, end_date = load_saved_posts(
+                args.input, args.min_engagement, budget, sample
+            )
+            stage.items_in = scanned
+            stage.items_out = len(filtered_reddit) + len(filtered_twitter)
+        args.days = max((end_date - start_date).days, 1)
+
+        print(f"   Read {scanned} saved posts")
+        if sample:
+            print(f"   Sampled {sum(sample.sampled)} of {sample.population} posts by engagement")
+        print(f"   Reddit: {len(filtered_reddit)} posts after filtering")
+        print(f"   Twitter: {len(filtered_twitter)} posts after filtering\n")
+
+    elif args.from_store:
+        # Local: query previously fetched posts instead of the APIs
+        from lib import post_store
+        store = post_store.get_store(args.store)
+        if store is None:
+            raise RuntimeError("post store could not be opened")
+        print(f"🗄️  Store: {store.path}")
+        print(f"🔍 Minimum engagement: {args.min_engagement}\n")
+
+        print(f"🔎 Filtering by engagement (min: {args.min_engagement})...")
+        with profiler.stage("fetch") as stage:
+            filtered_reddit, filtered_twitter, scanned, start_date, end_date = load_stored_posts(
+                store, args, budget, sample
+            )
+            stage.items_in = scanned
+            stage.items_out = len(filtered_reddit) + len(filtered_twitter)
+
+        print(f"📅 Time range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
+        print(f"   Matched {scanned} stored posts")
+        if sample:
+            print(f"   Sampled {sum(sample.sampled)} of {sample.population} posts by engagement")
+        print(f"   Reddit: {len(filtered_reddit)} posts after filtering")
+        print(f"   Twitter: {len(filtered_twitter)} posts after filtering\n")
+
+    else:
+        filtered_reddit, filtered_twitter, start_date, end_date = fetch_posts(
+            args, errors, fetched
+        )
+
+    # Output location
+    output_dir = Path(args.output_dir) if args.output_dir else SCRIPT_DIR.parent / "output"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe_topic = "".join(c if c.isalnum() else "_" for c in args.topic)
+    base_filename = f"{timestamp}_{safe_topic}"
+
+    # Streaming exports write each post as soon as deduplication keeps it
+    post_writers = open_post_writers(args.export, output_dir, base_filename)
+
     # Deduplicate
+    from lib import clustering, spill, stage_cache, tokenizer
     print("🔄 Removing duplicates...")
-    all_posts = filtered_reddit + filtered_twitter
-    unique_posts = deduplicator.deduplicate(all_posts)
+    filtered_count = len(filtered_reddit) + len(filtered_twitter)
+    if budget:
+        # Both platforms are already ranked; merging them keeps Reddit first on ties,
+        # like the stable sort of the concatenated lists
+        rank = lambda: heapq.merge(filtered_reddit, filtered_twitter, key=spill.by_engagement)
+        index = deduplicator.DedupIndex(budget=budget)
+        unique_posts = spill.SpillList(budget)
+    else:
+        ranked = sorted(filtered_reddit + filtered_twitter, key=spill.by_engagement)
+        rank = lambda: ranked
+        index = deduplicator.DedupIndex()
+        unique_posts = []
+
+    # Stage results are memoized by the ranked input's fingerprint; the dedup
+    # key then identifies the unique posts for every later stage
+    memo = None if args.recompute else stage_cache.get_default_cache()
+    corpus_key = None
+    kept_positions = None
+    if memo:
+        fingerprint = stage_cache.CorpusFingerprint()
+        for post in rank():
+            fingerprint.update(post)
+        corpus_key = stage_cache.stage_key(
+            "dedup", fingerprint.hexdigest(), [deduplicator],
+            threshold=index.similarity_threshold,
+        )
+        kept_positions = memo.get(corpus_key)
+
+    with profiler.stage("dedup", items_in=filtered_count) as stage:
+        if kept_positions is not None:
+            stage.count("memo_hits")
+            kept = set(kept_positions)
+            unique_source = (
+                (position, post) for position, post in enumerate(rank()) if position in kept
+            )
+        else:
+            unique_source = deduplicator.iter_kept(rank(), index)
+        positions = array("I")
+        try:
+            for position, post in unique_source:
+                positions.append(position)
+                unique_posts.append(post)
+                for writer in post_writers.values():
+                    writer.write(post)
+        finally:
+            for writer in post_writers.values():
+                writer.close()
+        stage.items_out = len(unique_posts)
+    if memo and kept_positions is None:
+        memo.put(corpus_key, "dedup", positions)
     print(f"   {len(unique_posts)} unique posts\n")
 
-    # Analyze trends
-    print("📈 Analyzing trends...")
-    trends = trend_analyzer.analyze(unique_posts, args.topic)
+    # Trends, suggestions and sentiment form a stage graph: the trend analyses
+    # and sentiment only read the posts, so they can run in forked workers
+    # while suggestions wait for the trends
+    from lib import stage_graph
+    graph = stage_graph.StageGraph()
+    post_count = len(unique_posts)
+    trend_count = lambda trends: len(trends["topics"]) + len(trends["themes"])
+
+    # Rollups are summed instead of tokenizing the posts they cover; a sample
+    # keeps too few posts for that to pay off
+    rollups = None
+    if store and not sample:
+        rollups = stored_rollups(store, args, start_date, end_date, rank(), set(positions))
+    extra = ["clusters"] if args.clusters else []
+
+    def with_extra(analyze):
+        # Optional analyses read the posts themselves, which rollup and
+        # streaming trends don't keep, so they run after them
+        def analyze_all():
+            trends = analyze()
+            for key in extra:
+                trends[key] = trend_analyzer.OPTIONAL_ANALYSES[key](unique_posts)
+            return trends
+        return analyze_all
+
+    # Rollups depend on the whole store, not just these posts, so trends and
+    # suggestions built from them are not memoized
+    memo_keys = {}
+    if memo and not rollups:
+        terms = tokenizer.get_tokenizer().version
+        memo_keys["trends"] = stage_cache.stage_key(
+            "trends", corpus_key, [tokenizer, trend_analyzer, clustering],
+            topic=args.topic, tokenizer=terms, extra=extra,
+        )
+        memo_keys["suggestions"] = stage_cache.stage_key(
+            "suggestions", corpus_key, [tokenizer, trend_analyzer, clustering, content_suggester],
+            topic=args.topic, seed=args.seed, tokenizer=terms, extra=extra,
+        )
+    # The columnar exports store each post's sentiment, so the stage keeps
+    # its per-post results for them instead of leaving them to score again
+    keep_sentiment = bool(set(args.export) & {"npz", "parquet"})
+    if memo and args.sentiment:
+        memo_keys["sentiment"] = stage_cache.stage_key(
+            "sentiment", corpus_key, [tokenizer, sentiment_analyzer],
+            lexicon=sentiment_analyzer.get_lexicon().version, post_results=keep_sentiment,
+        )
+    cached = {}
+    for name, key in memo_keys.items():
+        result = memo.get(key)
+        if result is not None:
+            cached[name] = result
+
+    def reuse(name):
+        result = cached[name]
+
+        def memoized(*_):
+            profiler.count("memo_hits")
+            return result
+        return memoized
+
+    if rollups:
+        def analyze_trends():
+            # Sum the store's daily counts instead of re-tokenizing every post;
+            # examples still come from the report's own posts
+            profiler.count("rollup_days", len(rollups))
+            trends = trend_analyzer.analyze_rollups(rollups, args.topic)
+            trend_analyzer.collect_examples(unique_posts, trends)
+            return trends
+        graph.add("trends", with_extra(analyze_trends), items_in=post_count, items_out=trend_count)
+    elif "trends" in cached:
+        graph.add("trends", reuse("trends"), items_in=post_count, items_out=trend_count)
+    elif budget:
+        graph.add(
+            "trends",
+            with_extra(lambda: trend_analyzer.analyze_stream(
+                unique_posts, args.topic, counter=lambda: spill.SpillCounter(budget)
+            )),
+            items_in=post_count,
+            items_out=trend_count,
+        )
+    else:
+        analyses = trend_analyzer.select_analyses(extra)
+        parts = list(analyses)
+        for key, analysis in analyses.items():
+            graph.add(
+                f"trends.{key}",
+                lambda analysis=analysis: analysis(unique_posts),
+                parallel=True,
+                items_in=post_count,
+                items_out=len,
+            )
+        graph.add(
+            "trends",
+            lambda *results: trend_analyzer.combine(args.topic, post_count, dict(zip(parts, results))),
+            deps=[f"trends.{key}" for key in parts],
+            items_out=trend_count,
+        )
+
+    if "suggestions" in cached:
+        suggest = reuse("suggestions")
+    else:
+        suggest = lambda trends: content_suggester.generate(
+            unique_posts, trends, args.topic, seed=args.seed
+        )
+    graph.add(
+        "suggestions",
+        suggest,
+        deps=["trends"],
+        items_in=post_count,
+        items_out=lambda suggestions: sum(len(ideas) for ideas in suggestions.values()),
+    )
+
+    if "sentiment" in cached:
+        graph.add(
+            "sentiment",
+            reuse("sentiment"),
+            items_in=post_count,
+            items_out=lambda _: post_count,
+        )
+    elif args.sentiment:
+        if budget:
+            analyze_sentiment = lambda: sentiment_analyzer.analyze_batches(
+                spill.batched(unique_posts, SENTIMENT_BATCH), keep_results=keep_sentiment
+            )
+        else:
+            analyze_sentiment = lambda: sentiment_analyzer.analyze(
+                unique_posts, keep_results=keep_sentiment
+            )
+        graph.add(
+            "sentiment",
+            analyze_sentiment,
+            parallel=True,
+            items_in=post_count,
+            items_out=lambda _: post_count,
+        )
+
+    workers = analysis_workers(args, post_count, budget)
+    if not any(stage.parallel for stage in graph.stages.values()):
+        workers = 1
+    print("📈 Analyzing trends" + (" and sentiment" if args.sentiment else "") + "..."
+          + (f" ({workers} workers)" if workers > 1 else ""))
+    results = graph.run(workers)
+    for name, key in memo_keys.items():
+        if name not in cached:
+            memo.put(key, name, results[name])
+    trends = results["trends"]
+    suggestions = results["suggestions"]
+    sentiment_data = results.get("sentiment")
+    post_sentiment = sentiment_data.pop("post_results", None) if sentiment_data else None
+    if sample:
+        # Percentages estimate the whole filtered corpus from the sample
+        sampling.annotate_trends(trends, unique_posts, sample)
+        if sentiment_data:
+            sampling.annotate_sentiment(sentiment_data, unique_posts, sample)
+
+    if cached:
+        print(f"   Reused memoized {', '.join(cached)}")
+    if rollups:
+        print(f"   Summed rollups for {len(rollups)} days")
     print(f"   Found {len(trends['topics'])} trending topics")
-    print(f"   Identified {len(trends['themes'])} common themes\n")
+    print(f"   Identified {len(trends['themes'])} common themes")
+    if "clusters" in trends:
+        print(f"   Grouped posts into {len(trends['clusters'])} discussion clusters")
+    print()
 
-    # Generate content suggestions
-    print("💡 Generating content suggestions...")
-    suggestions = content_suggester.generate(unique_posts, trends, args.topic)
+    print("💡 Content suggestions:")
     print(f"   {len(suggestions['blog_posts'])} blog post ideas")
     print(f"   {len(suggestions['social_posts'])} social media ideas")
     print(f"   {len(suggestions['videos'])} video ideas\n")
 
-    # Sentiment analysis (optional)
-    sentiment_data = None
-    if args.sentiment:
-        print("😊 Analyzing sentiment...")
-        sentiment_data = sentiment_analyzer.analyze(unique_posts)
-        print(f"   Positive: {sentiment_data['positive_pct']:.1f}%")
-        print(f"   Negative: {sentiment_data['negative_pct']:.1f}%")
-        print(f"   Neutral: {sentiment_data['neutral_pct']:.1f}%\n")
+    if sentiment_data:
+        print("😊 Sentiment:")
+        print(f"   Positive: {output_formatter.format_percentage(sentiment_data, 'positive_pct')}")
+        print(f"   Negative: {output_formatter.format_percentage(sentiment_data, 'negative_pct')}")
+        print(f"   Neutral: {output_formatter.format_percentage(sentiment_data, 'neutral_pct')}\n")
 
     # Format output
     print("📝 Formatting output...\n")
-    
-    output_data = {
-        "topic": args.topic,
-        "date_range": {
-            "start": start_date.isoformat(),
-            "end": end_date.isoformat(),
-            "days": args.days,
-        },
-        "stats": {
-            "total_posts": len(unique_posts),
-            "reddit_posts": len(filtered_reddit),
-            "twitter_posts": len(filtered_twitter),
-        },
-        "posts": unique_posts,
-        "trends": trends,
-        "suggestions": suggestions,
-        "sentiment": sentiment_data,
-        "errors": errors,
-    }
-
-    # Export based on format
-    output_dir = SCRIPT_DIR.parent / "output"
-    output_dir.mkdir(exist_ok=True)
-    
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_topic = "".join(c if c.isalnum() else "_" for c in args.topic)
-    base_filename = f"{timestamp}_{safe_topic}"
 
-    if args.export == "json":
-        output_file = output_dir / f"{base_filename}.json"
-        with open(output_file, "w") as f:
-            json.dump(output_data, f, indent=2, default=str)
-        print(f"💾 Saved JSON: {output_file}")
-
-    elif args.export == "csv":
-        output_file = output_dir / f"{base_filename}.csv"
-        output_formatter.export_csv(output_data, output_file)
-        print(f"💾 Saved CSV: {output_file}")
-
-    else:  # markdown
-        output_file = output_dir / f"{base_filename}.md"
-        markdown = output_formatter.format_markdown(output_data)
-        with open(output_file, "w") as f:
-            f.write(markdown)
-        print(f"💾 Saved Markdown: {output_file}")
+    with profiler.stage("formatting", items_in=len(unique_posts)) as stage:
+        output_data = {
+            "topic": args.topic,
+            "date_range": {
+                "start": start_date.isoformat(),
+                "end": end_date.isoformat(),
+                "days": args.days,
+            },
+            "stats": {
+                "total_posts": len(unique_posts),
+                "reddit_posts": len(filtered_reddit),
+                "twitter_posts": len(filtered_twitter),
+            },
+            "posts": unique_posts,
+            "trends": trends,
+            "suggestions": suggestions,
+            "sentiment": sentiment_data,
+            "errors": errors,
+        }
+        if sample:
+            output_data["stats"]["sample"] = sample.describe(len(unique_posts))
+
+        # Render every requested format from the same in-memory result
+        output_files = export_reports(
+            args.export, output_data, output_dir, base_filename, post_writers, post_sentiment
+        )
+        for label, path in output_files:
+            print(f"💾 Saved {label}: {path}")
+        output_file = output_files[-1][1] if len(args.export) == 1 else output_dir
+
+        summary = output_formatter.format_summary(output_data)
+        top_discussions = output_formatter.format_top_discussions(output_data, limit=5)
+        content_ideas = output_formatter.format_content_suggestions(suggestions)
+        stage.items_out = len(output_files)
+
+    if args.knowledge_export is not None:
+        from lib import knowledge_export
+        with profiler.stage("knowledge") as stage:
+            records = knowledge_export.build_records(output_data)
+            exporter = knowledge_export.KnowledgeExporter(args.knowledge_export or None)
+            try:
+                exported = exporter.export(records, compact=args.knowledge_compact)
+            finally:
+                exporter.close()
+            stage.items_in = len(records)
+            stage.items_out = len(records) - exported["unchanged"]
+        print(f"🧠 Knowledge export: {exported['entries']} entries, {exported['nodes']} nodes, "
+              f"{exported['edges']} edges new or updated ({exported['unchanged']} unchanged)")
+        if exported["compacted"]:
+            print(f"   Compacted snapshots in {exporter.directory}")
 
     # Print summary to stdout
     print(f"\n{'='*60}")
     print("SUMMARY")
     print(f"{'='*60}\n")
     
-    summary = output_formatter.format_summary(output_data)
     print(summary)
 
     # Print top discussions
@@ -285,7 +1109,6 @@ def main():
     print("TOP DISCUSSIONS")
     print(f"{'='*60}\n")
     
-    top_discussions = output_formatter.format_top_discussions(output_data, limit=5)
     print(top_discussions)
 
     # Print content suggestions
@@ -293,24 +1116,45 @@ def main():
     print("CONTENT SUGGESTIONS")
     print(f"{'='*60}\n")
     
-    content_ideas = output_formatter.format_content_suggestions(suggestions)
     print(content_ideas)
 
+    if budget:
+        print(f"\n💽 Memory budget {spill.format_size(budget.max_bytes)}: "
+              f"peak ~{spill.format_size(budget.peak)} tracked, "
+              f"{budget.runs_written} runs ({spill.format_size(budget.bytes_written)}) spilled to disk")
+        if budget.over_budget:
+            print("⚠️  Buffers that cannot spill outgrew the budget on their own")
+
+    prof = profiler.current()
+    if prof:
+        print()
+        for label, path in write_profile(prof, args.profile, output_dir, base_filename):
+            print(f"💾 Saved {label}: {path}")
+
     print(f"\n✨ Research complete! Full report saved to: {output_file}\n")
 
     return 0
 
 
-if __name__ == "__main__":
+def run(argv: Optional[List[str]] = None, fetched: Optional[Dict[str, Dict]] = None) -> int:
+    """Run main() and turn interrupts and errors into an exit code."""
+    argv = sys.argv[1:] if argv is None else argv
     try:
-        sys.exit(main())
+        return main(argv, fetched)
+    except SystemExit as e:  # argparse errors and --help
+        if e.code is None:
+            return 0
+        return e.code if isinstance(e.code, int) else 1
     except KeyboardInterrupt:
         print("\n\n⚠️  Research interrupted by user")
-        sys.exit(1)
+        return 1
     except Exception as e:
         print(f"\n\n❌ Error: {e}")
-        if "--debug" in sys.argv:
+        if "--debug" in argv:
             import traceback
             traceback.print_exc()
-        sys.exit(1)
+        return 1
+
 
+if __name__ == "__main__":
+    sys.exit(run())
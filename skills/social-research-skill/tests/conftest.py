@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Caches default to paths read at import time, so point them somewhere
+# disposable before any lib module is loaded
+os.environ.setdefault("SOCIAL_RESEARCH_CACHE_DIR", tempfile.mkdtemp(prefix="social-research-tests-"))
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
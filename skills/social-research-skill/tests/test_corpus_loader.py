@@ -0,0 +1,25 @@
+import json
+
+from lib import corpus_loader
+
+
+def test_top_level_array_infers_platform(tmp_path):
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps([
+        {"id": "a", "title": "Post", "subreddit": "python", "score": 3},
+        {"id": "b", "text": "Tweet", "likes": 4},
+        {"id": "c", "text": "Kept", "platform": "twitter", "num_comments": 2},
+    ]))
+
+    posts = list(corpus_loader.iter_file_posts(path))
+    assert [post["platform"] for post in posts] == ["reddit", "twitter", "twitter"]
+
+
+def test_array_and_jsonl_infer_alike(tmp_path):
+    posts = [{"id": "a", "title": "Post", "num_comments": 1}, {"id": "b", "text": "Tweet", "retweets": 2}]
+    array = tmp_path / "dump.json"
+    array.write_text(json.dumps(posts))
+    lines = tmp_path / "dump.jsonl"
+    lines.write_text("\n".join(json.dumps(post) for post in posts))
+
+    assert list(corpus_loader.iter_file_posts(array)) == list(corpus_loader.iter_file_posts(lines))
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from lib import deduplicator
+
+
+def pairwise_unique(posts, threshold):
+    """Reference dedup: compare every post against every kept text."""
+    kept, urls, texts = [], set(), []
+    for post in sorted(posts, key=lambda p: p.get("engagement_score", 0), reverse=True):
+        url = post.get("url", "")
+        text = deduplicator.get_post_text(post).lower()
+        if (url and url in urls) or not text:
+            continue
+        if any(deduplicator.calculate_similarity(text, seen) >= threshold for seen in texts):
+            continue
+        kept.append(post)
+        texts.append(text)
+        if url:
+            urls.add(url)
+    return kept
+
+
+def make_posts(n, seed):
+    rng = random.Random(seed)
+    words = ["rust", "python", "async", "compiler", "borrow", "checker", "speed", "tooling", "editor"]
+    base = [" ".join(rng.choices(words, k=rng.randint(3, 12))) for _ in range(n // 3)]
+    posts = []
+    for i in range(n):
+        text = rng.choice(base)
+        if rng.random() < 0.5:
+            # Near-duplicate: a word swapped or appended
+            text = text + " " + rng.choice(words) if rng.random() < 0.5 else text.replace("rust", "go", 1)
+        posts.append({
+            "platform": rng.choice(["reddit", "twitter"]),
+            "title": "",
+            "text": text,
+            "url": f"https://example.com/{rng.randint(0, n)}",
+            "engagement_score": rng.randint(0, 50),
+        })
+    return posts
+
+
+@pytest.mark.parametrize("threshold", [0.6, 0.85, 0.95])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_dedup_index_matches_pairwise(threshold, seed):
+    posts = make_posts(150, seed)
+    assert deduplicator.deduplicate(posts, threshold) == pairwise_unique(posts, threshold)
+
+
+def test_dedup_index_counts_fewer_comparisons():
+    posts = make_posts(150, 3)
+    index = deduplicator.DedupIndex()
+    kept = [post for post in posts if index.offer(post)]
+    assert index.comparisons < len(posts) * len(kept)
+
+
+@pytest.mark.parametrize("threshold", [0.6, 0.85])
+def test_spilled_dedup_index_matches_pairwise(tmp_path, threshold):
+    from lib import spill
+
+    posts = make_posts(150, 4)
+    ranked = sorted(posts, key=lambda p: p.get("engagement_score", 0), reverse=True)
+    budget = spill.MemoryBudget(2048, directory=tmp_path)
+    index = deduplicator.DedupIndex(threshold, budget=budget)
+    kept = []
+    for post in ranked:
+        if index.offer(post):
+            kept.append(post)
+            budget.check()
+    budget.close()
+    assert index._spilled is not None
+    assert kept == pairwise_unique(posts, threshold)
+    assert len(index) == len(kept)
@@ -0,0 +1,44 @@
+import json
+
+from lib import fast_json
+
+
+def test_reddit_listing_decodes_into_records():
+    payload = json.dumps({"data": {"after": "t3_b", "children": [
+        {"kind": "t3", "data": {"id": "a", "title": "Post", "score": 5, "created_utc": 1.7e9, "ups": 5}},
+        {"kind": "t3", "data": {"id": "b"}},
+    ]}}).encode()
+
+    listing = fast_json.loads(payload, fast_json.RedditListing)
+
+    first, second = (child.data for child in listing.data.children)
+    assert (first.id, first.title, first.score, first.created_utc) == ("a", "Post", 5, 1.7e9)
+    # Missing fields get the fetchers' defaults
+    assert (second.selftext, second.score, second.num_comments) == ("", 0, 0)
+    assert listing.data.after == "t3_b"
+    assert not hasattr(first, "ups")
+
+
+def test_twitter_search_fills_missing_sections():
+    payload = b'{"data": [{"id": "1", "text": "hi", "public_metrics": {"like_count": 3}}]}'
+
+    search = fast_json.loads(payload, fast_json.TwitterSearch)
+
+    assert search.data[0].public_metrics.like_count == 3
+    assert search.data[0].public_metrics.retweet_count == 0
+    assert search.includes.users == []
+    assert search.meta.next_token is None
+
+
+def test_mistyped_payload_still_decodes():
+    payload = b'{"data": [{"id": 7, "score": "many"}, "junk"]}'
+
+    response = fast_json.loads(payload, fast_json.PushshiftResponse)
+
+    assert response.data[0].id == 7
+    assert response.data[0].score == "many"
+
+
+def test_untyped_round_trip():
+    doc = {"text": "café ✨", "count": 3, "nested": [1, 2.5, None]}
+    assert fast_json.loads(fast_json.dumps(doc)) == doc
@@ -0,0 +1,128 @@
+import json
+import sqlite3
+import time
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import social_research
+from lib import post_store
+
+
+def stored_post(post_id, title, text, score):
+    return {
+        "platform": "reddit",
+        "id": post_id,
+        "title": title,
+        "text": text,
+        "score": score,
+        "num_comments": 0,
+        # Days before today, so the post's UTC day lies wholly in the range
+        "created_utc": int(time.time()) - 3 * 86400,
+    }
+
+
+def run_report(tmp_path, store_path, *options):
+    output_dir = tmp_path / "out"
+    code = social_research.run([
+        "rust", "--from-store", f"--store={store_path}", "--export=json",
+        f"--output-dir={output_dir}", "--recompute", *options,
+    ])
+    assert code == 0
+    (report,) = output_dir.glob("*.json")
+    return json.loads(report.read_text())
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    path = tmp_path / "posts.sqlite"
+    store = post_store.PostStore(path)
+    # Distinct enough that deduplication keeps every post
+    animals = ["zebra stripes savanna", "zebra herd migration", "zebra foal grazing",
+               "zebra crossing photo", "zebra pattern fabric"]
+    posts = [
+        stored_post(f"z{i}", f"zebra rust {animal}", f"{animal} notes", 0)
+        for i, animal in enumerate(animals)
+    ] + [
+        stored_post("h1", "rust compiler speed", "borrow checker lesson", 50),
+        stored_post("h2", "rust async runtime", "tokio executor benchmark", 60),
+        stored_post("h3", "rust editor tooling", "analyzer plugin setup", 70),
+        # Dropped by deduplication in favour of h1
+        stored_post("h4", "rust compiler speed", "borrow checker lesson!", 40),
+        # Fetched for the topic but without its word, so not in the report
+        stored_post("h5", "compiler internals", "lowering passes explained", 80),
+    ]
+    store.upsert_posts(posts, topic="rust")
+    yield path
+    store.close()
+    post_store._stores.clear()
+
+
+def tokenized_trends(tmp_path, store_path, *options):
+    """Report trends with the rollups cleared, so every post is tokenized."""
+    with sqlite3.connect(store_path) as conn:
+        conn.execute("DELETE FROM post_topics")
+        conn.execute("DELETE FROM rollups")
+    return run_report(tmp_path / "tokenized", store_path, *options)["trends"]
+
+
+def comparable(trends):
+    """Counts, and the terms counted more than the last listed one (ties may list in any order)."""
+    def ranked(items, term, count):
+        counts = [item[count] for item in items]
+        return counts, {item[term] for item in items if item[count] > min(counts, default=0)}
+
+    return (
+        trends["total_posts"],
+        ranked(trends["topics"], "keyword", "frequency"),
+        ranked(trends["themes"], "theme", "frequency"),
+        ranked(trends["hashtags"], "hashtag", "count"),
+    )
+
+
+def test_filtered_report_counts_only_its_posts(tmp_path, store_path, capsys):
+    report = run_report(tmp_path, store_path, "--min-engagement=10")
+    posts = set(report["posts"])
+    trends = report["trends"]
+
+    assert "Summed rollups" in capsys.readouterr().out
+    assert report["stats"]["total_posts"] == 3
+    assert trends["total_posts"] == 3
+    assert "zebra" not in [topic["keyword"] for topic in trends["topics"]]
+    for topic in trends["topics"]:
+        assert set(topic["example_posts"]) <= posts
+
+
+def test_unfiltered_report_sums_rollups(tmp_path, store_path, capsys):
+    report = run_report(tmp_path, store_path, "--min-engagement=0")
+
+    assert "Summed rollups" in capsys.readouterr().out
+    assert report["trends"]["total_posts"] == report["stats"]["total_posts"] == 8
+    posts = set(report["posts"])
+    for topic in report["trends"]["topics"]:
+        assert set(topic["example_posts"]) <= posts
+
+
+@pytest.mark.parametrize("min_engagement", [0, 7, 10, 55])
+def test_rollup_trends_match_tokenized(tmp_path, store_path, min_engagement):
+    option = f"--min-engagement={min_engagement}"
+    summed = run_report(tmp_path, store_path, option)["trends"]
+    assert comparable(summed) == comparable(tokenized_trends(tmp_path, store_path, option))
+
+
+def test_refresh_moves_rollup_bucket(tmp_path, store_path, capsys):
+    store = post_store.get_store(store_path)
+    store.upsert_posts([stored_post("h3", "rust editor tooling", "analyzer plugin setup", 0)])
+
+    report = run_report(tmp_path, store_path, "--min-engagement=10")
+    assert "Summed rollups" in capsys.readouterr().out
+    assert report["trends"]["total_posts"] == report["stats"]["total_posts"] == 2
+    assert "editor" not in [topic["keyword"] for topic in report["trends"]["topics"]]
+
+
+def test_whole_days_exclude_partial_edges():
+    start = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+    end = datetime(2024, 3, 4, 23, 59, 59, tzinfo=timezone.utc)
+    assert post_store.whole_days(start, end) == ("2024-03-02", "2024-03-04")
+    assert post_store.whole_days(start, end - timedelta(seconds=1)) == ("2024-03-02", "2024-03-03")
@@ -0,0 +1,64 @@
+import tracemalloc
+
+import pytest
+
+from lib import profiler
+
+MB = 1 << 20
+
+
+@pytest.fixture(autouse=True)
+def untraced():
+    if tracemalloc.is_tracing():
+        pytest.skip("tracemalloc is already tracing")
+
+
+def allocate_and_free(size):
+    block = bytearray(size)
+    del block
+
+
+def test_tracing_outlives_the_first_profiler_to_stop():
+    first, second = profiler.Profiler(), profiler.Profiler()
+    first.start()
+    second.start()
+    first.stop()
+    assert tracemalloc.is_tracing()
+
+    with second.stage("after") as record:
+        allocate_and_free(2 * MB)
+    assert record.memory_peak_bytes > 1.9 * MB
+
+    second.stop()
+    assert not tracemalloc.is_tracing()
+
+
+def test_overlapping_stages_keep_their_peaks():
+    first, second = profiler.Profiler(), profiler.Profiler()
+    first.start()
+    second.start()
+    try:
+        with first.stage("outer") as outer:
+            allocate_and_free(4 * MB)
+            # Starting another profiler's stage must not reset outer's peak
+            with second.stage("inner") as inner:
+                allocate_and_free(1 * MB)
+    finally:
+        first.stop()
+        second.stop()
+
+    assert outer.memory_peak_bytes > 3.9 * MB
+    assert 0.9 * MB < inner.memory_peak_bytes < 4 * MB
+
+
+def test_nested_stage_keeps_the_enclosing_peak():
+    prof = profiler.Profiler()
+    with profiler.activate(prof):
+        with profiler.stage("outer") as outer:
+            allocate_and_free(3 * MB)
+            with profiler.stage("inner") as inner:
+                allocate_and_free(MB)
+
+    assert outer.memory_peak_bytes > 2.9 * MB
+    assert inner.memory_peak_bytes < 3 * MB
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,56 @@
+import json
+
+from lib import output_formatter, report_schema
+
+
+def make_report(posts):
+    return {
+        "topic": "rust",
+        "stats": {"total_posts": len(posts)},
+        "posts": posts,
+        "trends": {
+            "topics": [{"keyword": "rust", "example_posts": posts[:2] + [{"platform": "x", "id": "extra"}]}],
+            "themes": [],
+        },
+        "sentiment": {"positive_posts": [dict(posts[0], sentiment_data={"score": 1})], "negative_posts": []},
+        "errors": [],
+    }
+
+
+def test_streamed_json_export_matches_normalized_report(tmp_path):
+    posts = [{"platform": "reddit", "id": str(i), "title": f"post {i}"} for i in range(5)]
+    posts.append({"platform": "twitter", "text": "no id or url"})
+    data = make_report(posts)
+    path = tmp_path / "report.json"
+
+    output_formatter.export_json(data, path)
+
+    assert json.loads(path.read_text()) == json.loads(json.dumps(report_schema.normalize(data)))
+    assert report_schema.load_report(path)["posts"] == posts
+
+
+def test_streamed_json_export_without_posts(tmp_path):
+    data = {"topic": "rust", "posts": [], "trends": None, "sentiment": None}
+    path = tmp_path / "report.json"
+
+    output_formatter.export_json(data, path)
+
+    assert json.loads(path.read_text())["post_table"] == {}
+
+
+def test_columns_reuse_the_runs_sentiment(monkeypatch):
+    from lib import sentiment_analyzer
+
+    posts = [{"platform": "reddit", "id": str(i), "title": "great tool", "text": ""} for i in range(3)]
+    results = sentiment_analyzer.score_posts(posts, use_cache=False)
+
+    def rescore(*args, **kwargs):
+        raise AssertionError("posts were scored again")
+
+    monkeypatch.setattr(sentiment_analyzer, "score_posts", rescore)
+    columns = output_formatter.build_columns(make_report(posts), results)
+
+    assert columns["sentiment_confidence"] == [float(r["confidence"]) for r in results]
+    assert [columns["sentiment_dict"][code] for code in columns["sentiment_codes"]] == [
+        r["sentiment"] for r in results
+    ]
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from lib import sampling
+
+
+def reservoir_with(counts, size, seed=0):
+    sample = sampling.StratifiedReservoir(size, seed=seed)
+    for bound, n in zip(sampling.ENGAGEMENT_STRATA, counts):
+        sample.extend({"engagement_score": bound} for _ in range(n))
+    return sample
+
+
+@pytest.mark.parametrize("counts,size", [
+    ((900, 90, 9, 1, 0), 100),
+    ((5000, 400, 30, 3, 1), 50),
+    ((10, 0, 0, 0, 0), 50),
+    ((3, 3, 3, 3, 3), 4),
+    ((0, 0, 0, 0, 0), 10),
+])
+def test_allocation_sums_to_sample_size(counts, size):
+    allocation = reservoir_with(counts, size).allocation()
+    assert sum(allocation) == min(size, sum(counts))
+    assert all(0 <= drawn <= seen for drawn, seen in zip(allocation, counts))
+
+
+def test_allocation_keeps_minimum_per_stratum():
+    allocation = reservoir_with((5000, 400, 30, 3, 1), 50).allocation()
+    assert allocation[3] == sampling.MIN_STRATUM_POSTS
+    assert allocation[4] == 1  # all it has
+
+
+def test_allocation_is_proportional():
+    allocation = reservoir_with((800, 200, 0, 0, 0), 100).allocation()
+    assert allocation == [80, 20, 0, 0, 0]
+
+
+def test_draw_follows_allocation():
+    sample = reservoir_with((900, 90, 9, 1, 0), 100)
+    drawn = sample.draw()
+    assert len(drawn) == 100
+    assert sample.sampled == sample.allocation()
+
+
+def test_interval_covers_population_share():
+    rng = random.Random(0)
+    posts = [{"engagement_score": rng.choice([1, 50, 500]), "hit": rng.random() < 0.3} for _ in range(5000)]
+    true_share = 100 * sum(post["hit"] for post in posts) / len(posts)
+    sample = sampling.StratifiedReservoir(400, seed=1)
+    sample.extend(posts)
+    drawn = sample.draw()
+    estimate, low, high = sample.interval(drawn, [100.0 if post["hit"] else 0.0 for post in drawn])
+    assert low <= estimate <= high
+    assert low <= true_share <= high
@@ -0,0 +1,33 @@
+from lib import saturation
+
+
+def page(start, texts, score=10):
+    return [
+        {"id": f"p{start + i}", "url": f"https://example.com/{start + i}", "text": text, "score": score}
+        for i, text in enumerate(texts)
+    ]
+
+
+def test_near_duplicates_count_against_a_page():
+    pages = saturation.PageYield("reddit", min_yield=0.5, min_engagement=5)
+    first = ["rust compiler errors explained", "async runtimes compared", "borrow checker tips"]
+    assert pages.record(3, page(0, first)) == 1.0
+
+    # Same posts reposted with trivial edits: new IDs and URLs, near-identical text
+    reposts = [text + "!" for text in first]
+    assert pages.record(3, page(3, reposts)) == 0.0
+    assert pages.record(3, page(6, reposts)) == 0.0
+    assert pages.saturated
+
+
+def test_low_engagement_posts_do_not_count():
+    pages = saturation.PageYield("reddit", min_yield=0.5, min_engagement=5)
+    assert pages.record(2, page(0, ["new tooling release", "editor plugin setup"], score=1)) == 0.0
+    assert pages.low_pages == 1
+
+
+def test_zero_min_yield_never_saturates():
+    pages = saturation.PageYield("reddit", min_yield=0)
+    for start in range(0, 9, 3):
+        pages.record(3, page(start, ["same text"] * 3))
+    assert not pages.saturated
@@ -0,0 +1,68 @@
+import pytest
+
+from lib import sentiment_analyzer
+
+
+@pytest.fixture
+def lexicon():
+    return sentiment_analyzer.compile_lexicon(
+        sentiment_analyzer.POSITIVE_WORDS | sentiment_analyzer.POSITIVE_PHRASES,
+        sentiment_analyzer.NEGATIVE_WORDS | sentiment_analyzer.NEGATIVE_PHRASES,
+    )
+
+
+def score(lexicon, text):
+    return lexicon.score_tokens(sentiment_analyzer.tokenize(text))
+
+
+def test_words_score_by_polarity(lexicon):
+    assert score(lexicon, "great docs but buggy release") == (1, 1)
+
+
+@pytest.mark.parametrize("gap", range(sentiment_analyzer.NEGATION_WINDOW))
+def test_negation_flips_terms_within_window(lexicon, gap):
+    text = "not " + "very " * gap + "good"
+    assert score(lexicon, text) == (0, 1)
+
+
+def test_negation_expires_after_window(lexicon):
+    text = "not " + "very " * sentiment_analyzer.NEGATION_WINDOW + "good"
+    assert score(lexicon, text) == (1, 0)
+
+
+def test_negation_flips_negative_terms(lexicon):
+    assert score(lexicon, "this isn't bad at all") == (1, 0)
+
+
+def test_phrase_beats_its_first_word(lexicon):
+    # "hard" alone is negative; "hard to use" counts once as a phrase
+    assert score(lexicon, "hard to use") == (0, 1)
+    assert score(lexicon, "works great") == (1, 0)
+
+
+def test_longest_phrase_wins():
+    lexicon = sentiment_analyzer.Lexicon({"worth": 1, "worth it": 2, "worth every penny": 3})
+    assert score(lexicon, "worth every penny") == (3, 0)
+    assert score(lexicon, "worth it") == (2, 0)
+    assert score(lexicon, "worth every") == (1, 0)
+
+
+def test_negated_phrase_flips_as_a_whole(lexicon):
+    assert score(lexicon, "never a waste of time") == (1, 0)
+
+
+def test_version_tracks_terms_and_window():
+    base = sentiment_analyzer.Lexicon({"good": 1})
+    assert base.version == sentiment_analyzer.Lexicon({"good": 1}).version
+    assert base.version != sentiment_analyzer.Lexicon({"good": 2}).version
+    assert base.version != sentiment_analyzer.Lexicon({"good": 1}, negation_window=1).version
+
+
+def test_analyze_texts_labels(lexicon):
+    positive, negative, neutral = sentiment_analyzer.analyze_texts(
+        ["highly recommend it, works great", "crashed again, waste of money", "released today"],
+        lexicon,
+    )
+    assert positive["sentiment"] == "positive"
+    assert negative["sentiment"] == "negative"
+    assert neutral["sentiment"] == "neutral"
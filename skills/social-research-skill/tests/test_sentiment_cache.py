@@ -0,0 +1,58 @@
+from lib import sentiment_cache
+
+
+def test_versions_are_kept_side_by_side(tmp_path):
+    path = tmp_path / "sentiment.sqlite"
+    key = sentiment_cache.text_hash("great tool")
+    first = sentiment_cache.SentimentCache(path)
+    second = sentiment_cache.SentimentCache(path)
+
+    first.put_many({key: {"sentiment": "positive"}}, "v1")
+    second.put_many({key: {"sentiment": "neutral"}}, "v2")
+    # A later process with either lexicon still finds its own results
+    third = sentiment_cache.SentimentCache(path)
+    assert third.get_many([key], "v1") == {key: {"sentiment": "positive"}}
+    assert third.get_many([key], "v2") == {key: {"sentiment": "neutral"}}
+    assert third.get_many([key], "v3") == {}
+
+    for cache in (first, second, third):
+        cache.close()
+
+
+def test_unused_versions_expire(tmp_path):
+    path = tmp_path / "sentiment.sqlite"
+    key = sentiment_cache.text_hash("great tool")
+    cache = sentiment_cache.SentimentCache(path)
+    cache.put_many({key: {"sentiment": "positive"}}, "old")
+    cache.put_many({key: {"sentiment": "neutral"}}, "new")
+    with cache._conn:
+        cache._conn.execute("UPDATE versions SET used = 0 WHERE version = 'old'")
+    cache.close()
+
+    cache = sentiment_cache.SentimentCache(path)
+    assert cache.get_many([key], "new") == {key: {"sentiment": "neutral"}}
+    assert cache.get_many([key], "old") == {}
+    cache.close()
+
+
+def test_long_lived_user_keeps_its_version_fresh(tmp_path, monkeypatch):
+    path = tmp_path / "sentiment.sqlite"
+    key = sentiment_cache.text_hash("great tool")
+    clock = [1_000_000.0]
+    monkeypatch.setattr(sentiment_cache.time, "time", lambda: clock[0])
+
+    daemon = sentiment_cache.SentimentCache(path)
+    daemon.put_many({key: {"sentiment": "positive"}}, "daemon")
+    # The daemon keeps scoring with its version for longer than the expiry
+    for _ in range(12):
+        clock[0] += sentiment_cache.TOUCH_INTERVAL_SECONDS / 2 + 1
+        assert daemon.get_many([key], "daemon") == {key: {"sentiment": "positive"}}
+    assert clock[0] - 1_000_000.0 > sentiment_cache.STALE_VERSION_SECONDS / 2
+
+    clock[0] += sentiment_cache.STALE_VERSION_SECONDS / 2
+    cli = sentiment_cache.SentimentCache(path)
+    cli.get_many([key], "cli")
+    assert daemon.get_many([key], "daemon") == {key: {"sentiment": "positive"}}
+
+    daemon.close()
+    cli.close()
@@ -0,0 +1,72 @@
+import random
+from collections import Counter
+
+import pytest
+
+from lib import spill
+
+
+@pytest.fixture
+def budget(tmp_path):
+    # Small enough that every few items spill a run
+    with spill.MemoryBudget(2048, directory=str(tmp_path)) as budget:
+        yield budget
+
+
+def make_posts(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        {"id": str(i), "text": "post text " * rng.randint(1, 5), "engagement_score": rng.randint(0, 20)}
+        for i in range(n)
+    ]
+
+
+def test_spill_list_round_trip(budget):
+    items = make_posts(300)
+    buffered = spill.SpillList(budget)
+    for item in items:
+        buffered.append(item)
+
+    assert buffered.runs
+    assert len(buffered) == len(items)
+    assert list(buffered) == items
+    # Iterating again replays the same items
+    assert list(buffered) == items
+
+
+def test_sorted_spill_matches_stable_sort(budget):
+    posts = make_posts(500)
+    ranked = spill.SortedSpill(budget, key=spill.by_engagement)
+    for post in posts:
+        ranked.append(post)
+
+    assert ranked.runs
+    assert list(ranked) == sorted(posts, key=spill.by_engagement)
+
+
+def test_sorted_spill_compacts_many_runs(budget, monkeypatch):
+    monkeypatch.setattr(spill, "MERGE_FAN_IN", 3)
+    posts = make_posts(500, seed=1)
+    ranked = spill.SortedSpill(budget, key=spill.by_engagement)
+    for post in posts:
+        ranked.append(post)
+
+    assert len(ranked.runs) > 3
+    assert list(ranked) == sorted(posts, key=spill.by_engagement)
+    assert len(ranked.runs) <= 3
+
+
+def test_spill_counter_matches_counter(budget):
+    rng = random.Random(2)
+    words = [f"word{i}" for i in range(400)]
+    counter = spill.SpillCounter(budget)
+    expected = Counter()
+    for _ in range(200):
+        counts = Counter(rng.choices(words, k=20))
+        counter.update(counts)
+        expected.update(counts)
+
+    assert counter.runs
+    assert list(counter.items()) == sorted(expected.items())
+    assert counter.most_common(25) == expected.most_common(25)
+    assert counter.most_common() == expected.most_common()
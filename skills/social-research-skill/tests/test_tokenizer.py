@@ -0,0 +1,15 @@
+from lib import tokenizer
+
+
+def test_bigram_segment_keeps_words_within_boundaries():
+    tokens = tokenizer.Tokenizer(cjk_backend="bigram")
+    keywords = tokens.keywords("我觉得Python的异步编程非常好用")
+    assert keywords == ["python", "异步编程", "好用"]
+
+
+def test_bigram_segment_splits_long_pieces():
+    assert tokenizer.bigram_segment("机器学习模型") == ["机器", "器学", "学习", "习模", "模型"]
+
+
+def test_kana_pieces_stay_whole():
+    assert tokenizer.bigram_segment("カタカナ") == ["カタカナ"]